@@ -0,0 +1,75 @@
+"""
+Benchmark measuring how the throughput of claiming open experiments scales with the number of concurrent workers.
+
+For each worker count, the experiment table is refilled with `--experiments` open experiments. Afterwards, the given
+number of processes concurrently claim experiments until none are left. The number of claims per second over all
+workers is reported. On MySQL servers supporting `SELECT ... FOR UPDATE SKIP LOCKED`, the throughput is expected to
+grow with the number of workers, whereas with a plain `FOR UPDATE` all workers queue on the lock of the same row.
+
+Example call (from the repository root):
+
+    python benchmarks/claim_contention.py --config config/experiment_configuration.yml --workers 1 2 4 8 16
+"""
+import argparse
+import logging
+import os
+import time
+from multiprocessing import Pool
+from typing import List
+
+from py_experimenter.exceptions import NoExperimentsLeftException
+from py_experimenter.experimenter import PyExperimenter
+
+
+def _create_experimenter(arguments: argparse.Namespace) -> PyExperimenter:
+    return PyExperimenter(
+        experiment_configuration_file_path=arguments.config,
+        database_credential_file_path=arguments.credentials,
+        table_name=arguments.table,
+        use_codecarbon=False,
+        logger_name="py-experimenter-benchmark",
+        log_level=logging.WARNING,
+    )
+
+
+def _claim_until_empty(arguments: argparse.Namespace) -> int:
+    experimenter = _create_experimenter(arguments)
+    claims = 0
+    while True:
+        try:
+            claims += len(experimenter.db_connector.get_experiment_configurations(arguments.batch_size, arguments.random_order))
+        except NoExperimentsLeftException:
+            return claims
+
+
+def _fill_table(arguments: argparse.Namespace) -> None:
+    experimenter = _create_experimenter(arguments)
+    experimenter.delete_table()
+    keyfield_names = list(experimenter.config.database_configuration.keyfields.keys())
+    rows = [{keyfield_name: index for keyfield_name in keyfield_names} for index in range(arguments.experiments)]
+    experimenter.fill_table_with_rows(rows)
+
+
+def run_benchmark(arguments: argparse.Namespace) -> List[dict]:
+    results = []
+    for n_workers in arguments.workers:
+        _fill_table(arguments)
+        with Pool(n_workers) as pool:
+            start = time.perf_counter()
+            claims = sum(pool.map(_claim_until_empty, [arguments] * n_workers))
+            duration = time.perf_counter() - start
+        results.append({"workers": n_workers, "claims": claims, "seconds": duration, "claims_per_second": claims / duration})
+        print(f"{n_workers:>8} workers | {claims:>8} claims | {duration:>8.2f} s | {claims / duration:>10.1f} claims/s")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=os.path.join("config", "experiment_configuration.yml"), help="Experiment configuration file.")
+    parser.add_argument("--credentials", default=os.path.join("config", "database_credentials.yml"), help="Database credential file.")
+    parser.add_argument("--table", default="benchmark_claim_contention", help="Table used for the benchmark. It is dropped before each run!")
+    parser.add_argument("--experiments", type=int, default=2000, help="Number of open experiments per run.")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8], help="Numbers of concurrent workers to benchmark.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Number of experiments claimed per round trip.")
+    parser.add_argument("--random-order", action="store_true", help="Claim experiments in random order.")
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,62 @@
+"""
+Benchmark measuring the duration of `fill_table` if a large part of the given combinations already exists.
+
+First, the experiment table is filled with `--existing` rows. Afterwards, `fill_table` is called with `--new` combinations,
+half of which already exist in the table. The duration of the deduplication, i.e. checking each combination against the
+existing rows, is reported separately from the total duration of the second call. The deduplication is expected to scale
+linearly with the number of existing rows plus the number of new combinations.
+
+Example call (from the repository root):
+
+    python benchmarks/fill_table_dedup.py --config config/experiment_configuration.yml --existing 100000 --new 100000
+"""
+import argparse
+import logging
+import os
+import time
+
+from py_experimenter.experimenter import PyExperimenter
+
+
+def run_benchmark(arguments: argparse.Namespace) -> dict:
+    experimenter = PyExperimenter(
+        experiment_configuration_file_path=arguments.config,
+        database_credential_file_path=arguments.credentials,
+        table_name=arguments.table,
+        use_codecarbon=False,
+        logger_name="py-experimenter-benchmark",
+        log_level=logging.WARNING,
+    )
+    experimenter.delete_table()
+    keyfield_names = list(experimenter.config.database_configuration.keyfields.keys())
+
+    def create_rows(start: int, stop: int):
+        return [{keyfield_name: index for keyfield_name in keyfield_names} for index in range(start, stop)]
+
+    experimenter.fill_table_with_rows(create_rows(0, arguments.existing))
+
+    db_connector = experimenter.db_connector
+    combinations = create_rows(arguments.existing - arguments.new // 2, arguments.existing + arguments.new - arguments.new // 2)
+
+    start = time.perf_counter()
+    existing_rows = db_connector._get_existing_rows(keyfield_names)
+    duplicates = sum(db_connector._check_combination_in_existing_rows(combination, existing_rows) for combination in combinations)
+    dedup_duration = time.perf_counter() - start
+
+    start = time.perf_counter()
+    experimenter.fill_table_with_rows(combinations)
+    fill_duration = time.perf_counter() - start
+
+    print(f"existing rows: {arguments.existing}, new combinations: {arguments.new}, duplicates: {duplicates}")
+    print(f"deduplication: {dedup_duration:.3f} s | fill_table: {fill_duration:.3f} s")
+    return {"deduplication_seconds": dedup_duration, "fill_table_seconds": fill_duration, "duplicates": duplicates}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--config", default=os.path.join("config", "experiment_configuration.yml"), help="Experiment configuration file.")
+    parser.add_argument("--credentials", default=os.path.join("config", "database_credentials.yml"), help="Database credential file.")
+    parser.add_argument("--table", default="benchmark_fill_table_dedup", help="Table used for the benchmark. It is dropped before each run!")
+    parser.add_argument("--existing", type=int, default=20000, help="Number of rows existing before the benchmarked fill.")
+    parser.add_argument("--new", type=int, default=20000, help="Number of combinations given to the benchmarked fill.")
+    run_benchmark(parser.parse_args())
@@ -0,0 +1,112 @@
+import atexit
+import os
+import queue
+import threading
+import weakref
+from typing import Any, Callable, List, Tuple
+
+from py_experimenter.exceptions import AsyncWriteError
+
+# Writers of this process, whose pending writes are completed when the process exits
+_async_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_async_writers() -> None:
+    for async_writer in list(_async_writers):
+        async_writer.close()
+
+
+class AsyncWriter:
+    """
+    Per-process writer, which executes database writes in a background thread in the order they were submitted, such
+    that experiments do not wait for the database. If `max_pending` writes are pending, submitting further writes
+    blocks until the background thread caught up. Errors of the background thread are raised by `wait`. Like the
+    `ConnectionPool`, the writer is fork-safe and pickled without its queue and thread.
+    """
+
+    _stop = object()
+
+    def __init__(self, execute_queries: Callable[[List[Tuple[str, List[Any]]]], None], max_pending: int):
+        """
+        :param execute_queries: Function executing a list of queries within a single transaction.
+        :type execute_queries: Callable[[List[Tuple[str, List[Any]]]], None]
+        :param max_pending: Maximum number of submitted writes that are not yet executed.
+        :type max_pending: int
+        """
+        self._execute_queries = execute_queries
+        self.max_pending = max_pending
+        self._initialize_process_state()
+
+    def _initialize_process_state(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(self.max_pending)
+        self._thread = None
+        self._errors = list()
+
+    def _check_process(self) -> None:
+        if self._pid != os.getpid():
+            # The thread of the parent process does not exist in a child process
+            self._initialize_process_state()
+
+    def submit(self, queries: List[Tuple[str, List[Any]]]) -> None:
+        """
+        Submits queries, which are executed within a single transaction by the background thread. Blocks if the
+        maximum number of pending writes is reached.
+        """
+        self._check_process()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="AsyncWriter", daemon=True)
+                self._thread.start()
+                _async_writers.add(self)
+        self._queue.put(queries)
+
+    def wait(self) -> None:
+        """
+        Blocks until all submitted writes are executed.
+
+        :raises AsyncWriteError: If writes submitted since the last call failed.
+        """
+        self._check_process()
+        self._queue.join()
+        with self._lock:
+            errors, self._errors = self._errors, list()
+        if errors:
+            raise AsyncWriteError(f"{len(errors)} asynchronous writes failed, the first one with: {errors[0]}") from errors[0]
+
+    def close(self) -> None:
+        """
+        Executes all pending writes and stops the background thread. A new thread is started by the next `submit`.
+        """
+        self._check_process()
+        with self._lock:
+            thread, self._thread = self._thread, None
+            _async_writers.discard(self)
+        if thread is not None:
+            self._queue.put(self._stop)
+            thread.join()
+
+    def _run(self) -> None:
+        while True:
+            queries = self._queue.get()
+            try:
+                if queries is self._stop:
+                    return
+                self._execute_queries(queries)
+            except Exception as err:
+                with self._lock:
+                    self._errors.append(err)
+            finally:
+                self._queue.task_done()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for attribute in ("_lock", "_queue", "_thread", "_errors"):
+            del state[attribute]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._initialize_process_state()
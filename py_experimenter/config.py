@@ -1,7 +1,7 @@
 import logging
 from abc import ABC, abstractclassmethod
 from logging import Logger
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Dict, Iterator, List, Tuple, Union
 
 import numpy as np
 import omegaconf
@@ -49,6 +49,16 @@ class DatabaseCfg(Cfg):
         resultfields: Dict[str, str],
         logtables: Dict[str, Dict[str, str]],
         logger: logging.Logger,
+        unique_keyfields: bool = False,
+        insert_chunk_size: int = 1000,
+        random_priority_seed: int = None,
+        connection_pool_size: int = 4,
+        connection_idle_timeout: float = 300,
+        result_flush_interval: float = None,
+        result_flush_size: int = 100,
+        async_writes: bool = False,
+        async_write_queue_size: int = 1000,
+        write_spool_directory: str = None,
     ) -> None:
         """
         The constructor of the DatabaseCfg class.
@@ -68,6 +78,26 @@ class DatabaseCfg(Cfg):
         :param logtables: Definition of table `log_tables`. Each `log_table` is a dictionary with the table name as key and the table definition as value,
             where the table definition is a list of tuples of the field name and the field type.
         :type logtables: Dict[str, Dict[str,str]]
+        :param unique_keyfields: Whether the uniqueness of the keyfield values of experiments is enforced by the database.
+        :type unique_keyfields: bool
+        :param insert_chunk_size: Maximum number of experiments inserted into the table with a single statement and transaction.
+        :type insert_chunk_size: int
+        :param random_priority_seed: If given, a random priority is precomputed from this seed for each experiment, which is used to pull experiments in random order.
+        :type random_priority_seed: int
+        :param connection_pool_size: Maximum number of idle MySQL connections kept open per process for reuse. If 0, a new connection is opened for every operation.
+        :type connection_pool_size: int
+        :param connection_idle_timeout: Number of seconds after which idle MySQL connections are closed instead of being reused.
+        :type connection_idle_timeout: float
+        :param result_flush_interval: If given, results are buffered and written to the database at most this number of seconds after they were processed.
+        :type result_flush_interval: float
+        :param result_flush_size: Number of buffered result updates after which the results are written to the database, if results are buffered.
+        :type result_flush_size: int
+        :param async_writes: Whether results, logs and emissions are written by a background thread of each process, such that experiments do not wait for the database.
+        :type async_writes: bool
+        :param async_write_queue_size: Maximum number of pending writes per process, after which experiments wait for the background thread.
+        :type async_write_queue_size: int
+        :param write_spool_directory: If given, writes failing due to an unreachable database are spooled to files in this directory and replayed later.
+        :type write_spool_directory: str
         """
         self.provider = provider
         self.use_ssh_tunnel = use_ssh_tunnel
@@ -77,6 +107,16 @@ class DatabaseCfg(Cfg):
         self.keyfields = keyfields
         self.resultfields = resultfields
         self.logtables = logtables
+        self.unique_keyfields = unique_keyfields
+        self.insert_chunk_size = insert_chunk_size
+        self.random_priority_seed = random_priority_seed
+        self.connection_pool_size = connection_pool_size
+        self.connection_idle_timeout = connection_idle_timeout
+        self.result_flush_interval = result_flush_interval
+        self.result_flush_size = result_flush_size
+        self.async_writes = async_writes
+        self.async_write_queue_size = async_write_queue_size
+        self.write_spool_directory = write_spool_directory
 
         self.logger = logger
 
@@ -97,6 +137,24 @@ class DatabaseCfg(Cfg):
 
         logtables = DatabaseCfg._extract_logtables(table_name, database_config, logger)
 
+        # Optional unique_keyfields
+        unique_keyfields = table_config["unique_keyfields"] if "unique_keyfields" in table_config else False
+        # Optional random_priority_seed
+        random_priority_seed = table_config["random_priority_seed"] if "random_priority_seed" in table_config else None
+        # Optional buffering of results
+        result_flush_interval = table_config["result_flush_interval"] if "result_flush_interval" in table_config else None
+        result_flush_size = table_config["result_flush_size"] if "result_flush_size" in table_config else 100
+        # Optional insert_chunk_size
+        insert_chunk_size = database_config["insert_chunk_size"] if "insert_chunk_size" in database_config else 1000
+        # Optional connection pool settings
+        connection_pool_size = database_config["connection_pool_size"] if "connection_pool_size" in database_config else 4
+        connection_idle_timeout = database_config["connection_idle_timeout"] if "connection_idle_timeout" in database_config else 300
+        # Optional asynchronous writes
+        async_writes = database_config["async_writes"] if "async_writes" in database_config else False
+        async_write_queue_size = database_config["async_write_queue_size"] if "async_write_queue_size" in database_config else 1000
+        # Optional spooling of writes failing due to an unreachable database
+        write_spool_directory = database_config["write_spool_directory"] if "write_spool_directory" in database_config else None
+
         return DatabaseCfg(
             provider,
             use_ssh_tunnel,
@@ -107,6 +165,16 @@ class DatabaseCfg(Cfg):
             resultfields,
             logtables,
             logger,
+            unique_keyfields,
+            insert_chunk_size,
+            random_priority_seed,
+            connection_pool_size,
+            connection_idle_timeout,
+            result_flush_interval,
+            result_flush_size,
+            async_writes,
+            async_write_queue_size,
+            write_spool_directory,
         )
 
     @staticmethod
@@ -201,11 +269,13 @@ class DatabaseCfg(Cfg):
             logtables = dict()
             return logtables
 
-    def get_experiment_configuration(self):
+    def get_experiment_configuration(self) -> Iterator[Dict[str, Any]]:
+        """
+        Returns a lazy iterator over the cartesian product of the values of all keyfields.
+        """
         keyfield_names = [keyfield.name for keyfield in self.keyfields.values()]
         parameters = {keyfield.name: keyfield.values for keyfield in self.keyfields.values()}
-        config = utils.combine_fill_table_parameters(keyfield_names, parameters, [])
-        return config
+        return utils.iterate_fill_table_parameters(keyfield_names, parameters, [])
 
     def valid(self) -> bool:
         if self.provider not in ["sqlite", "mysql"]:
@@ -223,6 +293,38 @@ class DatabaseCfg(Cfg):
         if not isinstance(self.result_timestamps, bool):
             self.logger.error("Result timestamps must be a boolean")
             return False
+        if not isinstance(self.unique_keyfields, bool):
+            self.logger.error("Unique keyfields must be a boolean")
+            return False
+        if isinstance(self.insert_chunk_size, bool) or not isinstance(self.insert_chunk_size, int) or self.insert_chunk_size < 1:
+            self.logger.error("Insert chunk size must be a positive integer")
+            return False
+        if self.random_priority_seed is not None and (isinstance(self.random_priority_seed, bool) or not isinstance(self.random_priority_seed, int)):
+            self.logger.error("Random priority seed must be an integer")
+            return False
+        if isinstance(self.connection_pool_size, bool) or not isinstance(self.connection_pool_size, int) or self.connection_pool_size < 0:
+            self.logger.error("Connection pool size must be a non-negative integer")
+            return False
+        if isinstance(self.connection_idle_timeout, bool) or not isinstance(self.connection_idle_timeout, (int, float)) or self.connection_idle_timeout < 0:
+            self.logger.error("Connection idle timeout must be a non-negative number")
+            return False
+        if self.result_flush_interval is not None and (
+            isinstance(self.result_flush_interval, bool) or not isinstance(self.result_flush_interval, (int, float)) or self.result_flush_interval <= 0
+        ):
+            self.logger.error("Result flush interval must be a positive number")
+            return False
+        if isinstance(self.result_flush_size, bool) or not isinstance(self.result_flush_size, int) or self.result_flush_size < 1:
+            self.logger.error("Result flush size must be a positive integer")
+            return False
+        if not isinstance(self.async_writes, bool):
+            self.logger.error("Async writes must be a boolean")
+            return False
+        if isinstance(self.async_write_queue_size, bool) or not isinstance(self.async_write_queue_size, int) or self.async_write_queue_size < 1:
+            self.logger.error("Async write queue size must be a positive integer")
+            return False
+        if self.write_spool_directory is not None and not isinstance(self.write_spool_directory, str):
+            self.logger.error("Write spool directory must be a string")
+            return False
 
         if not isinstance(self.keyfields, dict):
             self.logger.error("Keyfields must be a dictionary")
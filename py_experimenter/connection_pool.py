@@ -0,0 +1,121 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Tuple
+
+
+class ConnectionPool:
+    """
+    Per-process pool of idle database connections, which allows reusing connections instead of opening a new connection
+    for every database operation. The pool is thread-safe and fork-safe: Connections inherited from a parent process are
+    never reused in a child process, as they share the same socket. When pickled, e.g. to be sent to `joblib` workers,
+    the pool is transferred without its connections.
+    """
+
+    def __init__(
+        self,
+        create_connection: Callable[[], Any],
+        is_healthy: Callable[[Any, float], bool],
+        reset_connection: Callable[[Any], None],
+        max_size: int,
+        idle_timeout: float,
+    ):
+        """
+        :param create_connection: Function opening a new connection.
+        :type create_connection: Callable[[], Any]
+        :param is_healthy: Function checking whether a connection, which has been idle for the given number of seconds,
+            can still be used.
+        :type is_healthy: Callable[[Any, float], bool]
+        :param reset_connection: Function discarding uncommitted changes of a released connection. If it raises, the
+            connection is closed instead of being reused.
+        :type reset_connection: Callable[[Any], None]
+        :param max_size: Maximum number of idle connections kept open. If 0, connections are never reused.
+        :type max_size: int
+        :param idle_timeout: Number of seconds after which idle connections are closed instead of being reused.
+        :type idle_timeout: float
+        """
+        self._create_connection = create_connection
+        self._is_healthy = is_healthy
+        self._reset_connection = reset_connection
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._initialize_process_state()
+
+    def _initialize_process_state(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._idle_connections: Deque[Tuple[Any, float]] = deque()
+
+    def _check_process(self) -> None:
+        if self._pid != os.getpid():
+            # Connections of the parent process must neither be used nor closed, as closing would also end the session
+            # of the parent process
+            self._initialize_process_state()
+
+    def acquire(self) -> Any:
+        """
+        Returns an idle connection if a healthy one is available, otherwise a new connection is opened.
+        """
+        self._check_process()
+        while True:
+            with self._lock:
+                if not self._idle_connections:
+                    break
+                # Reuse the most recently released connection, such that surplus connections time out
+                connection, released_at = self._idle_connections.pop()
+
+            idle_time = time.monotonic() - released_at
+            if idle_time <= self.idle_timeout and self._is_healthy(connection, idle_time):
+                return connection
+            self._close(connection)
+        return self._create_connection()
+
+    def release(self, connection: Any) -> None:
+        """
+        Returns a connection to the pool. Uncommitted changes are discarded, and the connection is closed if the pool
+        is already full.
+        """
+        self._check_process()
+        try:
+            self._reset_connection(connection)
+        except Exception:
+            self._close(connection)
+            return
+
+        with self._lock:
+            if len(self._idle_connections) < self.max_size:
+                self._idle_connections.append((connection, time.monotonic()))
+                return
+        self._close(connection)
+
+    def close(self) -> None:
+        """
+        Closes all idle connections of the pool.
+        """
+        self._check_process()
+        with self._lock:
+            idle_connections = list(self._idle_connections)
+            self._idle_connections.clear()
+        for connection, _ in idle_connections:
+            self._close(connection)
+
+    def __len__(self) -> int:
+        return len(self._idle_connections)
+
+    @staticmethod
+    def _close(connection: Any) -> None:
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        del state["_idle_connections"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._initialize_process_state()
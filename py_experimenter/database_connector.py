@@ -1,9 +1,14 @@
 import abc
+import hashlib
+import json
 import logging
-from functools import reduce
-from operator import concat
-from typing import Any, Dict, List, Optional, Tuple, Union
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 from py_experimenter import utils
@@ -20,6 +25,17 @@ from py_experimenter.experiment_status import ExperimentStatus
 
 
 class DatabaseConnector(abc.ABC):
+    # Columns added to the experiment table once experiments are executed with leases
+    _lease_columns = {"lease_owner": "VARCHAR(255)", "lease_expiry": "DATETIME"}
+    # SQL aggregate functions by name, backends lacking one of them register it on their connections
+    _aggregate_functions = {"count": "COUNT", "sum": "SUM", "mean": "AVG", "min": "MIN", "max": "MAX", "std": "STDDEV_SAMP"}
+    # Column added to the experiment table once it is mirrored, holding the time of the last change of each experiment
+    _last_modified_column = "last_modified"
+    # Monotonic time of the last reset of expired leases by this process
+    _last_lease_reclaim = float("-inf")
+    # Clause appended to queries selecting rows that are updated within the same transaction
+    _lock_rows_clause = ""
+
     def __init__(self, database_configuration: DatabaseCfg, use_codecarbon: bool, logger: logging.Logger):
         self.logger = logger
         self.database_configuration = database_configuration
@@ -41,11 +57,17 @@ class DatabaseConnector(abc.ABC):
         except Exception as e:
             raise DatabaseConnectionError(f"error \n{e}\n raised when closing connection to database.")
 
+    def close_connections(self) -> None:
+        """
+        Closes all connections that are kept open by this process for reuse.
+        """
+        pass
+
     def commit(self, connection) -> None:
         try:
             connection.commit()
         except Exception as e:
-            raise DatabaseConnectionError(f"error \n{e}\n raised when committing to database.")
+            raise DatabaseConnectionError(f"error \n{e}\n raised when committing to database.") from e
 
     def execute(self, cursor, sql_statement, values=None) -> None:
         try:
@@ -56,13 +78,13 @@ class DatabaseConnector(abc.ABC):
                 self.logger.debug(f"Executing sql statement: {sql_statement} with prepared statement values: {values}")
                 cursor.execute(sql_statement, values)
         except Exception as e:
-            raise DatabaseConnectionError(f"error \n{e}\n raised when executing sql statement.")
+            raise DatabaseConnectionError(f"error \n{e}\n raised when executing sql statement.") from e
 
     def cursor(self, connection):
         try:
             return connection.cursor()
         except Exception as e:
-            raise DatabaseConnectionError(f"error \n{e}\n raised when creating cursor.")
+            raise DatabaseConnectionError(f"error \n{e}\n raised when creating cursor.") from e
 
     def fetchall(self, cursor):
         try:
@@ -81,8 +103,25 @@ class DatabaseConnector(abc.ABC):
                     "Keyfields or resultfields from the configuration do not match columns in the existing "
                     "table. Please change your configuration or delete the table in your database."
                 )
+            # Optional columns are derived when inserting experiments, so they cannot be added to existing rows later
+            missing_columns = [column for column in self._get_optional_columns() if column not in self.get_structure_from_table(cursor)]
+            if missing_columns:
+                raise TableHasWrongStructureError(
+                    f"The existing table has no column {', '.join(missing_columns)}, which is required by the configuration. "
+                    "The according option has to be enabled before creating the table, so please change your configuration "
+                    "or delete the table in your database."
+                )
+            # Without the unique index, duplicates would not be skipped by the database on insertion
+            table_name = self.database_configuration.table_name
+            if self.database_configuration.unique_keyfields and not self._index_exists(cursor, table_name, f"{table_name}_keyfields_unique_idx"):
+                raise TableHasWrongStructureError(
+                    f"The existing table has no unique index {table_name}_keyfields_unique_idx, which is required by `unique_keyfields`. "
+                    "Please add it with `ensure_indexes()` if the existing experiments are unique, disable `unique_keyfields` "
+                    "or delete the table in your database."
+                )
         else:
             columns = self._compute_columns(self.database_configuration.keyfields, self.database_configuration.resultfields)
+            columns.update(self._get_optional_columns())
             self._create_table(cursor, columns, self.database_configuration.table_name)
 
             for logtable_name, logtable_columns in self.database_configuration.logtables.items():
@@ -92,12 +131,107 @@ class DatabaseConnector(abc.ABC):
                 codecarbon_columns = utils.extract_codecarbon_columns()
                 self._create_table(cursor, codecarbon_columns, f"{self.database_configuration.table_name}_codecarbon", table_type="codecarbon")
 
+            for table_name, index_name, index_columns, unique in self._get_indexes():
+                self._create_index(cursor, table_name, index_name, index_columns, unique)
+
         self.close_connection(connection)
 
+    def ensure_indexes(self) -> None:
+        """
+        Adds all missing indexes to the already existing experiment, log and codecarbon tables. Existing indexes and
+        table contents are left untouched.
+        """
+        connection = self.connect()
+        cursor = self.cursor(connection)
+        try:
+            for table_name, index_name, index_columns, unique in self._get_indexes():
+                if not self._table_exists(cursor, table_name) or self._index_exists(cursor, table_name, index_name):
+                    continue
+                optional_columns = [column for column in index_columns if column in self._get_optional_columns()]
+                missing_columns = [column for column in optional_columns if column not in self.get_structure_from_table(cursor)]
+                if missing_columns:
+                    self.logger.warning(
+                        f"Index {index_name} cannot be created, as table {table_name} has no column {', '.join(missing_columns)}. "
+                        "The according option has to be enabled before creating the table."
+                    )
+                    continue
+                self._create_index(cursor, table_name, index_name, index_columns, unique)
+                self.logger.info(f"Created index {index_name} on table {table_name}.")
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+
+    def _get_indexes(self) -> List[Tuple[str, str, List[str], bool]]:
+        """
+        Returns the definitions of all indexes of the experiment table and its log and codecarbon tables. Open experiments
+        are pulled by their `status` and ordered by `ID`, and experiments finished recently are counted by their `status`
+        and `end_date`, while log and codecarbon entries are accessed by `experiment_id`. If `unique_keyfields` is
+        enabled, a unique index over the keyfields (or their hash) is added. If a `random_priority_seed` is given, open
+        experiments are pulled in random order via an index on `status` and `random_priority`.
+
+        :return: List of tuples containing the table name, the index name, the indexed columns and whether the index is unique.
+        :rtype: List[Tuple[str, str, List[str], bool]]
+        """
+        table_name = self.database_configuration.table_name
+        indexes = [
+            (table_name, f"{table_name}_status_id_idx", ["status", "ID"], False),
+            (table_name, f"{table_name}_status_end_date_idx", ["status", "end_date"], False),
+        ]
+        if self.database_configuration.unique_keyfields:
+            unique_columns = ["keyfield_hash"] if self._uses_keyfield_hash() else list(self.database_configuration.keyfields.keys())
+            indexes.append((table_name, f"{table_name}_keyfields_unique_idx", unique_columns, True))
+        if self._uses_random_priority():
+            indexes.append((table_name, f"{table_name}_status_random_priority_idx", ["status", "random_priority", "ID"], False))
+        for logtable_name in self.database_configuration.logtables.keys():
+            indexes.append((logtable_name, f"{logtable_name}_experiment_id_idx", ["experiment_id"], False))
+        if self.use_codecarbon:
+            indexes.append((f"{table_name}_codecarbon", f"{table_name}_codecarbon_experiment_id_idx", ["experiment_id"], False))
+        return indexes
+
+    def _create_index(self, cursor, table_name: str, index_name: str, columns: List[str], unique: bool = False) -> None:
+        index_type = "UNIQUE INDEX" if unique else "INDEX"
+        try:
+            self.execute(cursor, f"CREATE {index_type} {index_name} ON {table_name} ({', '.join(columns)});")
+        except Exception as err:
+            raise CreatingTableError(f"Error when creating index {index_name}: {err}")
+
+    def _get_optional_columns(self) -> Dict[str, str]:
+        """
+        Returns the columns of the experiment table that only exist depending on the configuration. They are appended
+        after all other columns and derived from the keyfield values when inserting experiments.
+        """
+        optional_columns = dict()
+        if self._uses_keyfield_hash():
+            optional_columns["keyfield_hash"] = "CHAR(64)"
+        if self._uses_random_priority():
+            optional_columns["random_priority"] = "BIGINT"
+        return optional_columns
+
+    def _add_optional_columns(self, combination: Dict[str, Any], keyfield_values: Tuple) -> Dict[str, Any]:
+        if self._uses_keyfield_hash():
+            combination["keyfield_hash"] = self._hash_keyfield_tuple(keyfield_values)
+        if self._uses_random_priority():
+            combination["random_priority"] = self._get_random_priority(keyfield_values)
+        return combination
+
+    def _uses_random_priority(self) -> bool:
+        return self.database_configuration.random_priority_seed is not None
+
+    def _uses_keyfield_hash(self) -> bool:
+        """
+        Returns whether the uniqueness of keyfields is enforced via a hash column instead of an index over the keyfields
+        themselves, which is necessary if the keyfields cannot be indexed by the database.
+        """
+        return False
+
     @abc.abstractmethod
     def _table_exists(self, cursor, table_name: str):
         pass
 
+    @abc.abstractmethod
+    def _index_exists(self, cursor, table_name: str, index_name: str) -> bool:
+        pass
+
     @staticmethod
     def _compute_columns(keyfields: Dict["str", Keyfield], resultfields: Dict["str", "str"]) -> Dict["str", "str"]:
         keyfields = {value.name: value.dtype for value in keyfields.values()}
@@ -123,6 +257,10 @@ class DatabaseConnector(abc.ABC):
         columns.remove("machine")
         columns.remove("end_date")
         columns.remove("error")
+        # Columns only existing depending on the configuration
+        for optional_column in ("keyfield_hash", "random_priority", *self._lease_columns.keys(), self._last_modified_column):
+            if optional_column in columns:
+                columns.remove(optional_column)
         return columns
 
     def _create_table(self, cursor, columns: List[Tuple["str"]], table_name: str, table_type: str = "standard"):
@@ -154,46 +292,108 @@ class DatabaseConnector(abc.ABC):
     def _table_has_correct_structure(self, cursor, typed_fields):
         pass
 
-    def fill_table(self, combinations) -> None:
+    def fill_table(self, combinations: Iterable[Dict[str, Any]]) -> None:
+        """
+        Inserts the given combinations that do not already exist into the experiment table. The combinations are
+        consumed lazily and written in chunks of `insert_chunk_size` rows, such that large grids can be given as
+        iterators without materializing them. Note that unless `unique_keyfields` is enabled, the keyfield values of all
+        existing and inserted experiments are kept in memory to skip duplicates, so memory still grows with the grid.
+
+        :param combinations: The keyfield values of the experiments to insert.
+        :type combinations: Iterable[Dict[str, Any]]
+        :raises EmptyFillDatabaseCallError: If no combination is given.
+        """
         self.logger.debug("Fill table with parameters.")
 
-        if len(combinations) == 0:
+        combinations = iter(combinations)
+        first_combination = next(combinations, None)
+        if first_combination is None:
             raise EmptyFillDatabaseCallError("No combinations to execute found.")
+        combinations = chain([first_combination], combinations)
 
-        column_names = list(self.database_configuration.keyfields.keys())
-        self.logger.debug("Getting existing rows.")
-        existing_rows = self._get_existing_rows(column_names)
+        unique_keyfields = self.database_configuration.unique_keyfields
+        if unique_keyfields:
+            # Existing experiments, as well as duplicates within the given combinations, are skipped by the database on insertion
+            existing_rows = None
+        else:
+            self.logger.debug("Getting existing rows.")
+            existing_rows = self._get_existing_rows(list(self.database_configuration.keyfields.keys()))
         time = utils.get_timestamp_representation()
 
-        rows_skipped = 0
+        n_combinations = 0
+        rows_added = 0
         rows = []
+
+        def write_rows() -> int:
+            self.logger.debug(f"Now adding {len(rows)} rows to database.")
+            if unique_keyfields:
+                return self._write_to_database(rows, ignore_duplicates=True)
+            self._write_to_database(rows)
+            return len(rows)
+
         self.logger.debug("Checking which of the experiments to be inserted already exist.")
         for combination in combinations:
-            if self._check_combination_in_existing_rows(combination, existing_rows):
-                rows_skipped += 1
-                continue
+            n_combinations += 1
+            keyfield_values = self._get_keyfield_tuple(combination)
+            if existing_rows is not None:
+                if keyfield_values in existing_rows:
+                    continue
+                # Also skip duplicates within the given combinations
+                existing_rows.add(keyfield_values)
             combination = self._add_metadata(combination, time)
+            combination = self._add_optional_columns(combination, keyfield_values)
             rows.append(combination)
 
+            if len(rows) >= self.database_configuration.insert_chunk_size:
+                rows_added += write_rows()
+                rows = []
+                # The final chunk is reported by the summary below
+                self.logger.info(
+                    f"Inserted {rows_added} rows into {self.database_configuration.table_name} so far, {n_combinations} combinations processed."
+                )
+
         if rows:
-            self.logger.debug(f"Now adding {len(rows)} rows to database. {rows_skipped} rows were skipped.")
-            self._write_to_database(rows)
-            self.logger.info(f"{len(rows)} rows successfully added to database. {rows_skipped} rows were skipped.")
-        else:
-            self.logger.info(f"No rows to add. All the {len(combinations)} experiments already exist.")
+            rows_added += write_rows()
 
-    def add_experiment(self, combination: Dict[str, str]) -> None:
-        existing_rows = self._get_existing_rows(list(self.database_configuration.keyfields.keys()))
-        if self._check_combination_in_existing_rows(combination, existing_rows):
-            self.logger.info("Experiment already exists in database. Skipping.")
-            return
+        if rows_added:
+            rows_skipped = n_combinations - rows_added
+            self.logger.info(f"{rows_added} rows successfully added to database. {rows_skipped} rows were skipped.")
+        else:
+            self.logger.info(f"No rows to add. All the {n_combinations} experiments already exist.")
+
+    def add_experiment(self, combination: Dict[str, str], metadata: Optional[Dict[str, Any]] = None) -> Optional[int]:
+        """
+        Adds the experiment with the given keyfield values to the table and directly sets its status to `running`.
+
+        :param combination: The keyfield values of the experiment.
+        :type combination: Dict[str, str]
+        :param metadata: Further column values, e.g. `name` and `machine`, inserted together with the experiment,
+            defaults to None.
+        :type metadata: Optional[Dict[str, Any]], optional
+        :return: The id of the added experiment, or None if the experiment already exists.
+        :rtype: Optional[int]
+        """
+        unique_keyfields = self.database_configuration.unique_keyfields
+        if not unique_keyfields:
+            existing_rows = self._get_existing_rows(list(self.database_configuration.keyfields.keys()))
+            if self._check_combination_in_existing_rows(combination, existing_rows):
+                self.logger.info("Experiment already exists in database. Skipping.")
+                return
 
         connection = self.connect()
         try:
             cursor = self.cursor(connection)
-            combination = self._add_metadata(combination, utils.get_timestamp_representation(), ExperimentStatus.RUNNING.value)
-            insert_query = self._get_insert_query(self.database_configuration.table_name, list(combination.keys()))
+            keyfield_values = self._get_keyfield_tuple(combination)
+            # The row is built from a copy, as the given keyfield values are passed on to the experiment function
+            combination = self._add_metadata(dict(combination), utils.get_timestamp_representation(), ExperimentStatus.RUNNING.value)
+            combination = self._add_optional_columns(combination, keyfield_values)
+            combination = {**combination, **(metadata or {})}
+            insert_query = self._get_insert_query(self.database_configuration.table_name, list(combination.keys()), ignore_duplicates=unique_keyfields)
             self.execute(cursor, insert_query, list(combination.values()))
+            if unique_keyfields and cursor.rowcount == 0:
+                self.commit(connection)
+                self.logger.info("Experiment already exists in database. Skipping.")
+                return
             cursor.execute(f"SELECT {self._last_insert_id_string()};")
             experiment_id = cursor.fetchone()[0]
             self.commit(connection)
@@ -203,8 +403,9 @@ class DatabaseConnector(abc.ABC):
             self.close_connection(connection)
         return experiment_id
 
-    def _get_insert_query(self, table_name: str, columns: List[str]) -> str:
-        return f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join([self._prepared_statement_placeholder] * len(columns))})"
+    def _get_insert_query(self, table_name: str, columns: List[str], ignore_duplicates: bool = False) -> str:
+        insert_statement = self._insert_ignore_statement if ignore_duplicates else "INSERT"
+        return f"{insert_statement} INTO {table_name} ({', '.join(columns)}) VALUES ({', '.join([self._prepared_statement_placeholder] * len(columns))})"
 
     @abc.abstractmethod
     def _last_insert_id_string(self) -> str:
@@ -220,73 +421,371 @@ class DatabaseConnector(abc.ABC):
         combination["status"] = status
         return combination
 
-    def _check_combination_in_existing_rows(self, combination, existing_rows) -> bool:
-        if combination in existing_rows:
-            return True
-        return False
+    def _check_combination_in_existing_rows(self, combination: Dict[str, Any], existing_rows: Set[Tuple]) -> bool:
+        return self._get_keyfield_tuple(combination) in existing_rows
 
-    @abc.abstractmethod
-    def _get_existing_rows(self, column_names) -> List[str]:
-        pass
+    def _get_existing_rows(self, column_names: List[str]) -> Set[Tuple]:
+        """
+        Returns the normalized keyfield values of all rows of the experiment table, such that the existence of a
+        combination can be checked in constant time with `_get_keyfield_tuple`.
+
+        :param column_names: The names of the keyfield columns in the order of the keyfields of the configuration.
+        :type column_names: List[str]
+        :return: Set of tuples with the normalized keyfield values of each row.
+        :rtype: Set[Tuple]
+        """
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            self.execute(cursor, f"SELECT {','.join(column_names)} FROM {self.database_configuration.table_name}")
+            existing_rows = self.fetchall(cursor)
+        finally:
+            self.close_connection(connection)
+        return {self._normalize_keyfield_tuple(existing_row) for existing_row in existing_rows}
+
+    @staticmethod
+    def _hash_keyfield_tuple(keyfield_values: Tuple) -> str:
+        return hashlib.sha256(json.dumps(keyfield_values, default=str).encode("utf-8")).hexdigest()
+
+    def _get_random_priority(self, keyfield_values: Tuple) -> int:
+        """
+        Derives the random priority of an experiment from the `random_priority_seed` and its keyfield values, such that
+        the random order of experiments is reproducible and independent of the order in which they were inserted.
+        """
+        seeded_values = (self.database_configuration.random_priority_seed, *keyfield_values)
+        # 60 bits fit into a signed BIGINT in both MySQL and SQLite
+        return int(self._hash_keyfield_tuple(seeded_values)[:15], 16)
+
+    def _get_keyfield_tuple(self, combination: Dict[str, Any]) -> Tuple:
+        return self._normalize_keyfield_tuple([combination[keyfield_name] for keyfield_name in self.database_configuration.keyfields.keys()])
+
+    def _normalize_keyfield_tuple(self, values: Sequence[Any]) -> Tuple:
+        return tuple(
+            self._normalize_keyfield_value(value, keyfield.dtype) for value, keyfield in zip(values, self.database_configuration.keyfields.values())
+        )
+
+    @staticmethod
+    def _normalize_keyfield_value(value: Any, dtype: str) -> Any:
+        """
+        Normalizes a keyfield value, such that values given in Python and the according values returned by the database
+        are equal and have the same hash. E.g. numpy scalars are converted to Python scalars, booleans to integers, and values
+        of textual keyfields to strings.
+
+        :param value: The keyfield value.
+        :type value: Any
+        :param dtype: The type of the keyfield as given in the experiment configuration.
+        :type dtype: str
+        :return: The normalized value.
+        :rtype: Any
+        """
+        if value is None:
+            return None
+        if isinstance(value, np.generic):
+            value = value.item()
+        if isinstance(value, bytes):
+            value = value.decode()
+        if isinstance(value, date):
+            value = str(value)
+
+        if dtype.split("(")[0].strip().upper() in ("CHAR", "VARCHAR", "TINYTEXT", "TEXT", "MEDIUMTEXT", "LONGTEXT"):
+            return str(value)
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, Decimal):
+            value = float(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
 
     def get_experiment_configuration(self, random_order: bool) -> Tuple[int, Dict[str, Any]]:
+        return self.get_experiment_configurations(1, random_order)[0]
+
+    def get_experiment_configurations(
+        self,
+        n: int,
+        random_order: bool,
+        lease_owner: Optional[str] = None,
+        lease_duration: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Claims up to `n` open experiments within a single transaction, i.e. their status is changed from `created` to `running`.
+        If a `lease_owner` is given, the claimed experiments are leased to it for `lease_duration` seconds. Beforehand,
+        `running` experiments whose lease expired are reset to `created` at most once every `lease_duration` seconds per
+        process, so that they can be claimed again.
+
+        :param n: The maximum number of experiments to claim.
+        :type n: int
+        :param random_order: If True, the experiments are claimed in random order, otherwise ordered by their id.
+        :type random_order: bool
+        :param lease_owner: Identifier of the claiming worker, defaults to None.
+        :type lease_owner: Optional[str], optional
+        :param lease_duration: Number of seconds until the leases expire if they are not renewed, defaults to None.
+        :type lease_duration: Optional[float], optional
+        :param metadata: Further column values, e.g. `name` and `machine`, set by the same statement claiming the
+            experiments, defaults to None.
+        :type metadata: Optional[Dict[str, Any]], optional
+        :raises NoExperimentsLeftException: If there are no open experiments left.
+        :raises DatabaseConnectionError: If an error occurred during the connection to the database.
+        :return: List of tuples containing the id and the keyfield values of each claimed experiment.
+        :rtype: List[Tuple[int, Dict[str, Any]]]
+        """
+        if lease_owner is not None:
+            self._reclaim_expired_leases(lease_duration)
         try:
-            experiment_id, description, values = self._pull_open_experiment(random_order)
-        except IndexError as e:
-            raise NoExperimentsLeftException("No experiments left to execute")
+            experiments = self._pull_open_experiments(n, random_order, lease_owner, lease_duration, metadata)
         except Exception as e:
             raise DatabaseConnectionError(f"error \n {e} raised. \n Please check if fill_table() was called correctly.")
 
-        return experiment_id, dict(zip([i[0] for i in description], *values))
+        if not experiments:
+            raise NoExperimentsLeftException("No experiments left to execute")
+        return experiments
+
+    @abc.abstractmethod
+    def _pull_open_experiments(
+        self,
+        n: int,
+        random_order: bool,
+        lease_owner: Optional[str] = None,
+        lease_duration: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        pass
+
+    def _get_claim_assignments(
+        self, lease_owner: Optional[str], lease_duration: Optional[float], metadata: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, List[Any]]:
+        """
+        Returns the SET clause and its values for claiming experiments, which also sets the given `metadata` columns and
+        leases the experiments if a `lease_owner` is given.
+        """
+        values = {"status": ExperimentStatus.RUNNING.value, "start_date": utils.get_timestamp_representation(), **(metadata or {})}
+        if lease_owner is not None:
+            values["lease_owner"] = lease_owner
+        assignments = [f"{column} = {self._prepared_statement_placeholder}" for column in values]
+        if lease_owner is not None:
+            assignments.append(f"lease_expiry = {self._get_lease_expiry_expression(lease_duration)}")
+        return ", ".join(assignments), list(values.values())
+
+    def _reclaim_expired_leases(self, lease_duration: float) -> int:
+        """
+        Resets `running` experiments whose lease expired to `created`. The expiry is compared against the clock of the
+        database, such that the clocks of the workers do not need to be synchronized. The reset runs in its own short
+        transaction, such that concurrent claims do not wait for its locks, and is skipped if this process already ran
+        it within the last `lease_duration` seconds. A failed reset is logged and retried with the next claim.
+
+        :param lease_duration: Minimum number of seconds between two resets of this process.
+        :type lease_duration: float
+        :return: The number of reclaimed experiments.
+        :rtype: int
+        """
+        if time.monotonic() - self._last_lease_reclaim < lease_duration:
+            return 0
+        try:
+            connection = self.connect()
+            try:
+                cursor = self.cursor(connection)
+                self.execute(
+                    cursor,
+                    f"UPDATE {self.database_configuration.table_name} SET status = {self._prepared_statement_placeholder}, lease_owner = NULL, lease_expiry = NULL "
+                    f"WHERE status = {self._prepared_statement_placeholder} AND lease_expiry < {self._get_lease_expiry_expression(0)};",
+                    (ExperimentStatus.CREATED.value, ExperimentStatus.RUNNING.value),
+                )
+                reclaimed_experiments = cursor.rowcount
+                self.commit(connection)
+            finally:
+                self.close_connection(connection)
+        except DatabaseConnectionError as err:
+            self.logger.warning(f"Resetting experiments whose lease expired failed: {err}")
+            return 0
+        self._last_lease_reclaim = time.monotonic()
+        if reclaimed_experiments > 0:
+            self.logger.warning(f"Reclaimed {reclaimed_experiments} running experiments whose lease expired.")
+        return reclaimed_experiments
+
+    def renew_leases(self, lease_owner: str, lease_duration: float) -> int:
+        """
+        Extends the leases of all `running` experiments of the given `lease_owner` by `lease_duration` seconds.
+
+        :param lease_owner: Identifier of the worker holding the leases.
+        :type lease_owner: str
+        :param lease_duration: Number of seconds until the leases expire if they are not renewed again.
+        :type lease_duration: float
+        :return: The number of renewed leases.
+        :rtype: int
+        """
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            self.execute(
+                cursor,
+                f"UPDATE {self.database_configuration.table_name} SET lease_expiry = {self._get_lease_expiry_expression(lease_duration)} "
+                f"WHERE status = {self._prepared_statement_placeholder} AND lease_owner = {self._prepared_statement_placeholder};",
+                (ExperimentStatus.RUNNING.value, lease_owner),
+            )
+            renewed_leases = cursor.rowcount
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+        return renewed_leases
+
+    def ensure_lease_columns(self) -> None:
+        """
+        Adds the `lease_owner` and `lease_expiry` columns, as well as an index on `status` and `lease_expiry`, to the
+        experiment table if they do not exist yet. Columns and index added concurrently by other workers are tolerated.
+        """
+        table_name = self.database_configuration.table_name
+        index_name = f"{table_name}_status_lease_expiry_idx"
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            for column, dtype in self._lease_columns.items():
+                if column in self.get_structure_from_table(cursor):
+                    continue
+                try:
+                    self.execute(cursor, f"ALTER TABLE {table_name} ADD COLUMN {column} {dtype} DEFAULT NULL;")
+                    self.logger.info(f"Added column {column} to table {table_name}.")
+                except DatabaseConnectionError:
+                    if column not in self.get_structure_from_table(cursor):
+                        raise
+            if not self._index_exists(cursor, table_name, index_name):
+                try:
+                    self._create_index(cursor, table_name, index_name, ["status", "lease_expiry"])
+                except CreatingTableError:
+                    if not self._index_exists(cursor, table_name, index_name):
+                        raise
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+
+    def ensure_last_modified_column(self) -> None:
+        """
+        Adds the `last_modified` column, which is maintained by the database on every insert and update, as well as an
+        index on it, to the experiment table if they do not exist yet. Column and index added concurrently are tolerated.
+        """
+        table_name = self.database_configuration.table_name
+        index_name = f"{table_name}_last_modified_idx"
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            if self._last_modified_column not in self.get_structure_from_table(cursor):
+                try:
+                    self._add_last_modified_column(cursor)
+                    self.logger.info(f"Added column {self._last_modified_column} to table {table_name}.")
+                except DatabaseConnectionError:
+                    if self._last_modified_column not in self.get_structure_from_table(cursor):
+                        raise
+            if not self._index_exists(cursor, table_name, index_name):
+                try:
+                    self._create_index(cursor, table_name, index_name, [self._last_modified_column])
+                except CreatingTableError:
+                    if not self._index_exists(cursor, table_name, index_name):
+                        raise
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+
+    @abc.abstractmethod
+    def _add_last_modified_column(self, cursor) -> None:
+        """
+        Adds the `last_modified` column to the experiment table, such that the database sets it to the current time
+        whenever an experiment is inserted or updated.
+        """
+        pass
 
     @abc.abstractmethod
-    def _pull_open_experiment(self, random_order) -> Tuple[int, List, List]:
+    def _get_lease_expiry_expression(self, lease_duration: float) -> str:
+        """
+        Returns an SQL expression of the time of the database in `lease_duration` seconds, in the format of `start_date`.
+        """
         pass
 
-    def _select_open_experiments_from_db(self, connection, cursor, random_order: bool) -> Tuple[int, List, List]:
+    def _get_pull_order(self, random_order: bool) -> str:
+        if random_order and self._uses_random_priority():
+            return "random_priority, id"
         if random_order:
-            order_by = self.random_order_string()
-        else:
-            order_by = "id"
+            return self.random_order_string()
+        return "id"
 
-        time = utils.get_timestamp_representation()
+    def _select_open_experiments_from_db(
+        self,
+        connection,
+        cursor,
+        n: int,
+        random_order: bool,
+        lease_owner: Optional[str] = None,
+        lease_duration: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        self.execute(cursor, self._get_pull_experiment_query(self._get_pull_order(random_order), n))
+        experiment_ids = [row[0] for row in self.fetchall(cursor)]
+        if not experiment_ids:
+            self.commit(connection)
+            return []
 
-        self.execute(cursor, self._get_pull_experiment_query(order_by))
-        experiment_id = self.fetchall(cursor)[0][0]
+        id_placeholders = ", ".join([self._prepared_statement_placeholder] * len(experiment_ids))
+        assignments, values = self._get_claim_assignments(lease_owner, lease_duration, metadata)
         self.execute(
             cursor,
-            f"UPDATE {self.database_configuration.table_name} SET status = {self._prepared_statement_placeholder}, start_date = {self._prepared_statement_placeholder} WHERE id = {self._prepared_statement_placeholder};",
-            (ExperimentStatus.RUNNING.value, time, experiment_id),
+            f"UPDATE {self.database_configuration.table_name} SET {assignments} WHERE id IN ({id_placeholders});",
+            (*values, *experiment_ids),
         )
         keyfields = ",".join(list(self.database_configuration.keyfields.keys()))
-        self.execute(cursor, f"SELECT {keyfields} FROM {self.database_configuration.table_name} WHERE id = {experiment_id};")
+        self.execute(cursor, f"SELECT id, {keyfields} FROM {self.database_configuration.table_name} WHERE id IN ({id_placeholders});", experiment_ids)
         values = self.fetchall(cursor)
         self.commit(connection)
-        description = cursor.description
-        return experiment_id, description, values
+        keyfield_names = [column[0] for column in cursor.description[1:]]
+
+        # Keep the order in which the experiments were selected
+        keyfield_values = {row[0]: dict(zip(keyfield_names, row[1:])) for row in values}
+        return [(experiment_id, keyfield_values[experiment_id]) for experiment_id in experiment_ids]
 
     @abc.abstractstaticmethod
     def random_order_string():
         pass
 
     @abc.abstractmethod
-    def _get_pull_experiment_query(self, order_by: str):
-        return f"SELECT `id` FROM {self.database_configuration.table_name} WHERE status = 'created' ORDER BY {order_by} LIMIT 1"
-
-    def _write_to_database(self, combinations: List[Dict[str, str]]) -> None:
+    def _get_pull_experiment_query(self, order_by: str, limit: int = 1):
+        return f"SELECT `id` FROM {self.database_configuration.table_name} WHERE status = 'created' ORDER BY {order_by} LIMIT {int(limit)}"
+
+    def _write_to_database(self, combinations: List[Dict[str, str]], ignore_duplicates: bool = False) -> int:
+        """
+        Inserts the given combinations into the experiment table in chunks of at most `insert_chunk_size` rows, which is
+        further bounded by the maximum number of parameters of a single statement. Each chunk is committed separately,
+        such that already inserted chunks persist if a later chunk fails.
+
+        :param combinations: The rows to insert, all containing the same columns.
+        :type combinations: List[Dict[str, str]]
+        :param ignore_duplicates: Whether rows violating a unique index are skipped by the database, defaults to False.
+        :type ignore_duplicates: bool, optional
+        :return: The number of inserted rows.
+        :rtype: int
+        """
         columns = list(combinations[0].keys())
-        values = [list(combination.values()) for combination in combinations]
-        prepared_statement_palcehodler = ",".join([f"({', '.join([self._prepared_statement_placeholder] * len(columns))})"] * len(combinations))
+        chunk_size = max(1, min(self.database_configuration.insert_chunk_size, self._max_statement_parameters // len(columns)))
+        insert_statement = self._insert_ignore_statement if ignore_duplicates else "INSERT"
+        row_placeholder = f"({', '.join([self._prepared_statement_placeholder] * len(columns))})"
+
+        def get_statement(n_rows: int) -> str:
+            return f"{insert_statement} INTO {self.database_configuration.table_name} ({','.join(columns)}) VALUES {','.join([row_placeholder] * n_rows)}"
 
-        stmt = f"INSERT INTO {self.database_configuration.table_name} ({','.join(columns)}) VALUES {prepared_statement_palcehodler}"
-        values = reduce(concat, values)
+        full_chunk_statement = get_statement(chunk_size)
+        rows_added = 0
         connection = self.connect()
-        cursor = self.cursor(connection)
-        self.execute(cursor, stmt, values)
-        self.commit(connection)
-        self.close_connection(connection)
+        try:
+            cursor = self.cursor(connection)
+            for start in range(0, len(combinations), chunk_size):
+                chunk = combinations[start : start + chunk_size]
+                stmt = full_chunk_statement if len(chunk) == chunk_size else get_statement(len(chunk))
+                values = list(chain.from_iterable(combination.values() for combination in chunk))
+                self.execute(cursor, stmt, values)
+                rows_added += cursor.rowcount
+                self.commit(connection)
+        finally:
+            self.close_connection(connection)
+        return rows_added
 
-    def pull_paused_experiment(self, experiment_id: int) -> Dict[str, Any]:
+    def pull_paused_experiment(self, experiment_id: int, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         connnection = self.connect()
         cursor = self.cursor(connnection)
         keyfields = ",".join(list(self.database_configuration.keyfields.keys()))
@@ -295,8 +794,9 @@ class DatabaseConnector(abc.ABC):
         keyfield_values = self.fetchall(cursor)
         if keyfield_values:
             description = cursor.description
-            query = f"UPDATE {self.database_configuration.table_name} SET status = {self._prepared_statement_placeholder} WHERE id = {self._prepared_statement_placeholder};"
-            self.execute(cursor, query, (ExperimentStatus.RUNNING.value, experiment_id))
+            values = {"status": ExperimentStatus.RUNNING.value, **(metadata or {})}
+            query = f"{self._prepare_update_query(self.database_configuration.table_name, values.keys(), f'id = {self._prepared_statement_placeholder}')};"
+            self.execute(cursor, query, (*values.values(), experiment_id))
             self.commit(connnection)
             self.close_connection(connnection)
             keyfield_dict = dict(zip([i[0] for i in description], *keyfield_values))
@@ -308,6 +808,30 @@ class DatabaseConnector(abc.ABC):
     def prepare_write_query(self, table_name: str, keys) -> str:
         return f"INSERT INTO {table_name} ({', '.join(keys)}) VALUES ({','.join([self._prepared_statement_placeholder] * len(keys))})"
 
+    def prepare_write_many_queries(self, table_name: str, keys: Sequence[str], rows: Sequence[Sequence[Any]]) -> List[Tuple[str, List[Any]]]:
+        """
+        Returns multi-row INSERT statements together with their values, which insert the given `rows` into the table.
+        Each statement inserts at most `insert_chunk_size` rows and stays within the parameter limit of the database.
+
+        :param table_name: The name of the table to insert the rows into.
+        :type table_name: str
+        :param keys: The column names, in the order of the values of each row.
+        :type keys: Sequence[str]
+        :param rows: The values of the rows to insert.
+        :type rows: Sequence[Sequence[Any]]
+        :return: List of tuples of a statement and its values.
+        :rtype: List[Tuple[str, List[Any]]]
+        """
+        keys = list(keys)
+        chunk_size = max(1, min(self.database_configuration.insert_chunk_size, self._max_statement_parameters // len(keys)))
+        row_placeholders = f"({','.join([self._prepared_statement_placeholder] * len(keys))})"
+        queries = list()
+        for start in range(0, len(rows), chunk_size):
+            chunk = rows[start : start + chunk_size]
+            statement = f"INSERT INTO {table_name} ({', '.join(keys)}) VALUES {', '.join([row_placeholders] * len(chunk))}"
+            queries.append((statement, list(chain.from_iterable(chunk))))
+        return queries
+
     def update_database(self, table_name: str, values: Dict[str, Union[str, int, object]], condition: str):
         connection = self.connect()
         cursor = self.cursor(connection)
@@ -318,7 +842,11 @@ class DatabaseConnector(abc.ABC):
     def _prepare_update_query(self, table_name: str, values: Dict[str, Union[str, int, object]], condition: str) -> str:
         return f"UPDATE {table_name} SET {', '.join(f'{key} = {self._prepared_statement_placeholder}' for key in values)}" f" WHERE {condition}"
 
-    def reset_experiments(self, *states: str) -> None:
+    def reset_experiments(self, *states: str, in_place: bool = False, delete_logs: bool = True) -> None:
+        if in_place:
+            self.reset_experiments_in_place(*states, delete_logs=delete_logs)
+            return
+
         def get_dict_for_keyfields_and_rows(keyfields: List[str], rows: List[List[str]]) -> List[dict]:
             return [{key: value for key, value in zip(keyfields, row)} for row in rows]
 
@@ -329,6 +857,53 @@ class DatabaseConnector(abc.ABC):
                 self.fill_table(rows)
         self.logger.info(f"{len(rows)} experiments with status {' '.join(list(states))} were reset")
 
+    def reset_experiments_in_place(self, *states: str, delete_logs: bool = True) -> int:
+        """
+        Resets the experiments with the given `states` with a single UPDATE, such that they keep their IDs. Their status is
+        set to `created`, and their resultfields, `start_date`, `end_date`, `error`, `name` and `machine` are cleared.
+
+        :param states: The status of experiments that should be reset. Either `created`, `running`, `error`, `done`,
+            `paused` or `all`.
+        :type states: str
+        :param delete_logs: If True, the log and codecarbon entries of the reset experiments are deleted within the same
+            transaction. Defaults to True.
+        :type delete_logs: bool
+        :return: The number of reset experiments.
+        :rtype: int
+        """
+        table_name = self.database_configuration.table_name
+        if ExperimentStatus.ALL.value in states:
+            condition, condition_values = "", []
+        else:
+            condition = f"WHERE status IN ({', '.join([self._prepared_statement_placeholder] * len(states))})"
+            condition_values = list(states)
+
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            cleared_columns = ["start_date", "name", "machine", *self.database_configuration.resultfields.keys(), "end_date", "error"]
+            cleared_columns += [column for column in self._lease_columns if column in self.get_structure_from_table(cursor)]
+
+            if delete_logs:
+                dependent_tables = list(self.database_configuration.logtables.keys())
+                if self.use_codecarbon:
+                    dependent_tables.append(f"{table_name}_codecarbon")
+                for dependent_table in dependent_tables:
+                    self.execute(
+                        cursor,
+                        f"DELETE FROM {dependent_table} WHERE experiment_id IN (SELECT ID FROM {table_name} {condition})",
+                        condition_values,
+                    )
+
+            assignments = ", ".join([f"status = {self._prepared_statement_placeholder}", *[f"{column} = NULL" for column in cleared_columns]])
+            self.execute(cursor, f"UPDATE {table_name} SET {assignments} {condition}", [ExperimentStatus.CREATED.value, *condition_values])
+            reset_experiments = cursor.rowcount
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+        self.logger.info(f"{reset_experiments} experiments with status {' '.join(list(states))} were reset in place")
+        return reset_experiments
+
     def _pop_experiments_with_status(self, status: Optional[str] = None) -> Tuple[List[str], List[List]]:
         if status == ExperimentStatus.ALL.value:
             condition = None
@@ -370,13 +945,93 @@ class DatabaseConnector(abc.ABC):
     def get_structure_from_table(self, cursor):
         pass
 
-    def execute_queries(self, queries: List[str]):
+    def execute_queries(self, queries: List[Tuple[str, Sequence[Any]]], guard: Optional[Tuple[str, Sequence[Any]]] = None) -> bool:
+        """
+        Executes the given queries within a single transaction.
+
+        :param queries: List of tuples of a statement and its values.
+        :type queries: List[Tuple[str, Sequence[Any]]]
+        :param guard: A SELECT statement and its values, which is executed after the queries within the same transaction.
+            If it returns no row, the transaction is rolled back. Executing it last ensures that the write lock of SQLite
+            is already held, such that no other transaction can change the result of the guard before the commit.
+            Defaults to None.
+        :type guard: Optional[Tuple[str, Sequence[Any]]], optional
+        :return: False if the transaction was rolled back due to the `guard`, True otherwise.
+        :rtype: bool
+        """
         connection = self.connect()
-        cursor = self.cursor(connection)
-        for query in queries:
-            self.execute(cursor, query[0], tuple(query[1]))
-        self.commit(connection)
-        self.close_connection(connection)
+        try:
+            cursor = self.cursor(connection)
+            for query in queries:
+                self.execute(cursor, query[0], tuple(query[1]))
+            if guard is not None:
+                self.execute(cursor, guard[0], tuple(guard[1]))
+                if not self.fetchall(cursor):
+                    # Uncommitted changes are rolled back when the connection is closed
+                    return False
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+        return True
+
+    def _prepare_lease_guard_query(self, experiment_id: int, lease_owner: str) -> Tuple[str, List[Any]]:
+        """
+        Returns a guard for `execute_queries`, which only returns a row while the experiment is leased by `lease_owner`.
+        The row is locked until the end of the transaction, such that the lease cannot be reclaimed before the commit.
+        """
+        return (
+            f"SELECT ID FROM {self.database_configuration.table_name} WHERE ID = {self._prepared_statement_placeholder} "
+            f"AND lease_owner = {self._prepared_statement_placeholder}{self._lock_rows_clause}",
+            [experiment_id, lease_owner],
+        )
+
+    def execute_queries_once(self, write_id: str, queries: List[Tuple[str, Sequence[Any]]]) -> bool:
+        """
+        Executes the given queries within a single transaction, unless queries with the same `write_id` have already
+        been executed by this method. To that end, the `write_id` is recorded in the `<table_name>_write_spool` table
+        within the same transaction, which makes replaying spooled writes idempotent.
+
+        :param write_id: Unique identifier of the queries.
+        :type write_id: str
+        :param queries: List of tuples of a statement and its values.
+        :type queries: List[Tuple[str, Sequence[Any]]]
+        :return: True if the queries were executed, False if they had already been executed before.
+        :rtype: bool
+        """
+        write_spool_table = f"{self.database_configuration.table_name}_write_spool"
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            self.execute(cursor, f"CREATE TABLE IF NOT EXISTS {write_spool_table} (write_id VARCHAR(36) PRIMARY KEY)")
+            self.execute(cursor, f"{self._insert_ignore_statement} INTO {write_spool_table} (write_id) VALUES ({self._prepared_statement_placeholder})", (write_id,))
+            executed = cursor.rowcount > 0
+            if executed:
+                for statement, values in queries:
+                    self.execute(cursor, statement, tuple(values))
+            self.commit(connection)
+        finally:
+            self.close_connection(connection)
+        return executed
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """
+        Checks whether the given error, or one of the errors it was raised from, is a transient error of the database
+        connection, such that the same statements may succeed later, e.g. a lost connection.
+
+        :param error: The raised error.
+        :type error: Exception
+        :return: True if the error is transient, False otherwise.
+        :rtype: bool
+        """
+        while error is not None:
+            if self._is_transient_driver_error(error):
+                return True
+            error = error.__cause__
+        return False
+
+    @abc.abstractmethod
+    def _is_transient_driver_error(self, error: Exception) -> bool:
+        pass
 
     def delete_table(self) -> None:
         connection = self.connect()
@@ -387,23 +1042,290 @@ class DatabaseConnector(abc.ABC):
             self.execute(cursor, f"DROP TABLE IF EXISTS {self.database_configuration.table_name}_codecarbon")
 
         self.execute(cursor, f"DROP TABLE IF EXISTS {self.database_configuration.table_name}")
+        if self.database_configuration.write_spool_directory is not None:
+            self.execute(cursor, f"DROP TABLE IF EXISTS {self.database_configuration.table_name}_write_spool")
         self.commit(connection)
         self.close_connection(connection)
 
-    def get_logtable(self, logtable_name: str) -> pd.DataFrame:
-        return self.get_table(f"{self.database_configuration.table_name}__{logtable_name}")
+    def get_logtable(
+        self,
+        logtable_name: str,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        return self.get_table(f"{self.database_configuration.table_name}__{logtable_name}", columns, status, keyfields, chunksize)
+
+    def get_codecarbon_table(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        return self.get_table(f"{self.database_configuration.table_name}_codecarbon", columns, status, keyfields, chunksize)
+
+    def get_table(
+        self,
+        table_name: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Returns the given table as `pd.DataFrame`, only transferring the selected `columns` of the rows matching the
+        filters. The filters refer to the experiment table, such that rows of log and codecarbon tables are selected
+        by the experiments they belong to.
+
+        :param table_name: The name of the table. Defaults to the experiment table.
+        :type table_name: Optional[str]
+        :param columns: The columns to select. Defaults to all columns.
+        :type columns: Optional[Sequence[str]]
+        :param status: The status, or statuses, of the experiments to select. Defaults to all experiments.
+        :type status: Optional[Union[str, Sequence[str]]]
+        :param keyfields: Mapping of keyfield names to a value, or a list of values, of the experiments to select.
+        :type keyfields: Optional[Dict[str, Any]]
+        :param chunksize: If given, a generator of `pd.DataFrame`s with at most `chunksize` rows each is returned,
+            which streams the rows from the database.
+        :type chunksize: Optional[int]
+        :raises ValueError: If a column name is invalid, or a keyfield filter does not refer to a keyfield.
+        :return: The selected rows as `pd.DataFrame`, or a generator of `pd.DataFrame`s if `chunksize` is given.
+        :rtype: Union[pd.DataFrame, Iterator[pd.DataFrame]]
+        """
+        query, values = self._get_table_query(table_name, columns, status, keyfields)
+        if chunksize is not None:
+            if chunksize <= 0:
+                raise ValueError("chunksize must be a positive integer")
+            return self._iterate_table_chunks(query, values, chunksize)
+
+        return self._read_sql(query, values)
+
+    def get_rows_since(self, table_name: str, column: str, value: Any) -> pd.DataFrame:
+        """
+        Returns all rows of the given table whose `column` is greater than `value`, or all rows if `value` is None.
+
+        :param table_name: The name of the table.
+        :type table_name: str
+        :param column: The column compared with `value`, e.g. `ID` or `last_modified`.
+        :type column: str
+        :param value: The value rows have to exceed.
+        :type value: Any
+        :return: The matching rows.
+        :rtype: pd.DataFrame
+        """
+        if value is None:
+            return self._read_sql(f"SELECT * FROM {table_name}", [])
+        return self._read_sql(f"SELECT * FROM {table_name} WHERE {column} > {self._prepared_statement_placeholder}", [value])
+
+    def get_rows_by_id(self, table_name: str, ids: Sequence[int]) -> pd.DataFrame:
+        """
+        Returns the rows of the given table with the given `ids`, selected with as many statements as the maximum
+        number of parameters per statement requires.
+
+        :param table_name: The name of the table.
+        :type table_name: str
+        :param ids: The IDs of the rows.
+        :type ids: Sequence[int]
+        :return: The matching rows.
+        :rtype: pd.DataFrame
+        """
+        ids = [int(id) for id in ids]
+        chunk_size = self._max_statement_parameters
+        chunks = [
+            self._read_sql(
+                f"SELECT * FROM {table_name} WHERE ID IN ({', '.join([self._prepared_statement_placeholder] * len(ids[start:start + chunk_size]))})",
+                ids[start : start + chunk_size],
+            )
+            for start in range(0, len(ids), chunk_size)
+        ]
+        return pd.concat(chunks, ignore_index=True) if chunks else self._read_sql(f"SELECT * FROM {table_name} WHERE 1 = 0", [])
+
+    def get_ids(self, table_name: str) -> Set[int]:
+        """
+        Returns the IDs of all rows of the given table.
+        """
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            self.execute(cursor, f"SELECT ID FROM {table_name}")
+            ids = {entry[0] for entry in self.fetchall(cursor)}
+        finally:
+            self.close_connection(connection)
+        return ids
 
-    def get_codecarbon_table(self) -> pd.DataFrame:
-        return self.get_table(f"{self.database_configuration.table_name}_codecarbon")
+    def get_row_count(self, table_name: str) -> int:
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            self.execute(cursor, f"SELECT COUNT(*) FROM {table_name}")
+            return self.fetchall(cursor)[0][0]
+        finally:
+            self.close_connection(connection)
 
-    def get_table(self, table_name: Optional[str] = None) -> pd.DataFrame:
+    def _read_sql(self, query: str, values: List[Any]) -> pd.DataFrame:
         connection = self.connect()
-        query = f"SELECT * FROM {self.database_configuration.table_name}" if table_name is None else f"SELECT * FROM {table_name}"
         # suppress warning for pandas
         import warnings
 
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", category=UserWarning)
-            df = pd.read_sql(query, connection)
-        self.close_connection(connection)
+        try:
+            with warnings.catch_warnings():
+                warnings.filterwarnings("ignore", category=UserWarning)
+                df = pd.read_sql(query, connection, params=values or None)
+        finally:
+            self.close_connection(connection)
         return df
+
+    def _get_table_query(
+        self,
+        table_name: Optional[str],
+        columns: Optional[Sequence[str]],
+        status: Optional[Union[str, Sequence[str]]],
+        keyfields: Optional[Dict[str, Any]],
+    ) -> Tuple[str, List[Any]]:
+        experiment_table_name = self.database_configuration.table_name
+        table_name = experiment_table_name if table_name is None else table_name
+
+        if columns is None:
+            projection = "*"
+        else:
+            invalid_columns = [column for column in columns if not str(column).isidentifier()]
+            if invalid_columns or not columns:
+                raise ValueError(f"Invalid columns {invalid_columns} to select from {table_name}")
+            projection = ", ".join(columns)
+
+        condition, values = self._get_filter_condition(status, keyfields)
+        query = f"SELECT {projection} FROM {table_name}"
+        if condition:
+            if table_name == experiment_table_name:
+                query += f" WHERE {condition}"
+            else:
+                query += f" WHERE experiment_id IN (SELECT ID FROM {experiment_table_name} WHERE {condition})"
+        return query, values
+
+    def _get_filter_condition(self, status: Optional[Union[str, Sequence[str]]], keyfields: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+        """
+        Returns the condition selecting the experiments with the given `status` and `keyfields` values, or an empty
+        string if all experiments are selected, together with its prepared statement values. Empty lists of values
+        select no experiments.
+        """
+        conditions, values = [], []
+        if status is not None:
+            statuses = [status] if isinstance(status, str) else list(status)
+            if ExperimentStatus.ALL.value not in statuses:
+                conditions.append(self._get_in_condition("status", statuses))
+                values.extend(statuses)
+        for keyfield_name, keyfield_values in (keyfields or {}).items():
+            if keyfield_name not in self.database_configuration.keyfields:
+                raise ValueError(f"Cannot filter by {keyfield_name}, as it is not a keyfield")
+            keyfield_values = list(keyfield_values) if isinstance(keyfield_values, (list, tuple, set)) else [keyfield_values]
+            conditions.append(self._get_in_condition(keyfield_name, keyfield_values))
+            values.extend(keyfield_values)
+        return " AND ".join(conditions), values
+
+    def _get_in_condition(self, column: str, values: List[Any]) -> str:
+        # MySQL rejects empty IN lists
+        if not values:
+            return "1 = 0"
+        return f"{column} IN ({', '.join([self._prepared_statement_placeholder] * len(values))})"
+
+    def get_status_counts(self, window: float) -> Tuple[Dict[str, int], int]:
+        """
+        Counts the experiments per status, as well as the experiments finished within the last `window` seconds. Both
+        counts are answered from the `(status, end_date)` index instead of the rows of the table.
+
+        :param window: Number of seconds before now, in which finished experiments are counted.
+        :type window: float
+        :return: Tuple of the number of experiments per status and the number of experiments with status `done` or
+            `error` whose `end_date` is within the last `window` seconds.
+        :rtype: Tuple[Dict[str, int], int]
+        """
+        table_name = self.database_configuration.table_name
+        finished_states = [ExperimentStatus.DONE.value, ExperimentStatus.ERROR.value]
+        window_start = utils.get_timestamp_representation(datetime.now() - timedelta(seconds=window))
+        connection = self.connect()
+        try:
+            cursor = self.cursor(connection)
+            self.execute(cursor, f"SELECT status, COUNT(*) FROM {table_name} GROUP BY status")
+            status_counts = {status: count for status, count in self.fetchall(cursor)}
+            self.execute(
+                cursor,
+                f"SELECT COUNT(*) FROM {table_name} WHERE status IN ({', '.join([self._prepared_statement_placeholder] * len(finished_states))}) "
+                f"AND end_date >= {self._prepared_statement_placeholder}",
+                [*finished_states, window_start],
+            )
+            finished_in_window = self.fetchall(cursor)[0][0]
+        finally:
+            self.close_connection(connection)
+        return status_counts, finished_in_window
+
+    def get_aggregated_table(
+        self,
+        group_by: Sequence[str],
+        aggregations: Dict[str, Union[str, Sequence[str]]],
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Aggregates the resultfields of the experiments grouped by the given keyfields within the database, such that
+        only the aggregated rows are transferred.
+
+        :param group_by: The keyfields to group the experiments by.
+        :type group_by: Sequence[str]
+        :param aggregations: Mapping of resultfield names to an aggregate function, or a list of aggregate functions,
+            out of `count`, `sum`, `mean`, `min`, `max` and `std`.
+        :type aggregations: Dict[str, Union[str, Sequence[str]]]
+        :param status: The status, or statuses, of the experiments to aggregate. Defaults to all experiments.
+        :type status: Optional[Union[str, Sequence[str]]]
+        :param keyfields: Mapping of keyfield names to a value, or a list of values, of the experiments to aggregate.
+        :type keyfields: Optional[Dict[str, Any]]
+        :raises ValueError: If a group by column is not a keyfield, an aggregated column is not a resultfield, or an
+            aggregate function is not supported.
+        :return: One row per group, with the group by columns and one column `<resultfield>_<function>` per aggregate.
+        :rtype: pd.DataFrame
+        """
+        group_by = list(group_by)
+        invalid_group_by = [column for column in group_by if column not in self.database_configuration.keyfields]
+        if invalid_group_by:
+            raise ValueError(f"Cannot group by {invalid_group_by}, as they are not keyfields")
+        if not aggregations:
+            raise ValueError("No aggregations given")
+
+        aggregates = []
+        for resultfield, functions in aggregations.items():
+            if resultfield not in self.database_configuration.resultfields:
+                raise ValueError(f"Cannot aggregate {resultfield}, as it is not a resultfield")
+            for function in [functions] if isinstance(functions, str) else functions:
+                if function not in self._aggregate_functions:
+                    raise ValueError(f"Invalid aggregate function {function}, choose one of {list(self._aggregate_functions)}")
+                aggregates.append(f"{self._aggregate_functions[function]}({resultfield}) AS {resultfield}_{function}")
+
+        condition, values = self._get_filter_condition(status, keyfields)
+        query = f"SELECT {', '.join(group_by + aggregates)} FROM {self.database_configuration.table_name}"
+        if condition:
+            query += f" WHERE {condition}"
+        if group_by:
+            query += f" GROUP BY {', '.join(group_by)} ORDER BY {', '.join(group_by)}"
+        return self._read_sql(query, values)
+
+    def _iterate_table_chunks(self, query: str, values: List[Any], chunksize: int) -> Iterator[pd.DataFrame]:
+        connection = self.connect()
+        cursor = self._streaming_cursor(connection)
+        try:
+            self.execute(cursor, query, values or None)
+            column_names = [description[0] for description in cursor.description]
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield pd.DataFrame(list(rows), columns=column_names)
+        finally:
+            cursor.close()
+            self.close_connection(connection)
+
+    def _streaming_cursor(self, connection):
+        """
+        Returns a cursor fetching the rows of a query from the database in chunks, instead of all at once.
+        """
+        return self.cursor(connection)
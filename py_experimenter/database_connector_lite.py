@@ -1,48 +1,214 @@
 import logging
-from sqlite3 import Error, connect
-from typing import Dict, Iterable, List, Tuple
+import math
+import random
+import time
+from sqlite3 import Error, OperationalError, connect, sqlite_version_info
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from py_experimenter.config import DatabaseCfg
+from py_experimenter.connection_pool import ConnectionPool
 from py_experimenter.database_connector import DatabaseConnector
 from py_experimenter.exceptions import DatabaseConnectionError
 
 
+class _SampleStandardDeviation:
+    """
+    SQLite aggregate computing the sample standard deviation of the non-NULL values with Welford's algorithm, equal to
+    `STDDEV_SAMP` of MySQL. Values stored as TEXT are converted to numbers, while non-numeric values are skipped.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.sum_of_squares = 0.0
+
+    def step(self, value):
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_of_squares += delta * (value - self.mean)
+
+    def finalize(self):
+        if self.count < 2:
+            return None
+        return math.sqrt(self.sum_of_squares / (self.count - 1))
+
+
 class DatabaseConnectorLITE(DatabaseConnector):
     _write_to_database_separator = "','"
     _prepared_statement_placeholder = "?"
+    _insert_ignore_statement = "INSERT OR IGNORE"
+    # Maximum number of host parameters of a single statement, which was increased with SQLite 3.32.0
+    _max_statement_parameters = 32766 if sqlite_version_info >= (3, 32, 0) else 999
+    # Number of seconds a statement waits for locks held by other connections before failing
+    _busy_timeout = 30
+    # Maximum number of idle connections kept open per process
+    _max_idle_connections = 1
+    # UPDATE ... RETURNING is supported since SQLite 3.35.0
+    _supports_returning = sqlite_version_info >= (3, 35, 0)
+    # Number of retries and initial backoff in seconds when claiming experiments fails due to a locked database
+    _claim_retries = 5
+    _claim_backoff = 0.1
+
+    def __init__(self, database_configuration: DatabaseCfg, use_codecarbon: bool, logger: logging.Logger):
+        self._connection_pool = ConnectionPool(
+            self._create_connection,
+            self._is_connection_healthy,
+            self._reset_connection,
+            self._max_idle_connections,
+            idle_timeout=float("inf"),
+        )
+        super().__init__(database_configuration, use_codecarbon, logger)
 
     def _test_connection(self):
         try:
             connection = self.connect()
         except Exception as err:
             logging.error(err)
-            raise DatabaseConnectionError(err)
+            raise DatabaseConnectionError(err) from err
         else:
             self.close_connection(connection)
 
     def connect(self):
+        """
+        Borrows the connection of this process, which is kept open and reused by subsequent operations. The connection
+        has to be returned via `close_connection`.
+        """
+        return self._connection_pool.acquire()
+
+    def _create_connection(self):
         try:
-            return connect(f"{self.database_configuration.database_name}.db")
+            # Connections are only used by one thread at a time, but may be reused by another thread of the process
+            connection = connect(f"{self.database_configuration.database_name}.db", timeout=self._busy_timeout, check_same_thread=False)
+            # Readers do not block the writer in WAL mode, and committing does not wait for the data to be synced to disk
+            connection.execute("PRAGMA journal_mode=WAL;")
+            connection.execute("PRAGMA synchronous=NORMAL;")
+            connection.execute(f"PRAGMA busy_timeout={int(self._busy_timeout * 1000)};")
+            # Required for deleting log and codecarbon entries together with their experiment
+            connection.execute("PRAGMA foreign_keys=ON;")
+            # SQLite lacks a standard deviation aggregate
+            connection.create_aggregate("STDDEV_SAMP", 1, _SampleStandardDeviation)
+            return connection
         except Error as err:
-            raise DatabaseConnectionError(err)
+            raise DatabaseConnectionError(err) from err
+
+    def close_connection(self, connection):
+        """
+        Returns a connection to be reused by this process. Uncommitted changes are rolled back.
+        """
+        try:
+            self._connection_pool.release(connection)
+        except Exception as e:
+            raise DatabaseConnectionError(f"error \n{e}\n raised when closing connection to database.")
+
+    def close_connections(self) -> None:
+        self._connection_pool.close()
+
+    @staticmethod
+    def _is_connection_healthy(connection, idle_time: float) -> bool:
+        return True
 
-    def _pull_open_experiment(self, random_order: bool) -> Tuple[int, List, List]:
-        with connect(f"{self.database_configuration.database_name}.db") as connection:
+    @staticmethod
+    def _reset_connection(connection) -> None:
+        if connection.in_transaction:
+            connection.rollback()
+
+    def _pull_open_experiments(
+        self,
+        n: int,
+        random_order: bool,
+        lease_owner: Optional[str] = None,
+        lease_duration: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        for attempt in range(self._claim_retries + 1):
+            connection = self.connect()
             try:
                 cursor = self.cursor(connection)
-                experiment_id, description, values = self._select_open_experiments_from_db(connection, cursor, random_order)
+                # Acquires the write lock before reading the open experiments, such that no other process can claim them
+                self.execute(cursor, "BEGIN IMMEDIATE;")
+                if self._supports_returning:
+                    return self._claim_open_experiments(connection, cursor, n, random_order, lease_owner, lease_duration, metadata)
+                return self._select_open_experiments_from_db(connection, cursor, n, random_order, lease_owner, lease_duration, metadata)
             except Exception as err:
-                connection.rollback()
-                raise err
+                if connection.in_transaction:
+                    connection.rollback()
+                if attempt == self._claim_retries or not self._is_busy_error(err):
+                    raise err
+            finally:
+                self.close_connection(connection)
+
+            backoff = self._claim_backoff * 2**attempt * (1 + random.random())
+            self.logger.debug(f"Database is locked when claiming experiments, retrying in {backoff:.2f} seconds.")
+            time.sleep(backoff)
 
-        return experiment_id, description, values
+    def _claim_open_experiments(
+        self,
+        connection,
+        cursor,
+        n: int,
+        random_order: bool,
+        lease_owner: Optional[str] = None,
+        lease_duration: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Claims up to `n` open experiments with a single `UPDATE ... RETURNING` statement and commits the claim. If a
+        `lease_owner` is given, expired leases are reclaimed beforehand within the same transaction.
 
-    def _get_pull_experiment_query(self, order_by):
-        return super()._get_pull_experiment_query(order_by) + ";"
+        :return: List of tuples of the experiment id and the keyfield values of the claimed experiments, in the order in
+            which they were selected.
+        :rtype: List[Tuple[int, Dict[str, Any]]]
+        """
+        order_by = self._get_pull_order(random_order)
+        keyfield_names = list(self.database_configuration.keyfields.keys())
+        order_columns = ["random_priority"] if order_by == "random_priority, id" else []
+        select_query = self._get_pull_experiment_query(order_by, n).rstrip(";")
+        assignments, values = self._get_claim_assignments(lease_owner, lease_duration, metadata)
+        self.execute(
+            cursor,
+            f"UPDATE {self.database_configuration.table_name} SET {assignments} "
+            f"WHERE id IN ({select_query}) RETURNING {', '.join(['id', *order_columns, *keyfield_names])};",
+            values,
+        )
+        rows = self.fetchall(cursor)
+        self.commit(connection)
+
+        # The order of returned rows is arbitrary, so the order of the selection is restored
+        if order_by != self.random_order_string():
+            rows = sorted(rows, key=lambda row: (*row[1 : 1 + len(order_columns)], row[0]))
+        return [(row[0], dict(zip(keyfield_names, row[1 + len(order_columns) :]))) for row in rows]
+
+    @staticmethod
+    def _is_busy_error(err: Exception) -> bool:
+        return "database is locked" in str(err) or "database is busy" in str(err)
 
-    def _table_exists(self, cursor) -> bool:
+    def _is_transient_driver_error(self, error: Exception) -> bool:
+        # The database file may be locked by other processes or temporarily unavailable, e.g. on network file systems
+        return isinstance(error, OperationalError) and (
+            self._is_busy_error(error) or "unable to open database file" in str(error) or "disk I/O error" in str(error)
+        )
+
+    def _get_pull_experiment_query(self, order_by: str, limit: int = 1):
+        return super()._get_pull_experiment_query(order_by, limit) + ";"
+
+    def _table_exists(self, cursor, table_name: str = None) -> bool:
+        table_name = table_name if table_name is not None else self.database_configuration.table_name
         self.execute(cursor, f"SELECT name FROM sqlite_master WHERE type='table';")
         table_names = self.fetchall(cursor)
-        return self.database_configuration.table_name in [x[0] for x in table_names]
+        return table_name in [x[0] for x in table_names]
+
+    def _index_exists(self, cursor, table_name: str, index_name: str) -> bool:
+        self.execute(
+            cursor,
+            f"SELECT name FROM sqlite_master WHERE type='index' AND tbl_name = {self._prepared_statement_placeholder} AND name = {self._prepared_statement_placeholder};",
+            (table_name, index_name),
+        )
+        return bool(self.fetchall(cursor))
 
     def _last_insert_id_string(self) -> str:
         return "last_insert_rowid()"
@@ -51,6 +217,28 @@ class DatabaseConnectorLITE(DatabaseConnector):
     def random_order_string():
         return "RANDOM()"
 
+    def _get_lease_expiry_expression(self, lease_duration: float) -> str:
+        # Same format and time zone as the timestamps written by `utils.get_timestamp_representation`
+        return f"datetime('now', 'localtime', '+{float(lease_duration)} seconds')"
+
+    def _add_last_modified_column(self, cursor) -> None:
+        table_name = self.database_configuration.table_name
+        column = self._last_modified_column
+        # Columns added to existing tables cannot default to the current time, so the column is maintained by triggers
+        now = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+        self.execute(cursor, f"ALTER TABLE {table_name} ADD COLUMN {column} DATETIME DEFAULT NULL;")
+        self.execute(cursor, f"UPDATE {table_name} SET {column} = {now};")
+        self.execute(
+            cursor,
+            f"CREATE TRIGGER IF NOT EXISTS {table_name}_{column}_insert AFTER INSERT ON {table_name} "
+            f"BEGIN UPDATE {table_name} SET {column} = {now} WHERE ID = NEW.ID; END;",
+        )
+        self.execute(
+            cursor,
+            f"CREATE TRIGGER IF NOT EXISTS {table_name}_{column}_update AFTER UPDATE ON {table_name} "
+            f"WHEN NEW.{column} IS OLD.{column} BEGIN UPDATE {table_name} SET {column} = {now} WHERE ID = NEW.ID; END;",
+        )
+
     @staticmethod
     def get_autoincrement():
         return "AUTOINCREMENT"
@@ -61,13 +249,6 @@ class DatabaseConnectorLITE(DatabaseConnector):
         table_columns = self._exclude_fixed_columns([k[1] for k in self.fetchall(cursor)])
         return set(table_columns) == set(config_columns.keys())
 
-    def _get_existing_rows(self, column_names: List[str]) -> List[Dict[str, str]]:
-        connection = self.connect()
-        cursor = self.cursor(connection)
-        self.execute(cursor, f"SELECT {','.join(column_names)} FROM {self.database_configuration.table_name}")
-        existing_rows = self.fetchall(cursor)
-        return [dict(zip(column_names, existing_row)) for existing_row in existing_rows]
-
     def get_structure_from_table(self, cursor):
         def _get_column_names_from_entries(entries):
             return [entry[1] for entry in entries]
@@ -1,29 +1,61 @@
 import logging
+import math
+import re
 from logging import Logger
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
 import sshtunnel
-from omegaconf import OmegaConf
-from pymysql import Error, connect
+from pymysql import Error, InterfaceError, OperationalError, connect
+from pymysql.cursors import SSCursor
+from pymysql.constants import CR, ER, SERVER_STATUS
 
+from py_experimenter import utils
 from py_experimenter.config import DatabaseCfg
+from py_experimenter.connection_pool import ConnectionPool
 from py_experimenter.database_connector import DatabaseConnector
 from py_experimenter.exceptions import DatabaseConnectionError, DatabaseCreationError, SshTunnelError
 
 
 class DatabaseConnectorMYSQL(DatabaseConnector):
     _prepared_statement_placeholder = "%s"
+    _insert_ignore_statement = "INSERT IGNORE"
+    _lock_rows_clause = " FOR UPDATE"
+    # Maximum number of placeholders of a single prepared statement
+    _max_statement_parameters = 65535
+    # Maximum length of an index key in bytes for InnoDB tables
+    _max_index_key_length = 3072
+    # Number of seconds a pooled connection may be idle before it is pinged prior to its reuse
+    _health_check_interval = 10
+    # Error codes after which the same statements may succeed later
+    _transient_error_codes = {
+        CR.CR_CONNECTION_ERROR,
+        CR.CR_CONN_HOST_ERROR,
+        CR.CR_SERVER_GONE_ERROR,
+        CR.CR_SERVER_LOST,
+        ER.CON_COUNT_ERROR,
+        ER.LOCK_WAIT_TIMEOUT,
+        ER.LOCK_DEADLOCK,
+    }
 
     def __init__(self, database_configuration: DatabaseCfg, use_codecarbon: bool, credential_path: str, logger: Logger):
         self.credential_path = credential_path
+        # Determined on the first claim, as it requires a query of the server version
+        self._supports_skip_locked = None
+        self._connection_pool = ConnectionPool(
+            self._create_connection,
+            self._is_connection_healthy,
+            self._reset_connection,
+            database_configuration.connection_pool_size,
+            database_configuration.connection_idle_timeout,
+        )
         if database_configuration.use_ssh_tunnel:
             self.start_ssh_tunnel(logger)
         super().__init__(database_configuration, use_codecarbon, logger)
 
     def get_ssh_tunnel(self, logger: Logger):
         try:
-            credentials = OmegaConf.load(self.credential_path)["CREDENTIALS"]["Connection"]
+            credentials = utils.load_credentials(self.credential_path)["CREDENTIALS"]["Connection"]
             if "Ssh" in credentials:
                 parameters = dict(credentials["Ssh"])
                 ssh_address_or_host = parameters["address"]
@@ -65,6 +97,8 @@ class DatabaseConnectorMYSQL(DatabaseConnector):
     def close_ssh_tunnel(self):
         if not self.database_configuration.use_ssh_tunnel:
             self.logger.warning("Attempt to close SSH tunnel, but ssh tunnel is not used.")
+        # Pooled connections would be broken once the tunnel is closed
+        self.close_connections()
         tunnel = self.get_ssh_tunnel(self.logger)
         if tunnel is not None:
             tunnel.stop(force=False)
@@ -74,7 +108,7 @@ class DatabaseConnectorMYSQL(DatabaseConnector):
             connection = self.connect()
         except Exception as err:
             logging.error(err)
-            raise DatabaseConnectionError(err)
+            raise DatabaseConnectionError(err) from err
         else:
             self.close_connection(connection)
 
@@ -93,21 +127,72 @@ class DatabaseConnectorMYSQL(DatabaseConnector):
             raise DatabaseCreationError(f"Error when creating database: \n {err}")
 
     def connect(self):
+        """
+        Borrows a connection from the connection pool of this process, which opens a new connection if no idle
+        connection is available. The connection has to be returned via `close_connection`.
+        """
+        return self._connection_pool.acquire()
+
+    def _create_connection(self):
         credentials = dict(self._get_database_credentials())
         try:
             return connect(**credentials)
         except Error as err:
-            raise DatabaseConnectionError(err)
+            raise DatabaseConnectionError(err) from err
         finally:
             credentials = None
 
     def close_connection(self, connection):
-        closed_connection = super().close_connection(connection)
-        return closed_connection
+        """
+        Returns a connection to the connection pool. Uncommitted changes are rolled back.
+        """
+        try:
+            self._connection_pool.release(connection)
+        except Exception as e:
+            raise DatabaseConnectionError(f"error \n{e}\n raised when closing connection to database.")
+
+    def _streaming_cursor(self, connection):
+        """
+        Returns an unbuffered cursor, such that the rows of a query are streamed from the server instead of being
+        loaded into memory at once.
+        """
+        try:
+            return connection.cursor(SSCursor)
+        except Exception as e:
+            raise DatabaseConnectionError(f"error \n{e}\n raised when creating cursor.") from e
+
+    def close_connections(self) -> None:
+        """
+        Closes all idle connections of the connection pool of this process.
+        """
+        self._connection_pool.close()
+
+    def _is_connection_healthy(self, connection, idle_time: float) -> bool:
+        if not connection.open:
+            return False
+        if idle_time < self._health_check_interval:
+            return True
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _is_transient_driver_error(self, error: Exception) -> bool:
+        # Using a connection closed by the client raises an InterfaceError
+        if isinstance(error, InterfaceError):
+            return True
+        return isinstance(error, OperationalError) and bool(error.args) and error.args[0] in self._transient_error_codes
+
+    @staticmethod
+    def _reset_connection(connection) -> None:
+        # Rolling back open transactions also ends their read snapshot, so the next borrower sees the latest data
+        if connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS:
+            connection.rollback()
 
     def _get_database_credentials(self):
         try:
-            credential_config = OmegaConf.load(self.credential_path)
+            credential_config = utils.load_credentials(self.credential_path)
             database_configuration = credential_config["CREDENTIALS"]["Database"]
             if self.database_configuration.use_ssh_tunnel:
                 server_address = credential_config["CREDENTIALS"]["Connection"]["Ssh"]["server"]
@@ -136,6 +221,26 @@ class DatabaseConnectorMYSQL(DatabaseConnector):
         self.execute(cursor, f"SHOW TABLES LIKE '{table_name}'")
         return self.fetchall(cursor)
 
+    def _index_exists(self, cursor, table_name: str, index_name: str) -> bool:
+        self.execute(
+            cursor,
+            f"SELECT INDEX_NAME FROM INFORMATION_SCHEMA.STATISTICS WHERE TABLE_SCHEMA = {self._prepared_statement_placeholder} AND TABLE_NAME = {self._prepared_statement_placeholder} AND INDEX_NAME = {self._prepared_statement_placeholder}",
+            (self.database_configuration.database_name, table_name, index_name),
+        )
+        return bool(self.fetchall(cursor))
+
+    def _uses_keyfield_hash(self) -> bool:
+        # TEXT columns cannot be indexed without a prefix length, and VARCHAR columns only up to the maximum key length
+        index_key_length = 0
+        for keyfield in self.database_configuration.keyfields.values():
+            dtype = keyfield.dtype.upper()
+            if "TEXT" in dtype or "BLOB" in dtype:
+                return True
+            length = re.match(r"\s*(?:VAR)?CHAR\s*\(\s*(\d+)\s*\)", dtype)
+            # Four bytes per character with the utf8mb4 charset, eight bytes for other types
+            index_key_length += 4 * int(length.group(1)) if length is not None else 8
+        return index_key_length > self._max_index_key_length
+
     @staticmethod
     def get_autoincrement():
         return "AUTO_INCREMENT"
@@ -150,37 +255,81 @@ class DatabaseConnectorMYSQL(DatabaseConnector):
         columns = self._exclude_fixed_columns([column[0] for column in columns])
         return set(columns) == set(typed_fields.keys())
 
-    def _pull_open_experiment(self, random_order) -> Tuple[int, List, List]:
+    def _pull_open_experiments(
+        self,
+        n: int,
+        random_order: bool,
+        lease_owner: Optional[str] = None,
+        lease_duration: Optional[float] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        connection = self.connect()
         try:
-            connection = self.connect()
             cursor = self.cursor(connection)
+            if self._supports_skip_locked is None:
+                self._supports_skip_locked = self._server_supports_skip_locked(cursor)
             self._start_transaction(connection, readonly=False)
-            experiment_id, description, values = self._select_open_experiments_from_db(connection, cursor, random_order=random_order)
+            experiments = self._select_open_experiments_from_db(connection, cursor, n, random_order, lease_owner, lease_duration, metadata)
         except Exception as err:
             connection.rollback()
             raise err
         finally:
             self.close_connection(connection)
 
-        return experiment_id, description, values
+        return experiments
 
     def _last_insert_id_string(self) -> str:
         return "LAST_INSERT_ID()"
 
-    def _get_pull_experiment_query(self, order_by: str):
-        return super()._get_pull_experiment_query(order_by) + " FOR UPDATE;"
+    def _get_pull_experiment_query(self, order_by: str, limit: int = 1):
+        # Rows locked by concurrent claims are skipped instead of waited for, if the server supports it
+        if self._supports_skip_locked:
+            return super()._get_pull_experiment_query(order_by, limit) + " FOR UPDATE SKIP LOCKED;"
+        return super()._get_pull_experiment_query(order_by, limit) + " FOR UPDATE;"
+
+    def _server_supports_skip_locked(self, cursor) -> bool:
+        self.execute(cursor, "SELECT VERSION()")
+        version = self.fetchall(cursor)[0][0]
+        supports_skip_locked = self._version_supports_skip_locked(version)
+        if not supports_skip_locked:
+            self.logger.warning(f"Database server version {version} does not support SKIP LOCKED. Concurrent workers wait for each other when pulling experiments.")
+        return supports_skip_locked
+
+    @staticmethod
+    def _version_supports_skip_locked(version: str) -> bool:
+        """
+        Checks whether the given server version supports `SELECT ... FOR UPDATE SKIP LOCKED`, which is the case for
+        MySQL starting from 8.0.1 and MariaDB starting from 10.6.
+
+        :param version: The version string as returned by `SELECT VERSION()`.
+        :type version: str
+        :return: True if `SKIP LOCKED` is supported, False otherwise.
+        :rtype: bool
+        """
+        is_mariadb = "mariadb" in version.lower()
+        if is_mariadb and version.startswith("5.5.5-"):
+            version = version[len("5.5.5-") :]
+        match = re.match(r"(\d+)\.(\d+)\.(\d+)", version)
+        if match is None:
+            return False
+        version_number = tuple(int(part) for part in match.groups())
+        if is_mariadb:
+            return version_number >= (10, 6, 0)
+        return version_number >= (8, 0, 1)
 
     @staticmethod
     def random_order_string():
         return "RAND()"
 
-    def _get_existing_rows(self, column_names):
-        connection = self.connect()
-        cursor = self.cursor(connection)
-        self.execute(cursor, f"SELECT {','.join(column_names)} FROM {self.database_configuration.table_name}")
-        values = self.fetchall(cursor)
-        self.close_connection(connection)
-        return [dict(zip(column_names, existing_row)) for existing_row in values]
+    def _get_lease_expiry_expression(self, lease_duration: float) -> str:
+        return f"NOW() + INTERVAL {math.ceil(lease_duration)} SECOND"
+
+    def _add_last_modified_column(self, cursor) -> None:
+        self.execute(
+            cursor,
+            f"ALTER TABLE {self.database_configuration.table_name} ADD COLUMN {self._last_modified_column} "
+            "TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6);",
+        )
 
     def get_structure_from_table(self, cursor):
         def _get_column_names_from_entries(entries):
@@ -80,3 +80,7 @@ class InvalidColumnError(Exception):
 
 class InvalidLogtableError(Exception):
     pass
+
+
+class AsyncWriteError(DatabaseError):
+    pass
@@ -2,19 +2,26 @@ import logging
 import os
 import socket
 import traceback
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from collections import deque
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
 import pandas as pd
 from codecarbon import EmissionsTracker, OfflineEmissionsTracker
 from joblib import Parallel, delayed
 
 from py_experimenter import utils
+from py_experimenter.async_writer import AsyncWriter
 from py_experimenter.config import PyExperimenterCfg
 from py_experimenter.database_connector_lite import DatabaseConnectorLITE
 from py_experimenter.database_connector_mysql import DatabaseConnectorMYSQL
 from py_experimenter.exceptions import InvalidConfigError, NoExperimentsLeftException
 from py_experimenter.experiment_status import ExperimentStatus
+from py_experimenter.lease_heartbeat import LeaseHeartbeat
+from py_experimenter.result_mirror import ResultMirror
 from py_experimenter.result_processor import ResultProcessor
+from py_experimenter.status_summary import StatusSummary
+from py_experimenter.write_spool import WriteSpool
 
 
 class PyExperimenter:
@@ -126,6 +133,15 @@ class PyExperimenter:
         else:
             raise ValueError("The provider indicated in the config file is not supported")
 
+        self.write_spool = None
+        if self.config.database_configuration.write_spool_directory is not None:
+            self.write_spool = WriteSpool(self.config.database_configuration.write_spool_directory, self.db_connector, self.logger)
+
+        self.async_writer = None
+        if self.config.database_configuration.async_writes:
+            execute_queries = self.write_spool.execute_queries if self.write_spool is not None else self.db_connector.execute_queries
+            self.async_writer = AsyncWriter(execute_queries, self.config.database_configuration.async_write_queue_size)
+
         self.logger.info("Initialized and connected to database")
 
     def close_ssh(self) -> None:
@@ -137,7 +153,15 @@ class PyExperimenter:
         else:
             self.logger.warning("No ssh tunnel to close")
 
-    def fill_table_from_combination(self, fixed_parameter_combinations: List[dict] = None, parameters: dict = None) -> None:
+    def fill_table_from_combination(
+        self,
+        fixed_parameter_combinations: List[dict] = None,
+        parameters: dict = None,
+        constraints: List[Callable[[Mapping[str, Any]], bool]] = None,
+        n_samples: Optional[int] = None,
+        seed: Optional[int] = None,
+        sampling: str = "random",
+    ) -> None:
         """
         Adds rows to the database table based on the given information.
 
@@ -146,7 +170,9 @@ class PyExperimenter:
         with.
 
         Afterwards, the database table is filled. To this end, the cartesian product of all `parameters` and the
-        `fixed_parameter_combinations` is built, where each combination will make up a row in the database table.
+        `fixed_parameter_combinations` is built lazily, where each combination will make up a row in the database
+        table. The combinations are inserted in chunks, such that the product is never held in memory as a whole if
+        `unique_keyfields` is enabled. Otherwise, the keyfield values of all experiments are kept to skip duplicates.
         Note that only rows are added whose parameter combinations do not already exist in the database table.
         For each added row the status is set to 'created'. If any parameter of the combinations (rows) does not
         match the keyfields from the experiment configuration, an error is raised.
@@ -176,10 +202,30 @@ class PyExperimenter:
         :type fixed_parameter_combinations: List[dict], optional
         :param parameters: Dictionary of parameters and their lists of possible values. Defaults to None.
         :type parameters: dict, optional
+        :param constraints: Predicates that receive a mapping of keyfield names to values and return whether the
+            combination is valid. Invalid combinations are pruned while the combinations are generated, i.e. as soon
+            as all keyfields accessed by a constraint are assigned. Defaults to None.
+        :type constraints: List[Callable[[Mapping[str, Any]], bool]], optional
+        :param n_samples: If given, only a subsample of `n_samples` of the valid combinations is added. Defaults to None.
+        :type n_samples: Optional[int], optional
+        :param seed: Seed used to draw the subsample. Defaults to None.
+        :type seed: Optional[int], optional
+        :param sampling: Either `random` to draw the subsample uniformly at random, or `stratified` to draw one
+            combination from each of `n_samples` equally sized consecutive parts of the grid. Defaults to `random`.
+        :type sampling: str, optional
         :raises ParameterCombinationError: If any parameter of the combinations (rows) does not match the keyfields
             from the experiment configuration.
-        """
-        rows = utils.combine_fill_table_parameters(self.config.database_configuration.keyfields.keys(), parameters, fixed_parameter_combinations)
+        :raises ValueError: If `n_samples` is not positive or `sampling` is unknown.
+        """
+        keyfield_names = self.config.database_configuration.keyfields.keys()
+        rows = utils.iterate_fill_table_parameters(keyfield_names, parameters, fixed_parameter_combinations, constraints)
+        if n_samples is not None:
+            rows = utils.sample_fill_table_parameters(
+                lambda: utils.iterate_fill_table_parameters(keyfield_names, parameters, fixed_parameter_combinations, constraints),
+                n_samples,
+                seed,
+                sampling,
+            )
         self.db_connector.create_table_if_not_existing()
         self.db_connector.fill_table(rows)
 
@@ -240,6 +286,18 @@ class PyExperimenter:
         self.db_connector.create_table_if_not_existing()
         self.logger.info(f"Table {self.config.database_configuration.table_name} created.")
 
+    def ensure_indexes(self) -> None:
+        """
+        Adds missing indexes to already existing tables, i.e. an index on `status` and `ID` of the experiment table and
+        an index on `experiment_id` of the log and codecarbon tables. Tables created with this version of `PyExperimenter`
+        already contain these indexes, so this is only needed for tables that were created with an older version.
+        Existing rows are not changed.
+
+        :raises DatabaseConnectionError: If an error occurred during the connection to the database.
+        :raises CreatingTableError: If an index could not be created.
+        """
+        self.db_connector.ensure_indexes()
+
     def add_experiment_and_execute(self, keyfield_values: Dict, experiment_function: Callable[[Dict, Dict, ResultProcessor], Optional[ExperimentStatus]]) -> None:
         """
         Add one new experiment to the database table with status RUNNING and execute it.
@@ -253,7 +311,7 @@ class PyExperimenter:
         :param experiment_function: The function that should be executed with the different parametrizations.
         :type experiment_function: Callable[[Dict, Dict, ResultProcessor], None]
         """
-        experiment_id = self.db_connector.add_experiment(keyfield_values)
+        experiment_id = self.db_connector.add_experiment(keyfield_values, self._get_run_metadata())
         self.logger.info(f"Experiment with id {experiment_id} successfully added to database for immediate execution.")
         self._execute_experiment(experiment_id, keyfield_values, experiment_function)
         self.logger.info(f"Experiment with id {experiment_id} successfully executed.")
@@ -264,6 +322,8 @@ class PyExperimenter:
         random_order: bool = False,
         n_jobs: Optional[int] = None,
         max_experiments: int = -1,
+        batch_size: int = 1,
+        lease_duration: Optional[float] = None,
     ) -> None:
         """
         Pulls open experiments from the database table and executes them.
@@ -281,6 +341,8 @@ class PyExperimenter:
         experiment and the experiments status is set to `running`. Results can be continuously written to the database
         during the execution via `ResultProcessor` that is given as parameter to `experiment_function`. If the execution
         was successful (returns `None` or `ExperimentStatus.Done.`), the status of the corresponding experiment is set to `done`.
+        Final results can also be returned as a dictionary, or as a tuple of the final status and a dictionary, in which
+        case they are written together with the final status in a single transaction.
         Otherwise, if an error occurred (error raised or `ExperimentStatus.Error` returned), the status is changed to  `error`
         and, in case an error occured, it is logged into the database table. Alternatively the experiment can be paused by returning
         `ExperimentStatus.PAUSED`. In this case the status of the experiment is set to `paused` and the experiment
@@ -304,19 +366,38 @@ class PyExperimenter:
         :param n_jobs: The number parallel processes that should be created and started. If None, the number is taken
             from the experiment configuration file. Defaults to None.
         :type n_jobs: int, optional
+        :param batch_size: The number of open experiments each process claims with a single database round trip if
+            `max_experiments == -1`. Claimed experiments are set to `running` immediately and executed one after another
+            before the next batch is claimed. Defaults to `1`.
+        :type batch_size: int, optional
+        :param lease_duration: If given, each process leases the experiments it claims for this number of seconds and
+            renews the leases in the background while it is alive. `running` experiments whose lease expired, e.g.
+            because their process was killed, are reset to `created` and claimed again. Results, logs and final statuses
+            of experiments whose lease expired are not written, such that they do not mix with those of the process that
+            reclaimed them. Logs written asynchronously or spooled are not fenced. If None, experiments are claimed without a lease. Defaults to None.
+        :type lease_duration: float, optional
         :raises InvalidValuesInConfiguration: If any value of the experiment parameters is of wrong data type.
         """
         if n_jobs is None:
             n_jobs = self.config.n_jobs
+        if batch_size < 1:
+            raise ValueError("batch_size must be a positive integer")
+        if lease_duration is not None:
+            if lease_duration <= 0:
+                raise ValueError("lease_duration must be positive")
+            self.db_connector.ensure_lease_columns()
 
         self._write_codecarbon_config()
 
         with Parallel(n_jobs=n_jobs) as parallel:
             if max_experiments == -1:
-                parallel(delayed(self._worker)(experiment_function, random_order) for _ in range(n_jobs))
+                parallel(delayed(self._worker)(experiment_function, random_order, batch_size, lease_duration) for _ in range(n_jobs))
             else:
-                parallel(delayed(self._execution_wrapper)(experiment_function, random_order) for _ in range(max_experiments))
+                parallel(
+                    delayed(self._execution_wrapper)(experiment_function, random_order, lease_duration) for _ in range(max_experiments)
+                )
         self.logger.info("All configured executions finished.")
+        self._close_connections()
 
         self._delete_codecarbon_config()
 
@@ -337,7 +418,7 @@ class PyExperimenter:
         """
         self._write_codecarbon_config()
 
-        keyfield_dict, _ = self.db_connector.pull_paused_experiment(experiment_id)
+        keyfield_dict, _ = self.db_connector.pull_paused_experiment(experiment_id, self._get_run_metadata())
         self._execute_experiment(experiment_id, keyfield_dict, experiment_function)
 
         self._delete_codecarbon_config()
@@ -364,23 +445,49 @@ class PyExperimenter:
 
         return experiment_function(result_processor)
 
-    def _worker(self, experiment_function: Callable[[Dict, Dict, ResultProcessor], None], random_order: bool) -> None:
+    def _worker(
+        self,
+        experiment_function: Callable[[Dict, Dict, ResultProcessor], None],
+        random_order: bool,
+        batch_size: int = 1,
+        lease_duration: Optional[float] = None,
+    ) -> None:
         """
-        Worker that repeatedly pulls open experiments from the database table and executes them.
+        Worker that repeatedly pulls open experiments from the database table and executes them. Experiments are claimed
+        in batches of `batch_size` and kept in a local queue, which is drained before the database is queried again.
 
         :param experiment_function: The function that should be executed with the different parametrizations.
         :type experiment_function: Callable[[Dict, Dict, ResultProcessor], None]
         :param random_order: If True, the order of the experiments is determined randomly. Defaults to False.
         :type random_order: bool
-        """
-        while True:
-            try:
-                self._execution_wrapper(experiment_function, random_order)
-            except NoExperimentsLeftException:
-                break
+        :param batch_size: The number of experiments claimed per database round trip. Defaults to 1.
+        :type batch_size: int
+        :param lease_duration: Number of seconds for which claimed experiments are leased, or None to claim them
+            without a lease. Defaults to None.
+        :type lease_duration: Optional[float]
+        """
+        lease_owner, heartbeat = self._get_lease_heartbeat(lease_duration)
+        prefetched_experiments = deque()
+        with heartbeat:
+            while True:
+                if not prefetched_experiments:
+                    try:
+                        prefetched_experiments.extend(
+                            self.db_connector.get_experiment_configurations(
+                                batch_size, random_order, lease_owner, lease_duration, self._get_run_metadata()
+                            )
+                        )
+                    except NoExperimentsLeftException:
+                        break
+                experiment_id, keyfield_values = prefetched_experiments.popleft()
+                self._execute_experiment(experiment_id, keyfield_values, experiment_function, lease_owner)
+        self._close_connections()
 
     def _execution_wrapper(
-        self, experiment_function: Callable[[Dict, Dict, ResultProcessor], Optional[ExperimentStatus]], random_order: bool
+        self,
+        experiment_function: Callable[[Dict, Dict, ResultProcessor], Optional[ExperimentStatus]],
+        random_order: bool,
+        lease_duration: Optional[float] = None,
     ) -> None:
         """
         Executes the given `experiment_function` on one open experiment. To that end, one of the open experiments is pulled
@@ -402,16 +509,57 @@ class PyExperimenter:
         :type experiment_function: Callable[[dict, dict, ResultProcessor], None]
         :param random_order: If True, the order of the experiments is determined randomly. Defaults to False.
         :type random_order: bool
+        :param lease_duration: Number of seconds for which the pulled experiment is leased, or None to pull it without
+            a lease. Defaults to None.
+        :type lease_duration: Optional[float]
         :raises NoExperimentsLeftError: If there are no experiments left to be executed.
         :raises DatabaseConnectionError: If an error occurred during the connection to the database.
         """
-        experiment_id, keyfield_values = self.db_connector.get_experiment_configuration(random_order)
-        self._execute_experiment(experiment_id, keyfield_values, experiment_function)
+        lease_owner, heartbeat = self._get_lease_heartbeat(lease_duration)
+        experiment_id, keyfield_values = self.db_connector.get_experiment_configurations(
+            1, random_order, lease_owner, lease_duration, self._get_run_metadata()
+        )[0]
+        with heartbeat:
+            self._execute_experiment(experiment_id, keyfield_values, experiment_function, lease_owner)
 
-    def _execute_experiment(self, experiment_id, keyfield_values, experiment_function):
-        result_processor = ResultProcessor(self.config.database_configuration, self.db_connector, experiment_id=experiment_id, logger=self.logger)
-        result_processor._set_name(self.name)
-        result_processor._set_machine(socket.gethostname())
+    def _close_connections(self) -> None:
+        """
+        Completes pending asynchronous writes, replays spooled writes and closes the database connections of this process.
+        """
+        if self.async_writer is not None:
+            self.async_writer.close()
+        if self.write_spool is not None and not self.write_spool.replay(force=True):
+            self.logger.warning(
+                f"Writes remain spooled in {self.write_spool.path}, as the database is unreachable. Call `replay_write_spool()` once it is reachable again."
+            )
+        self.db_connector.close_connections()
+
+    def _get_run_metadata(self) -> Dict[str, Any]:
+        """
+        Returns the `name` and `machine` of this process, which are set by the same statement that claims an experiment.
+        """
+        return {"name": self.name, "machine": socket.gethostname()}
+
+    def _get_lease_heartbeat(self, lease_duration: Optional[float]) -> Tuple[Optional[str], Any]:
+        """
+        Returns the lease owner of this process and a context manager renewing its leases, or `None` and a no-op context
+        manager if experiments are claimed without a lease.
+        """
+        if lease_duration is None:
+            return None, nullcontext()
+        lease_owner = f"{socket.gethostname()}:{os.getpid()}"
+        return lease_owner, LeaseHeartbeat(self.db_connector, lease_owner, lease_duration, self.logger)
+
+    def _execute_experiment(self, experiment_id, keyfield_values, experiment_function, lease_owner: Optional[str] = None):
+        result_processor = ResultProcessor(
+            self.config.database_configuration,
+            self.db_connector,
+            experiment_id=experiment_id,
+            logger=self.logger,
+            async_writer=self.async_writer,
+            write_spool=self.write_spool,
+            lease_owner=lease_owner,
+        )
 
         if self.use_codecarbon:
             if self.codecarbon_offline_mode:
@@ -426,31 +574,54 @@ class PyExperimenter:
             else:
                 tracker = EmissionsTracker()
 
+        error_msg = None
+        emission_data = None
         try:
             self.logger.debug(f"Start of experiment_function on process {socket.gethostname()}")
             if self.use_codecarbon:
                 tracker.start()
             final_status = experiment_function(keyfield_values, result_processor, self.config.custom_configuration.custom_values)
-            if final_status not in (None, ExperimentStatus.DONE, ExperimentStatus.ERROR, ExperimentStatus.PAUSED):
-                raise ValueError(f"Invalid final status {final_status}")
+            final_status, final_results = self._parse_experiment_return(final_status)
+            if final_results:
+                result_processor._check_result_fields(final_results)
+            # Errors of asynchronous writes are reported as errors of the experiment
+            result_processor._wait_for_writes()
 
         except Exception:
             error_msg = traceback.format_exc()
             self.logger.error(error_msg)
-            result_processor._write_error(error_msg)
-            result_processor._change_status(ExperimentStatus.ERROR.value)
-        else:
-            if final_status is None or final_status == ExperimentStatus.DONE:
-                result_processor._change_status(ExperimentStatus.DONE.value)
-            elif final_status == ExperimentStatus.ERROR:
-                result_processor._change_status(ExperimentStatus.ERROR.value)
-            elif final_status == ExperimentStatus.PAUSED:
-                result_processor._change_status(ExperimentStatus.PAUSED.value)
+            final_status, final_results = ExperimentStatus.ERROR, None
         finally:
             if self.use_codecarbon:
                 tracker.stop()
                 emission_data = tracker._prepare_emissions_data().values
-                result_processor._write_emissions(emission_data, self.codecarbon_offline_mode)
+        result_processor._complete(
+            final_status.value, final_results, error_msg, emission_data, self.codecarbon_offline_mode if self.use_codecarbon else False
+        )
+
+    @staticmethod
+    def _parse_experiment_return(returned: Any) -> Tuple[ExperimentStatus, Optional[Dict[str, Any]]]:
+        """
+        Parses the return value of an experiment function, which is either `None`, an `ExperimentStatus`, a dictionary
+        of results or a tuple of an `ExperimentStatus` and a dictionary of results.
+
+        :param returned: The return value of the experiment function.
+        :type returned: Any
+        :raises ValueError: If the return value is none of the above, or the status is not `done`, `error` or `paused`.
+        :return: The final status and the results of the experiment, which are None if no results were returned.
+        :rtype: Tuple[ExperimentStatus, Optional[Dict[str, Any]]]
+        """
+        final_status, final_results = ExperimentStatus.DONE, None
+        if isinstance(returned, Mapping):
+            final_results = dict(returned)
+        elif isinstance(returned, tuple) and len(returned) == 2 and isinstance(returned[1], Mapping):
+            final_status, final_results = returned[0], dict(returned[1])
+        elif returned is not None:
+            final_status = returned
+
+        if final_status not in (ExperimentStatus.DONE, ExperimentStatus.ERROR, ExperimentStatus.PAUSED):
+            raise ValueError(f"Invalid final status {final_status}")
+        return final_status, final_results
 
     def _write_codecarbon_config(self) -> None:
         """ "
@@ -474,19 +645,57 @@ class PyExperimenter:
             except FileNotFoundError as e:
                 self.logger.error(f"Could not delete CodeCarbon config file. Error: {e}")
 
-    def reset_experiments(self, *states: Tuple["str"]) -> None:
+    def replay_write_spool(self) -> bool:
+        """
+        Replays the writes of all processes spooled to the `write_spool_directory` while the database was unreachable,
+        e.g. of processes that were killed before the database was reachable again. Each spooled write is executed at
+        most once, even if this method is called multiple times. Must not be called while experiments are executed
+        with the same `write_spool_directory`.
+
+        :raises ValueError: If no `write_spool_directory` is configured.
+        :return: True if all spooled writes were replayed, False if the database is still unreachable.
+        :rtype: bool
+        """
+        if self.write_spool is None:
+            raise ValueError("No write_spool_directory is given in the experiment configuration file")
+        return self.write_spool.replay_all()
+
+    def get_result_mirror(self, directory: str) -> ResultMirror:
+        """
+        Returns a local Parquet mirror of the experiment table, its log tables and, if CodeCarbon is used, its CodeCarbon
+        table in the given `directory`. Calling `sync` on the mirror only fetches the rows added or changed since the
+        previous sync, and the mirrored tables can be read with `get_table`, `get_logtable` and `get_codecarbon_table`.
+        Requires `pyarrow` to be installed.
+
+        :param directory: The directory containing the mirror.
+        :type directory: str
+        :raises ImportError: If `pyarrow` is not installed.
+        :return: The mirror of the tables.
+        :rtype: ResultMirror
+        """
+        return ResultMirror(self.db_connector, directory, self.logger)
+
+    def reset_experiments(self, *states: Tuple["str"], in_place: bool = False, delete_logs: bool = True) -> None:
         """
         Deletes the experiments from the database table that have the given `states`. Afterward, all deleted rows are added to the
         table again.
 
+        If `in_place` is True, the experiments are instead reset with a single UPDATE, such that they keep their IDs. Their
+        status is set to `created`, and their resultfields, dates, error, name and machine are cleared.
+
         :param states: The status of experiments that should be reset. Either `created`, `running`, `error`, `done`, or `all`.
             Note that `states` is a variable-length argument, so multiple states can be given as a tuple.
         :type status: Tuple[str]
+        :param in_place: If True, the experiments are reset in place instead of being deleted and added again. Defaults to False.
+        :type in_place: bool, optional
+        :param delete_logs: If True and `in_place` is True, the log and codecarbon entries of the reset experiments are
+            deleted. Defaults to True.
+        :type delete_logs: bool, optional
         """
         if not states:
             self.logger.warning("No states given to reset experiments. No experiments are reset.")
         else:
-            self.db_connector.reset_experiments(*states)
+            self.db_connector.reset_experiments(*states, in_place=in_place, delete_logs=delete_logs)
 
     def delete_table(self) -> None:
         """
@@ -494,35 +703,134 @@ class PyExperimenter:
         """
         self.db_connector.delete_table()
 
-    def get_table(self) -> pd.DataFrame:
+    def get_table(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
+        """
+        Returns the database table as `Pandas.DataFrame`. Only the given `columns` of the experiments matching the
+        `status` and `keyfields` filters are transferred from the database.
+
+        :param columns: The columns to select. Defaults to all columns.
+        :type columns: Optional[Sequence[str]], optional
+        :param status: The status, or statuses, of the experiments to select. Defaults to all experiments.
+        :type status: Optional[Union[str, Sequence[str]]], optional
+        :param keyfields: Mapping of keyfield names to a value, or a list of values, of the experiments to select.
+            Defaults to all experiments.
+        :type keyfields: Optional[Dict[str, Any]], optional
+        :param chunksize: If given, a generator of `Pandas.DataFrame`s with at most `chunksize` rows each is returned
+            instead, which streams the rows from the database. Defaults to None.
+        :type chunksize: Optional[int], optional
+        :return: The database table as `Pandas.DataFrame`.
+        :rtype: Union[pd.DataFrame, Iterator[pd.DataFrame]]
         """
-        Returns the database table as `Pandas.DataFrame`.
+        return self.db_connector.get_table(columns=columns, status=status, keyfields=keyfields, chunksize=chunksize)
 
-        :return: The database table as `Pandas.DataFrame`.
+    def status_summary(self, window: float = 3600) -> StatusSummary:
+        """
+        Returns the number of experiments per status, the throughput of the experiments finished within the last `window`
+        seconds and the estimated time until all `created` and `running` experiments are finished. The counts are answered
+        by the database from the `(status, end_date)` index, such that only a few rows are transferred.
+
+        :param window: Number of seconds over which the throughput is measured. Defaults to 3600.
+        :type window: float, optional
+        :raises ValueError: If `window` is not positive.
+        :return: The summary of the experiment table.
+        :rtype: StatusSummary
+        """
+        if window <= 0:
+            raise ValueError("window must be positive")
+        status_counts, finished_in_window = self.db_connector.get_status_counts(window)
+        return StatusSummary.from_counts(status_counts, window, finished_in_window)
+
+    def get_aggregated_table(
+        self,
+        group_by: Sequence[str],
+        aggregations: Dict[str, Union[str, Sequence[str]]],
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+    ) -> pd.DataFrame:
+        """
+        Returns the resultfields of the experiments aggregated per group of keyfield values as `Pandas.DataFrame`. The
+        aggregation is computed by the database, such that only the aggregated rows are transferred.
+
+        :param group_by: The keyfields to group the experiments by. If empty, all selected experiments are aggregated
+            into a single row.
+        :type group_by: Sequence[str]
+        :param aggregations: Mapping of resultfield names to an aggregate function, or a list of aggregate functions,
+            out of `count`, `sum`, `mean`, `min`, `max` and `std`.
+        :type aggregations: Dict[str, Union[str, Sequence[str]]]
+        :param status: The status, or statuses, of the experiments to aggregate. Defaults to all experiments.
+        :type status: Optional[Union[str, Sequence[str]]], optional
+        :param keyfields: Mapping of keyfield names to a value, or a list of values, of the experiments to aggregate.
+            Defaults to all experiments.
+        :type keyfields: Optional[Dict[str, Any]], optional
+        :raises ValueError: If a group by column is not a keyfield, an aggregated column is not a resultfield, or an
+            aggregate function is not supported.
+        :return: One row per group, with the `group_by` columns and one column `<resultfield>_<function>` per aggregate.
         :rtype: pd.DataFrame
         """
-        return self.db_connector.get_table()
+        return self.db_connector.get_aggregated_table(group_by, aggregations, status=status, keyfields=keyfields)
 
-    def get_logtable(self, logtable_name: str) -> pd.DataFrame:
+    def get_logtable(
+        self,
+        logtable_name: str,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """
-        Returns the log table as `Pandas.DataFrame`.
+        Returns the log table as `Pandas.DataFrame`. Only the given `columns` of the log entries belonging to experiments
+        matching the `status` and `keyfields` filters are transferred from the database.
 
         :param table_name: The name of the log table.
         :type table_name: str
+        :param columns: The columns to select. Defaults to all columns.
+        :type columns: Optional[Sequence[str]], optional
+        :param status: The status, or statuses, of the experiments to select. Defaults to all experiments.
+        :type status: Optional[Union[str, Sequence[str]]], optional
+        :param keyfields: Mapping of keyfield names to a value, or a list of values, of the experiments to select.
+            Defaults to all experiments.
+        :type keyfields: Optional[Dict[str, Any]], optional
+        :param chunksize: If given, a generator of `Pandas.DataFrame`s with at most `chunksize` rows each is returned
+            instead, which streams the rows from the database. Defaults to None.
+        :type chunksize: Optional[int], optional
         :return: The log table as `Pandas.DataFrame`.
-        :rtype: pd.DataFrame
+        :rtype: Union[pd.DataFrame, Iterator[pd.DataFrame]]
         """
-        return self.db_connector.get_logtable(logtable_name)
+        return self.db_connector.get_logtable(logtable_name, columns=columns, status=status, keyfields=keyfields, chunksize=chunksize)
 
-    def get_codecarbon_table(self) -> pd.DataFrame:
+    def get_codecarbon_table(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        status: Optional[Union[str, Sequence[str]]] = None,
+        keyfields: Optional[Dict[str, Any]] = None,
+        chunksize: Optional[int] = None,
+    ) -> Union[pd.DataFrame, Iterator[pd.DataFrame]]:
         """
         Returns the CodeCarbon table as `Pandas.DataFrame`. If CodeCarbon is not used in this experiment, an error is raised.
-
+        Only the given `columns` of the entries belonging to experiments matching the `status` and `keyfields` filters are
+        transferred from the database.
+
+        :param columns: The columns to select. Defaults to all columns.
+        :type columns: Optional[Sequence[str]], optional
+        :param status: The status, or statuses, of the experiments to select. Defaults to all experiments.
+        :type status: Optional[Union[str, Sequence[str]]], optional
+        :param keyfields: Mapping of keyfield names to a value, or a list of values, of the experiments to select.
+            Defaults to all experiments.
+        :type keyfields: Optional[Dict[str, Any]], optional
+        :param chunksize: If given, a generator of `Pandas.DataFrame`s with at most `chunksize` rows each is returned
+            instead, which streams the rows from the database. Defaults to None.
+        :type chunksize: Optional[int], optional
         :raises ValueError: If CodeCarbon is not used in this experiment.
         :return: Returns the CodeCarbon table as `Pandas.DataFrame`.
-        :rtype: pd.DataFrame
+        :rtype: Union[pd.DataFrame, Iterator[pd.DataFrame]]
         """
         if self.use_codecarbon:
-            return self.db_connector.get_codecarbon_table()
+            return self.db_connector.get_codecarbon_table(columns=columns, status=status, keyfields=keyfields, chunksize=chunksize)
         else:
             raise ValueError("CodeCarbon is not used in this experiment.")
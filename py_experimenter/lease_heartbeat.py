@@ -0,0 +1,47 @@
+import logging
+import threading
+
+from py_experimenter.database_connector import DatabaseConnector
+
+
+class LeaseHeartbeat:
+    """
+    Context manager renewing the leases of all `running` experiments of a worker in a background thread. The leases
+    are renewed three times per `lease_duration`, such that a single failed renewal does not let them expire.
+    """
+
+    def __init__(self, db_connector: DatabaseConnector, lease_owner: str, lease_duration: float, logger: logging.Logger):
+        """
+        :param db_connector: The connector of the database holding the experiment table.
+        :type db_connector: DatabaseConnector
+        :param lease_owner: Identifier of the worker holding the leases.
+        :type lease_owner: str
+        :param lease_duration: Number of seconds until the leases expire if they are not renewed.
+        :type lease_duration: float
+        :param logger: The logger to which failed renewals are reported.
+        :type logger: logging.Logger
+        """
+        self.db_connector = db_connector
+        self.lease_owner = lease_owner
+        self.lease_duration = lease_duration
+        self.logger = logger
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def __enter__(self) -> "LeaseHeartbeat":
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name=f"LeaseHeartbeat-{self.lease_owner}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.lease_duration / 3):
+            try:
+                self.db_connector.renew_leases(self.lease_owner, self.lease_duration)
+            except Exception as err:
+                self.logger.warning(f"Renewing the leases of {self.lease_owner} failed: {err}")
@@ -0,0 +1,52 @@
+import argparse
+import logging
+import os
+import time
+from typing import List, Optional
+
+from py_experimenter.experimenter import PyExperimenter
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Console entry point `py-experimenter-monitor`, which periodically prints the status summary of the experiments of
+    one or multiple experiment configuration files.
+    """
+    parser = argparse.ArgumentParser(description="Monitor the progress of PyExperimenter experiments.")
+    parser.add_argument("experiment_configuration_file_paths", nargs="+", help="Paths to experiment configuration files.")
+    parser.add_argument(
+        "--database-credential-file-path",
+        default=os.path.join("config", "database_credentials.yml"),
+        help="Path to the database credential file, only required for MySQL.",
+    )
+    parser.add_argument("--interval", type=float, default=10, help="Number of seconds between two refreshes.")
+    parser.add_argument("--window", type=float, default=3600, help="Number of seconds over which the throughput is measured.")
+    parser.add_argument("--once", action="store_true", help="Print the summaries once and exit.")
+    args = parser.parse_args(argv)
+
+    experimenters = [
+        PyExperimenter(
+            experiment_configuration_file_path=path,
+            database_credential_file_path=args.database_credential_file_path,
+            use_codecarbon=False,
+            log_level=logging.WARNING,
+        )
+        for path in args.experiment_configuration_file_paths
+    ]
+    try:
+        while True:
+            for experimenter in experimenters:
+                name = experimenter.config.database_configuration.table_name
+                print(experimenter.status_summary(args.window).format(name), flush=True)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for experimenter in experimenters:
+            experimenter.db_connector.close_connections()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+import json
+import logging
+import os
+from datetime import timedelta
+from typing import Any, Dict, List
+
+import pandas as pd
+
+from py_experimenter.database_connector import DatabaseConnector
+
+
+class ResultMirror:
+    """
+    Local Parquet mirror of the experiment table and its log and codecarbon tables. Each sync only fetches the rows that
+    were added or changed since the previous sync, based on a watermark per table: the `last_modified` column of the
+    experiment table, which is maintained by the database, and the `ID` of the append-only log and codecarbon tables.
+    If the number of mirrored rows differs from the number of rows in the database afterwards, e.g. because experiments
+    were deleted or rows were committed out of order, the IDs of the table are compared to reconcile the mirror.
+    """
+
+    _state_file_name = "mirror_state.json"
+    # Number of seconds by which the watermark of the experiment table lags behind, such that changes of transactions
+    # committed after a sync, but timestamped before it, are fetched by the next sync
+    _overlap = 60
+
+    def __init__(self, db_connector: DatabaseConnector, directory: str, logger: logging.Logger):
+        """
+        :param db_connector: The connector of the database holding the mirrored tables.
+        :type db_connector: DatabaseConnector
+        :param directory: The directory containing the Parquet files and the watermarks of the mirror.
+        :type directory: str
+        :param logger: The logger to which the progress of syncs is reported.
+        :type logger: logging.Logger
+        :raises ImportError: If `pyarrow` is not installed.
+        """
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError as err:
+            raise ImportError("Mirroring tables requires pyarrow, which can be installed via `pip install py-experimenter[mirror]`.") from err
+        self.db_connector = db_connector
+        self.directory = directory
+        self.logger = logger
+
+    @property
+    def table_names(self) -> List[str]:
+        table_name = self.db_connector.database_configuration.table_name
+        table_names = [table_name, *self.db_connector.database_configuration.logtables.keys()]
+        if self.db_connector.use_codecarbon:
+            table_names.append(f"{table_name}_codecarbon")
+        return table_names
+
+    def sync(self) -> Dict[str, int]:
+        """
+        Fetches the rows added or changed since the previous sync and merges them into the mirror. The `last_modified`
+        column is added to the experiment table on the first sync.
+
+        :return: The number of fetched rows per table.
+        :rtype: Dict[str, int]
+        """
+        self.db_connector.ensure_last_modified_column()
+        os.makedirs(self.directory, exist_ok=True)
+        watermarks = self._load_watermarks()
+        fetched_rows = dict()
+        for table_name in self.table_names:
+            fetched_rows[table_name] = self._sync_table(table_name, watermarks)
+            # Watermarks are stored after each table, such that an interrupted sync only repeats the remaining tables
+            self._store_watermarks(watermarks)
+        self.logger.info(f"Synced mirror in {self.directory}, fetched rows: {fetched_rows}")
+        return fetched_rows
+
+    def get_table(self) -> pd.DataFrame:
+        """
+        Returns the mirrored experiment table.
+        """
+        return self._read(self.db_connector.database_configuration.table_name)
+
+    def get_logtable(self, logtable_name: str) -> pd.DataFrame:
+        """
+        Returns the mirrored log table with the given name.
+        """
+        return self._read(f"{self.db_connector.database_configuration.table_name}__{logtable_name}")
+
+    def get_codecarbon_table(self) -> pd.DataFrame:
+        """
+        Returns the mirrored CodeCarbon table.
+        """
+        return self._read(f"{self.db_connector.database_configuration.table_name}_codecarbon")
+
+    def _sync_table(self, table_name: str, watermarks: Dict[str, Any]) -> int:
+        mirrored = self._read(table_name) if os.path.exists(self._path(table_name)) else None
+        if mirrored is None:
+            watermarks.pop(table_name, None)
+
+        if table_name == self.db_connector.database_configuration.table_name:
+            watermark_column = self.db_connector._last_modified_column
+            watermark = watermarks.get(table_name)
+            if watermark is not None:
+                # Milliseconds, such that the watermark compares correctly with the timestamps of both SQLite and MySQL
+                watermark = (pd.Timestamp(watermark) - timedelta(seconds=self._overlap)).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+            changes = self.db_connector.get_rows_since(table_name, watermark_column, watermark)
+        else:
+            watermark_column = "ID"
+            changes = self.db_connector.get_rows_since(table_name, watermark_column, watermarks.get(table_name))
+        fetched_rows = len(changes)
+
+        table = changes if mirrored is None else self._merge(mirrored, changes)
+        if len(table) != self.db_connector.get_row_count(table_name):
+            ids = self.db_connector.get_ids(table_name)
+            table = table[table["ID"].isin(ids)]
+            missing = self.db_connector.get_rows_by_id(table_name, sorted(ids - set(table["ID"])))
+            table = self._merge(table, missing)
+            fetched_rows += len(missing)
+
+        if not changes[watermark_column].dropna().empty:
+            watermark = changes[watermark_column].max()
+            watermarks[table_name] = int(watermark) if watermark_column == "ID" else str(watermark)
+        self._write(table_name, table.sort_values("ID", ignore_index=True))
+        return fetched_rows
+
+    @staticmethod
+    def _merge(mirrored: pd.DataFrame, changes: pd.DataFrame) -> pd.DataFrame:
+        if changes.empty:
+            return mirrored
+        return pd.concat([mirrored[~mirrored["ID"].isin(changes["ID"])], changes], ignore_index=True)
+
+    def _path(self, table_name: str) -> str:
+        return os.path.join(self.directory, f"{table_name}.parquet")
+
+    def _read(self, table_name: str) -> pd.DataFrame:
+        if not os.path.exists(self._path(table_name)):
+            raise ValueError(f"Table {table_name} is not mirrored in {self.directory}, call `sync` first.")
+        return pd.read_parquet(self._path(table_name))
+
+    def _write(self, table_name: str, table: pd.DataFrame) -> None:
+        path = self._path(table_name)
+        table.to_parquet(f"{path}.tmp", index=False)
+        os.replace(f"{path}.tmp", path)
+
+    def _load_watermarks(self) -> Dict[str, Any]:
+        path = os.path.join(self.directory, self._state_file_name)
+        if not os.path.exists(path):
+            return dict()
+        with open(path) as file:
+            return json.load(file)
+
+    def _store_watermarks(self, watermarks: Dict[str, Any]) -> None:
+        path = os.path.join(self.directory, self._state_file_name)
+        with open(f"{path}.tmp", "w") as file:
+            json.dump(watermarks, file)
+        os.replace(f"{path}.tmp", path)
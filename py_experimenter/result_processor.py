@@ -1,37 +1,184 @@
+import atexit
 import logging
+import threading
+import weakref
+from collections.abc import Mapping
 from configparser import ConfigParser
 from copy import deepcopy
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
+import pandas as pd
 from codecarbon.output import EmissionsData
 
 import py_experimenter.utils as utils
+from py_experimenter.async_writer import AsyncWriter
 from py_experimenter.config import CodeCarbonCfg, DatabaseCfg
 from py_experimenter.database_connector import DatabaseConnector
 from py_experimenter.database_connector_lite import DatabaseConnectorLITE
 from py_experimenter.database_connector_mysql import DatabaseConnectorMYSQL
 from py_experimenter.exceptions import InvalidConfigError, InvalidLogFieldError, InvalidResultFieldError
+from py_experimenter.write_spool import WriteSpool
+
+
+# Result processors with buffered results or logs, which are flushed when the process exits
+_buffering_result_processors = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_buffered_results() -> None:
+    for result_processor in list(_buffering_result_processors):
+        try:
+            result_processor.flush()
+            if result_processor.async_writer is not None:
+                result_processor.async_writer.wait()
+        except Exception as err:
+            result_processor.logger.error(f"Flushing buffered results and logs of experiment {result_processor.experiment_id} failed: {err}")
 
 
 class ResultProcessor:
     """
     Class for processing the results from an experiment. Use this class whenever you want to write results to the
     database.
+
+    If `result_flush_interval` is given in the experiment configuration file, results and logs are buffered in memory,
+    such that successive updates of the same resultfields are merged into a single write and logs are inserted with
+    multi-row statements. Buffered results and logs are written to the database at most `result_flush_interval` seconds
+    after they were processed, once `result_flush_size` updates are buffered, when the status of the experiment
+    changes, and when the process exits.
+
+    If an `async_writer` is given, results, logs and emissions are written by its background thread instead of within
+    the experiment function. Pending writes are completed before the final status of the experiment is written.
+
+    If a `write_spool` is given, writes failing due to an unreachable database are spooled and replayed later, instead
+    of raising an error.
+
+    If a `lease_owner` is given, results, logs and emissions are only written while the experiment is still leased by
+    it. Once the lease expired and the experiment was reclaimed, e.g. by another process, its writes are discarded with
+    a warning. Asynchronous and spooled writes are only fenced by the condition of the result UPDATE, such that their
+    logs, and emissions if spooled, may still be inserted after the lease was lost.
     """
 
-    def __init__(self, database_config: DatabaseCfg, db_connector: DatabaseConnector, experiment_id: int, logger):
+    def __init__(
+        self,
+        database_config: DatabaseCfg,
+        db_connector: DatabaseConnector,
+        experiment_id: int,
+        logger,
+        async_writer: Optional[AsyncWriter] = None,
+        write_spool: Optional[WriteSpool] = None,
+        lease_owner: Optional[str] = None,
+    ):
         self.logger = logger
         self.database_config = database_config
         self.db_connector = db_connector
+        self.async_writer = async_writer
+        self.write_spool = write_spool
+        self.lease_owner = lease_owner
         self.experiment_id = experiment_id
         self.experiment_id_condition = f"ID = {self.experiment_id}"
+        if lease_owner is not None:
+            self.experiment_id_condition += f" AND lease_owner = {self.db_connector._prepared_statement_placeholder}"
+
+        self._buffered_results = dict()
+        self._buffered_logs = dict()
+        self._buffered_updates = 0
+        self._buffer_lock = threading.RLock()
+        self._flush_timer = None
 
     def process_results(self, results: Dict) -> None:
         """
         Process results from the experiment and write them to the database. You can call this method, whenever you
-        want to write results to the database.
+        want to write results to the database. If results are buffered, they are written with a bounded delay.
         :param results: Dictionary with result field name and result value pairs.
         """
+        self._check_result_fields(results)
+
+        if self.database_config.result_timestamps:
+            results = self.__class__._add_timestamps_to_results(results)
+
+        if self.database_config.result_flush_interval is None:
+            if self.async_writer is None and self.write_spool is None and self.lease_owner is None:
+                self.db_connector.update_database(self.database_config.table_name, values=results, condition=self.experiment_id_condition)
+            else:
+                self._execute_queries([self._get_results_query(results)])
+            return
+
+        with self._buffer_lock:
+            self._buffered_results.update(results)
+            self._count_buffered_update()
+
+    def _count_buffered_update(self) -> None:
+        with self._buffer_lock:
+            self._buffered_updates += 1
+            if self._buffered_updates >= self.database_config.result_flush_size:
+                self.flush()
+            elif self._flush_timer is None:
+                _buffering_result_processors.add(self)
+                self._flush_timer = threading.Timer(self.database_config.result_flush_interval, self._flush_on_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self) -> None:
+        """
+        Writes all buffered results and logs to the database within a single transaction. Nothing is written if nothing
+        is buffered.
+        """
+        with self._buffer_lock:
+            results, logs = self._pop_buffered()
+            queries = self._get_log_queries(logs)
+            if results:
+                queries.insert(0, self._get_results_query(results))
+            if queries:
+                self._execute_queries(queries)
+
+    def _flush_on_timer(self) -> None:
+        try:
+            self.flush()
+        except Exception as err:
+            self.logger.warning(f"Flushing buffered results and logs of experiment {self.experiment_id} failed: {err}")
+
+    def _pop_buffered(self) -> Tuple[Dict, Dict[str, List[Dict[str, Any]]]]:
+        with self._buffer_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            _buffering_result_processors.discard(self)
+            results, logs = self._buffered_results, self._buffered_logs
+            self._buffered_results, self._buffered_logs, self._buffered_updates = dict(), dict(), 0
+        return results, logs
+
+    def _execute_queries(self, queries: List[Tuple[str, List[Any]]]) -> None:
+        if self.async_writer is not None:
+            self.async_writer.submit(queries)
+        else:
+            self._write_queries(queries)
+
+    def _write_queries(self, queries: List[Tuple[str, List[Any]]]) -> None:
+        if self.write_spool is not None:
+            self.write_spool.execute_queries(queries)
+        elif self.lease_owner is not None:
+            guard = self.db_connector._prepare_lease_guard_query(self.experiment_id, self.lease_owner)
+            if not self.db_connector.execute_queries(queries, guard=guard):
+                self.logger.warning(f"Experiment {self.experiment_id} is no longer leased by {self.lease_owner}, its writes are discarded.")
+        else:
+            self.db_connector.execute_queries(queries)
+
+    def _wait_for_writes(self) -> None:
+        """
+        Blocks until all writes of the `async_writer` are completed, if writes are asynchronous.
+
+        :raises AsyncWriteError: If asynchronous writes failed.
+        """
+        if self.async_writer is not None:
+            self.async_writer.wait()
+
+    def _get_results_query(self, values: Dict) -> Tuple[str, List[Any]]:
+        condition_values = [] if self.lease_owner is None else [self.lease_owner]
+        statement = self.db_connector._prepare_update_query(self.database_config.table_name, values.keys(), self.experiment_id_condition)
+        return statement, [*values.values(), *condition_values]
+
+    def _check_result_fields(self, results: Dict) -> None:
         if not self._valid_result_fields(list(results.keys())):
             invalid_result_keys = set(list(results.keys())) - set(self.database_config.resultfields)
             logging.error(
@@ -39,12 +186,7 @@ class ResultProcessor:
             )
             raise InvalidResultFieldError(f"Invalid result keys: {invalid_result_keys}. See previous logs for more information.")
 
-        if self.database_config.result_timestamps:
-            results = self.__class__._add_timestamps_to_results(results)
-
-        self.db_connector.update_database(self.database_config.table_name, values=results, condition=self.experiment_id_condition)
-
-    def _write_emissions(self, emission_data: EmissionsData, offline_mode: bool) -> None:
+    def _get_emissions_query(self, emission_data: EmissionsData, offline_mode: bool) -> Tuple[str, List[Any]]:
         emission_data["offline_mode"] = offline_mode
         emission_data["experiment_id"] = self.experiment_id
 
@@ -55,7 +197,50 @@ class ResultProcessor:
         values = emission_data.values()
         values = [value if not value == "" else None for value in values]
         statement = self.db_connector.prepare_write_query(f"{self.database_config.table_name}_codecarbon", keys)
-        self.db_connector.execute_queries([(statement, values)])
+        return statement, values
+
+    def _complete(
+        self,
+        status: str,
+        results: Optional[Dict] = None,
+        error_msg: Optional[str] = None,
+        emission_data: Optional[EmissionsData] = None,
+        offline_mode: bool = False,
+    ) -> None:
+        """
+        Writes the buffered and final `results`, `status`, `end_date` and `error` of the experiment with a single UPDATE.
+        Buffered logs and, if given, the `emission_data` are inserted within the same transaction. If a `lease_owner` is
+        given and the experiment is no longer leased by it, nothing is written and a warning is logged.
+
+        :param status: The final status of the experiment.
+        :type status: str
+        :param results: Results returned by the experiment function, which have to be valid resultfields. Defaults to None.
+        :type results: Optional[Dict], optional
+        :param error_msg: The error raised by the experiment function, defaults to None.
+        :type error_msg: Optional[str], optional
+        :param emission_data: The emissions tracked by CodeCarbon, defaults to None.
+        :type emission_data: Optional[EmissionsData], optional
+        :param offline_mode: Whether CodeCarbon was used in offline mode, defaults to False.
+        :type offline_mode: bool, optional
+        """
+        # The final status is written after all pending asynchronous writes
+        try:
+            self._wait_for_writes()
+        except Exception as err:
+            self.logger.error(f"Asynchronous writes of experiment {self.experiment_id} failed: {err}")
+        # Buffered results and logs are written together with the final status
+        values, logs = self._pop_buffered()
+        if results:
+            values.update(self.__class__._add_timestamps_to_results(results) if self.database_config.result_timestamps else results)
+        values["status"] = status
+        values["end_date"] = utils.get_timestamp_representation()
+        if error_msg is not None:
+            values["error"] = error_msg
+
+        queries = [self._get_results_query(values), *self._get_log_queries(logs)]
+        if emission_data is not None:
+            queries.append(self._get_emissions_query(emission_data, offline_mode))
+        self._write_queries(queries)
 
     @staticmethod
     def _add_timestamps_to_results(results: Dict) -> List[Tuple[str, object]]:
@@ -78,15 +263,65 @@ class ResultProcessor:
         if not self._valid_logtable_logs(logs):
             raise InvalidLogFieldError("Invalid logtable entries. See logs for more information")
 
-        queries = []
+        self._write_logs({logtable_identifier: [log_entries] for logtable_identifier, log_entries in logs.items()})
+
+    def process_logs_many(self, logs: Dict[str, Union[Sequence[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame]]) -> None:
+        """
+        Appends multiple rows to each of the logtables, which are inserted with multi-row statements within a single
+        transaction. Raises InvalidLogFieldError if the given logs are invalid.
+        The logs are of the following structure: Dictionary keys are the logtable_names (without the prefix `table_name__`). Each key refers to
+        either a list of dictionaries with the columnnames as keys, a dictionary with the columnnames as keys and sequences of
+        equal length as values, or a `pandas.DataFrame` with the columnnames as columns.
+
+        :param logs: Rows to be appended to the logtables.
+        :type logs: Dict[str, Union[Sequence[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame]]
+        """
+        rows = {logtable_identifier: self._get_log_rows(log_entries) for logtable_identifier, log_entries in logs.items()}
+        columns = {logtable_identifier: {column: None for row in log_rows for column in row} for logtable_identifier, log_rows in rows.items()}
+        if not self._valid_logtable_logs(columns):
+            raise InvalidLogFieldError("Invalid logtable entries. See logs for more information")
+
+        self._write_logs(rows)
+
+    @staticmethod
+    def _get_log_rows(log_entries: Union[Sequence[Dict[str, Any]], Dict[str, Sequence[Any]], pd.DataFrame]) -> List[Dict[str, Any]]:
+        if isinstance(log_entries, pd.DataFrame):
+            log_entries = {column: log_entries[column].tolist() for column in log_entries.columns}
+        if isinstance(log_entries, Mapping):
+            columns = list(log_entries.keys())
+            lengths = {len(values) for values in log_entries.values()}
+            if len(lengths) > 1:
+                raise InvalidLogFieldError(f"The columns {columns} of the logs have different lengths.")
+            log_entries = [dict(zip(columns, row)) for row in zip(*log_entries.values())]
+        # Numpy scalars cannot be passed to the database drivers
+        return [{column: value.item() if isinstance(value, np.generic) else value for column, value in row.items()} for row in log_entries]
+
+    def _write_logs(self, logs: Dict[str, List[Dict[str, Any]]]) -> None:
         time = utils.get_timestamp_representation()
-        for logtable_identifier, log_entries in logs.items():
+        rows = dict()
+        for logtable_identifier, log_rows in logs.items():
             logtable_name = f"{self.database_config.table_name}__{logtable_identifier}"
-            log_entries["experiment_id"] = str(self.experiment_id)
-            log_entries["timestamp"] = f"{time}"
-            stmt = self.db_connector.prepare_write_query(logtable_name, log_entries.keys())
-            queries.append((stmt, log_entries.values()))
-        self.db_connector.execute_queries(queries)
+            rows[logtable_name] = [{**row, "experiment_id": str(self.experiment_id), "timestamp": f"{time}"} for row in log_rows]
+
+        if self.database_config.result_flush_interval is None:
+            self._execute_queries(self._get_log_queries(rows))
+            return
+
+        with self._buffer_lock:
+            for logtable_name, log_rows in rows.items():
+                self._buffered_logs.setdefault(logtable_name, list()).extend(log_rows)
+            self._count_buffered_update()
+
+    def _get_log_queries(self, logs: Dict[str, List[Dict[str, Any]]]) -> List[Tuple[str, List[Any]]]:
+        queries = []
+        for logtable_name, log_rows in logs.items():
+            # Rows of the same logtable may contain different columns, which require different statements
+            rows_by_columns = dict()
+            for row in log_rows:
+                rows_by_columns.setdefault(tuple(row.keys()), list()).append(tuple(row.values()))
+            for columns, rows in rows_by_columns.items():
+                queries.extend(self.db_connector.prepare_write_many_queries(logtable_name, columns, rows))
+        return queries
 
     def _valid_logtable_logs(self, logs: Dict[str, Dict[str, str]]) -> bool:
         logs = {f"{self.database_config.table_name}__{logtable_name}": logtable_entries for logtable_name, logtable_entries in logs.items()}
@@ -101,18 +336,5 @@ class ResultProcessor:
                     return False
         return True
 
-    def _change_status(self, status: str):
-        values = {"status": status, "end_date": utils.get_timestamp_representation()}
-        self.db_connector.update_database(self.database_config.table_name, values=values, condition=self.experiment_id_condition)
-
-    def _write_error(self, error_msg):
-        self.db_connector.update_database(self.database_config.table_name, {"error": error_msg}, condition=self.experiment_id_condition)
-
-    def _set_machine(self, machine_id):
-        self.db_connector.update_database(self.database_config.table_name, {"machine": machine_id}, condition=self.experiment_id_condition)
-
-    def _set_name(self, name):
-        self.db_connector.update_database(self.database_config.table_name, {"name": name}, condition=self.experiment_id_condition)
-
     def _valid_result_fields(self, result_fields):
         return set(result_fields).issubset(set(self.database_config.resultfields))
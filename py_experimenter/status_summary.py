@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Optional
+
+from py_experimenter.experiment_status import ExperimentStatus
+
+
+@dataclass
+class StatusSummary:
+    """
+    Number of experiments per status, together with the throughput of the experiments finished within the last
+    `window` seconds and the estimated time until all `created` and `running` experiments are finished.
+    """
+
+    status_counts: Dict[str, int]
+    window: float
+    finished_in_window: int
+    # Number of experiments finished per hour within the window
+    throughput: float
+    # None if no experiment finished within the window, but experiments remain
+    eta: Optional[timedelta]
+
+    @property
+    def total(self) -> int:
+        return sum(self.status_counts.values())
+
+    @property
+    def remaining(self) -> int:
+        return self._count_remaining(self.status_counts)
+
+    @staticmethod
+    def _count_remaining(status_counts: Dict[str, int]) -> int:
+        return status_counts.get(ExperimentStatus.CREATED.value, 0) + status_counts.get(ExperimentStatus.RUNNING.value, 0)
+
+    @classmethod
+    def from_counts(cls, status_counts: Dict[str, int], window: float, finished_in_window: int) -> "StatusSummary":
+        """
+        Computes the throughput and the estimated time until all `created` and `running` experiments are finished from
+        the number of experiments per status and the number of experiments finished within the last `window` seconds.
+        """
+        throughput = finished_in_window / window * 3600
+        remaining = cls._count_remaining(status_counts)
+        if remaining == 0:
+            eta = timedelta(0)
+        elif finished_in_window == 0:
+            eta = None
+        else:
+            eta = timedelta(seconds=round(remaining / finished_in_window * window))
+        return cls(status_counts, window, finished_in_window, throughput, eta)
+
+    def format(self, name: str) -> str:
+        """
+        Returns a single line describing the summary, prefixed with the given `name`.
+        """
+        states = [ExperimentStatus.CREATED, ExperimentStatus.RUNNING, ExperimentStatus.DONE, ExperimentStatus.ERROR, ExperimentStatus.PAUSED]
+        counts = " ".join(f"{status.value}={self.status_counts.get(status.value, 0)}" for status in states)
+        eta = "unknown" if self.eta is None else str(self.eta)
+        return f"{name}: {counts} total={self.total} | {self.throughput:.1f}/h over the last {self.window:g}s | ETA {eta}"
@@ -1,11 +1,15 @@
 # todo ckeck which of thees utils are still neded
 import logging
+import os
+import random
+import threading
+from collections.abc import Mapping
 from configparser import ConfigParser
 from datetime import datetime
-from typing import Any, Dict, List, Union
+from itertools import product
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
-import numpy as np
-from omegaconf import DictConfig
+from omegaconf import DictConfig, OmegaConf
 
 from py_experimenter.exceptions import (
     ConfigError,
@@ -30,6 +34,34 @@ def load_credential_config(path):
     return dict(config["CREDENTIALS"])
 
 
+# Parsed credential files of this process, keyed by their absolute path
+_credential_cache: Dict[str, Tuple[Tuple[int, int], DictConfig]] = dict()
+_credential_cache_lock = threading.Lock()
+
+
+def load_credentials(path: str) -> DictConfig:
+    """
+    Load and return the credential file at the given path. The file is parsed once per process and only parsed again
+    if its modification time or size changes. The returned configuration is shared and therefore read-only.
+    :param path: path to the credential file
+    :return: credential configuration
+    """
+    file_stat = os.stat(path)
+    file_version = (file_stat.st_mtime_ns, file_stat.st_size)
+    cache_key = os.path.abspath(path)
+
+    with _credential_cache_lock:
+        cached_entry = _credential_cache.get(cache_key)
+    if cached_entry is not None and cached_entry[0] == file_version:
+        return cached_entry[1]
+
+    credentials = OmegaConf.load(path)
+    OmegaConf.set_readonly(credentials, True)
+    with _credential_cache_lock:
+        _credential_cache[cache_key] = (file_version, credentials)
+    return credentials
+
+
 def write_codecarbon_config(codecarbon_config: DictConfig):
     configparser = ConfigParser()
     configparser.read_dict({"codecarbon": dict(codecarbon_config)})
@@ -90,57 +122,200 @@ def combine_fill_table_parameters(
     :param fixed_parameter_combinations: These values are combiend with every parameter like in the cartesian product. However, the values inside of two different list items
     are not combined with each other.
     """
+    combinations = list(iterate_fill_table_parameters(keyfield_names, parameters, fixed_parameter_combinations))
+    if not combinations:
+        raise ParameterCombinationError("No parameter combination found!")
+    return combinations
 
-    def create_combination_from_parameters():
-        keyfield_data = list()
-        used_keys = list()
-
-        for keyfield_name in keyfield_names:
-            if keyfield_name in parameters.keys():
-                keyfield_data.append(parameters[keyfield_name])
-                used_keys.append(keyfield_name)
 
-        if keyfield_data:
-            combinations = np.array(np.meshgrid(*keyfield_data), dtype=object).T.reshape(-1, len(keyfield_data))
-            combinations = [dict(zip(used_keys, combination)) for combination in combinations]
-        else:
-            combinations = []
-        return combinations
-
-    def add_individual_parameters_to_combinations():
-        new_combinations = list()
-        if combinations:
-            for combination in combinations:
-                for fixed_parameter_combination in fixed_parameter_combinations:
-                    try:
-                        new_combination = dict(**combination, **fixed_parameter_combination)
-                    except TypeError:
-                        raise ParameterCombinationError("There is at least one key that is used more than once!")
-                    new_combinations.append(new_combination)
-        else:
-            new_combinations = fixed_parameter_combinations
+def iterate_fill_table_parameters(
+    keyfield_names: Iterable[str],
+    parameters: Dict[str, Iterable[Union[str, int, float, bool]]],
+    fixed_parameter_combinations: List[Dict[str, Union[str, int, float, bool]]] = None,
+    constraints: List[Callable[[Mapping[str, Any]], bool]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily combines different parameters to parameter combinations, such that grids of arbitrary size can be processed in
+    bounded memory. The combinations are yielded in the same order as returned by `combine_fill_table_parameters`. The
+    keyfield names of the grid are validated once when calling this function, not for each combination.
 
-        return new_combinations
+    Combinations can be pruned by `constraints`, which are predicates receiving a mapping from keyfield names to values and
+    returning whether the combination is valid. They are already evaluated while the combinations are generated: As soon as
+    all keyfields accessed by a constraint are assigned, all combinations sharing these values are skipped if it is violated.
 
-    combinations = create_combination_from_parameters()
+    :param keyfield_names: names of the keyfields
+    :type keyfield_names: Iterable[str]
+    :param parameters: These values are combined with each other and every fixed parameter combination. This combination is similar to the cartesian product.
+    :type parameters: Dict[str, Iterable[Union[str, int, float, bool]]]
+    :param fixed_parameter_combinations: These values are combined with every parameter like in the cartesian product. However, the values inside of two different list items
+        are not combined with each other.
+    :type fixed_parameter_combinations: List[Dict[str, Union[str, int, float, bool]]], optional
+    :param constraints: Predicates that every yielded combination satisfies, defaults to None.
+    :type constraints: List[Callable[[Mapping[str, Any]], bool]], optional
+    :raises ParameterCombinationError: If no combination can be built, a key is used more than once, or the keys of the combinations do not match the keyfields.
+    :return: Iterator over the parameter combinations.
+    :rtype: Iterator[Dict[str, Any]]
+    """
+    keyfield_names = list(keyfield_names)
+    parameters = parameters if parameters else dict()
+    fixed_parameter_combinations = list(fixed_parameter_combinations) if fixed_parameter_combinations else list()
+    constraints = list(constraints) if constraints else list()
 
-    if fixed_parameter_combinations:
-        combinations = add_individual_parameters_to_combinations()
+    used_keys = [keyfield_name for keyfield_name in keyfield_names if keyfield_name in parameters.keys()]
+    keyfield_data = [list(parameters[keyfield_name]) if parameters[keyfield_name] is not None else [] for keyfield_name in used_keys]
 
-    if not combinations:
+    if (not used_keys and not fixed_parameter_combinations) or not all(keyfield_data):
         raise ParameterCombinationError("No parameter combination found!")
 
-    for combination in combinations:
-        if len(combination.keys()) != len(set(combination.keys())):
-            raise ParameterCombinationError(f"There is at least one key that is used more than once in {str(combination.keys())}!")
-
-        if set(combination.keys()) != set(keyfield_names):
+    for fixed_parameter_combination in fixed_parameter_combinations if used_keys else []:
+        if set(used_keys) & set(fixed_parameter_combination.keys()):
+            raise ParameterCombinationError("There is at least one key that is used more than once!")
+    for keys in [used_keys + list(fixed_parameter_combination.keys()) for fixed_parameter_combination in fixed_parameter_combinations] or [used_keys]:
+        if set(keys) != set(keyfield_names):
             raise ParameterCombinationError(
                 "The number of config_parameters + individual_parameters + parameters does not match the amount of keyfields!"
             )
 
-    return combinations
+    # Keeps the order of the former meshgrid based implementation, in which the first two keyfields vary fastest
+    # and the remaining keyfields are ordered from the slowest varying last keyfield to the third one
+    axes = list(range(len(used_keys) - 1, 1, -1)) + [0, 1][: len(used_keys)]
+    positions = [axes.index(axis) for axis in range(len(used_keys))]
+
+    ordered_keys = [used_keys[axis] for axis in axes]
+    ordered_values = [keyfield_data[axis] for axis in axes]
+
+    def satisfies_constraints(combination: Dict[str, Any]) -> bool:
+        return all(constraint(combination) for constraint in constraints)
+
+    def satisfies_decidable_constraints(partial_combination: Dict[str, Any]) -> bool:
+        for constraint in constraints:
+            try:
+                if not constraint(_PartialCombination(partial_combination, keyfield_names)):
+                    return False
+            except _UnassignedKeyfieldError:
+                continue
+        return True
+
+    def iterate_combinations_from_parameters() -> Iterator[Dict[str, Any]]:
+        for values in product(*ordered_values):
+            yield {keyfield_name: values[position] for keyfield_name, position in zip(used_keys, positions)}
+
+    def iterate_pruned_combinations_from_parameters(depth: int, partial_combination: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        if depth == len(ordered_keys):
+            yield {keyfield_name: partial_combination[keyfield_name] for keyfield_name in used_keys}
+            return
+        for value in ordered_values[depth]:
+            partial_combination[ordered_keys[depth]] = value
+            if satisfies_decidable_constraints(partial_combination):
+                yield from iterate_pruned_combinations_from_parameters(depth + 1, partial_combination)
+        partial_combination.pop(ordered_keys[depth], None)
+
+    def iterate_combinations() -> Iterator[Dict[str, Any]]:
+        if not used_keys:
+            combinations = (dict(fixed_parameter_combination) for fixed_parameter_combination in fixed_parameter_combinations)
+        elif constraints:
+            combinations = iterate_pruned_combinations_from_parameters(0, dict())
+        else:
+            combinations = iterate_combinations_from_parameters()
+
+        if used_keys and fixed_parameter_combinations:
+            combinations = (
+                dict(**combination, **fixed_parameter_combination)
+                for combination in combinations
+                for fixed_parameter_combination in fixed_parameter_combinations
+            )
+
+        if constraints:
+            combinations = filter(satisfies_constraints, combinations)
+        yield from combinations
+
+    return iterate_combinations()
+
+
+class _UnassignedKeyfieldError(Exception):
+    pass
+
+
+class _PartialCombination(Mapping):
+    """
+    Read-only view on a partially generated parameter combination. Accessing a keyfield that is not assigned yet raises
+    `_UnassignedKeyfieldError`, which defers the evaluation of the accessing constraint.
+    """
+
+    def __init__(self, assigned_values: Dict[str, Any], keyfield_names: List[str]):
+        self._assigned_values = assigned_values
+        self._keyfield_names = keyfield_names
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._assigned_values:
+            return self._assigned_values[key]
+        if key in self._keyfield_names:
+            raise _UnassignedKeyfieldError(key)
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._assigned_values)
+
+    def __len__(self) -> int:
+        return len(self._assigned_values)
+
+
+def sample_fill_table_parameters(
+    iterate_combinations: Callable[[], Iterator[Dict[str, Any]]],
+    n_samples: int,
+    seed: Optional[int] = None,
+    sampling: str = "random",
+) -> List[Dict[str, Any]]:
+    """
+    Draws a subsample of `n_samples` parameter combinations without materializing all combinations. The sampled
+    combinations keep their order of generation.
+
+    With `random` sampling, the combinations are drawn uniformly at random via reservoir sampling within a single pass.
+    With `stratified` sampling, the combinations are split into `n_samples` consecutive strata of equal size, of which one
+    combination each is drawn at random. This jittered sampling is used as the quasi-random alternative instead of a
+    low-discrepancy sequence over the keyfield values, as constraints prune the grid, such that points of such a sequence
+    would often map to invalid combinations. The values of the keyfields varying slowest in the order of generation are
+    covered evenly, while those of the fastest varying keyfields are drawn at random. Stratified sampling requires two
+    passes.
+
+    :param iterate_combinations: Function returning a new iterator over all combinations to sample from.
+    :type iterate_combinations: Callable[[], Iterator[Dict[str, Any]]]
+    :param n_samples: Number of combinations to draw. If there are fewer combinations, all of them are returned.
+    :type n_samples: int
+    :param seed: Seed of the random number generator, defaults to None.
+    :type seed: Optional[int], optional
+    :param sampling: Either `random` or `stratified`, defaults to `random`.
+    :type sampling: str, optional
+    :raises ValueError: If `n_samples` is not positive or `sampling` is unknown.
+    :return: The sampled combinations.
+    :rtype: List[Dict[str, Any]]
+    """
+    if n_samples < 1:
+        raise ValueError("n_samples must be at least 1.")
+    rng = random.Random(seed)
+
+    if sampling == "random":
+        reservoir = list()
+        for index, combination in enumerate(iterate_combinations()):
+            if index < n_samples:
+                reservoir.append((index, combination))
+            else:
+                replaced_index = rng.randint(0, index)
+                if replaced_index < n_samples:
+                    reservoir[replaced_index] = (index, combination)
+        return [combination for _, combination in sorted(reservoir, key=lambda entry: entry[0])]
+
+    if sampling == "stratified":
+        n_combinations = sum(1 for _ in iterate_combinations())
+        if n_combinations <= n_samples:
+            return list(iterate_combinations())
+        boundaries = [stratum * n_combinations // n_samples for stratum in range(n_samples + 1)]
+        selected_indices = {rng.randrange(boundaries[stratum], boundaries[stratum + 1]) for stratum in range(n_samples)}
+        return [combination for index, combination in enumerate(iterate_combinations()) if index in selected_indices]
+
+    raise ValueError(f"Unknown sampling {sampling}, please use either 'random' or 'stratified'.")
 
 
-def get_timestamp_representation() -> str:
-    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+def get_timestamp_representation(timestamp: Optional[datetime] = None) -> str:
+    timestamp = datetime.now() if timestamp is None else timestamp
+    return timestamp.strftime("%Y-%m-%d %H:%M:%S")
@@ -0,0 +1,172 @@
+import glob
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, List, Tuple
+
+import numpy as np
+
+from py_experimenter.database_connector import DatabaseConnector
+
+
+def _to_json_value(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class WriteSpool:
+    """
+    Durable local spool of database writes, which could not be executed due to a transient error of the database
+    connection, e.g. a lost connection to the server or the SSH tunnel. Spooled writes are appended to a JSON lines file
+    per process and replayed in order once the database is reachable again. While writes are spooled, later writes are
+    spooled as well, so that the order of writes is preserved. Replaying is idempotent, as each write is recorded in the
+    database within the transaction executing it.
+    """
+
+    # Minimum number of seconds between two attempts to replay spooled writes
+    _replay_interval = 10
+
+    def __init__(self, directory: str, db_connector: DatabaseConnector, logger: logging.Logger):
+        """
+        :param directory: The directory containing the spool files.
+        :type directory: str
+        :param db_connector: The connector of the database the writes are executed on.
+        :type db_connector: DatabaseConnector
+        :param logger: The logger to which spooled and replayed writes are reported.
+        :type logger: logging.Logger
+        """
+        self.directory = directory
+        self.db_connector = db_connector
+        self.logger = logger
+        self._initialize_process_state()
+
+    def _initialize_process_state(self) -> None:
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._last_replay = float("-inf")
+
+    def _check_process(self) -> None:
+        if self._pid != os.getpid():
+            # Each process spools to its own file
+            self._initialize_process_state()
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{socket.gethostname()}_{os.getpid()}.jsonl")
+
+    def execute_queries(self, queries: List[Tuple[str, List[Any]]]) -> None:
+        """
+        Executes the given queries within a single transaction. If they cannot be executed due to a transient error,
+        or earlier writes are still spooled, the queries are appended to the spool instead.
+
+        :param queries: List of tuples of a statement and its values.
+        :type queries: List[Tuple[str, List[Any]]]
+        """
+        self._check_process()
+        with self._lock:
+            if self.pending():
+                self._append(queries)
+                self.replay()
+                return
+            try:
+                self.db_connector.execute_queries(queries)
+            except Exception as err:
+                if not self.db_connector.is_transient_error(err):
+                    raise
+                self.logger.warning(f"Database is unreachable, spooling writes to {self.path}: {err}")
+                self._append(queries)
+                self._last_replay = time.monotonic()
+
+    def pending(self) -> bool:
+        """
+        Returns whether writes of this process are spooled.
+        """
+        return os.path.exists(self.path)
+
+    def replay(self, force: bool = False) -> bool:
+        """
+        Replays the writes spooled by this process in order, unless the last attempt was less than `_replay_interval`
+        seconds ago and `force` is False. Replayed writes are removed from the spool.
+
+        :param force: If True, writes are replayed regardless of the time of the last attempt. Defaults to False.
+        :type force: bool
+        :return: True if no writes are spooled anymore, False otherwise.
+        :rtype: bool
+        """
+        self._check_process()
+        with self._lock:
+            if not self.pending():
+                return True
+            if not force and time.monotonic() - self._last_replay < self._replay_interval:
+                return False
+            self._last_replay = time.monotonic()
+            return self._replay_file(self.path)
+
+    def replay_all(self) -> bool:
+        """
+        Replays the spooled writes of all processes in the spool directory, e.g. of processes that were killed while
+        the database was unreachable. Must not be called while other processes spool writes to the same directory.
+
+        :return: True if no writes are spooled anymore, False otherwise.
+        :rtype: bool
+        """
+        with self._lock:
+            return all([self._replay_file(path) for path in sorted(glob.glob(os.path.join(self.directory, "*.jsonl")))])
+
+    def _append(self, queries: List[Tuple[str, List[Any]]]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entry = {"write_id": str(uuid.uuid4()), "queries": [[statement, list(values)] for statement, values in queries]}
+        self._write_entries(self.path, [entry], mode="a")
+
+    def _replay_file(self, path: str) -> bool:
+        with open(path) as file:
+            # A partially written last line stems from a process killed while spooling, so its write was never reported as executed
+            entries = [json.loads(line) for line in file if line.endswith("\n")]
+
+        replayed = 0
+        transient_error = None
+        for entry in entries:
+            try:
+                self.db_connector.execute_queries_once(entry["write_id"], entry["queries"])
+            except Exception as err:
+                if self.db_connector.is_transient_error(err):
+                    transient_error = err
+                    break
+                # Writes that can never succeed must not block the spool, so they are kept separately for inspection
+                self.logger.error(f"Spooled write {entry['write_id']} failed and is moved to {path}.failed: {err}")
+                self._write_entries(f"{path}.failed", [entry], mode="a")
+            replayed += 1
+
+        if replayed == len(entries):
+            os.remove(path)
+        else:
+            self._write_entries(f"{path}.tmp", entries[replayed:], mode="w")
+            os.replace(f"{path}.tmp", path)
+
+        if replayed:
+            self.logger.info(f"Replayed {replayed} spooled writes from {path}.")
+        if transient_error is not None:
+            self.logger.warning(f"Database is still unreachable, {len(entries) - replayed} writes remain spooled in {path}: {transient_error}")
+            return False
+        return True
+
+    @staticmethod
+    def _write_entries(path: str, entries: List[dict], mode: str) -> None:
+        with open(path, mode) as file:
+            file.writelines(json.dumps(entry, default=_to_json_value) + "\n" for entry in entries)
+            file.flush()
+            os.fsync(file.fileno())
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._initialize_process_state()
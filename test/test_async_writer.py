@@ -0,0 +1,78 @@
+import pickle
+import threading
+
+import pytest
+
+from py_experimenter.async_writer import AsyncWriter
+from py_experimenter.exceptions import AsyncWriteError
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.executed = list()
+        self.unblocked = threading.Event()
+        self.unblocked.set()
+
+    def __call__(self, queries):
+        self.unblocked.wait()
+        if queries == "fail":
+            raise ValueError("write failed")
+        self.executed.append(queries)
+
+
+def test_writes_in_order():
+    execute_queries = RecordingWriter()
+    writer = AsyncWriter(execute_queries, max_pending=10)
+    for i in range(20):
+        writer.submit([(f"query {i}", [])])
+    writer.wait()
+    assert execute_queries.executed == [[(f"query {i}", [])] for i in range(20)]
+    writer.close()
+    assert writer._thread is None
+
+
+def test_submit_blocks_if_queue_is_full():
+    execute_queries = RecordingWriter()
+    execute_queries.unblocked.clear()
+    writer = AsyncWriter(execute_queries, max_pending=1)
+    writer.submit(["first"])
+    writer.submit(["second"])
+
+    third_submitted = threading.Event()
+    submitting_thread = threading.Thread(target=lambda: (writer.submit(["third"]), third_submitted.set()))
+    submitting_thread.start()
+    assert not third_submitted.wait(0.1)
+
+    execute_queries.unblocked.set()
+    submitting_thread.join()
+    writer.close()
+    assert execute_queries.executed == [["first"], ["second"], ["third"]]
+
+
+def test_wait_raises_errors_of_previous_writes():
+    execute_queries = RecordingWriter()
+    writer = AsyncWriter(execute_queries, max_pending=10)
+    writer.submit("fail")
+    writer.submit(["after failure"])
+    with pytest.raises(AsyncWriteError, match="write failed"):
+        writer.wait()
+    # Later writes are still executed and errors are only raised once
+    assert execute_queries.executed == [["after failure"]]
+    writer.wait()
+    writer.close()
+
+
+def execute_no_queries(queries):
+    pass
+
+
+def test_pickle_without_queue_and_thread():
+    writer = AsyncWriter(execute_no_queries, max_pending=3)
+    writer.submit(["query"])
+    writer.wait()
+
+    unpickled_writer = pickle.loads(pickle.dumps(writer))
+    assert unpickled_writer.max_pending == 3
+    assert unpickled_writer._thread is None
+    assert unpickled_writer._queue.empty()
+    writer.close()
@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+from mock import MagicMock, patch
+
+from py_experimenter.connection_pool import ConnectionPool
+
+
+@pytest.fixture
+def pool():
+    return ConnectionPool(
+        create_connection=MagicMock(side_effect=lambda: MagicMock()),
+        is_healthy=MagicMock(return_value=True),
+        reset_connection=MagicMock(),
+        max_size=2,
+        idle_timeout=60,
+    )
+
+
+def test_reuses_released_connections(pool: ConnectionPool):
+    connection = pool.acquire()
+    pool.release(connection)
+    assert pool.acquire() is connection
+    assert pool._create_connection.call_count == 1
+    pool._reset_connection.assert_called_once_with(connection)
+
+
+def test_closes_connections_exceeding_max_size(pool: ConnectionPool):
+    connections = [pool.acquire() for _ in range(3)]
+    for connection in connections:
+        pool.release(connection)
+    assert len(pool) == 2
+    connections[2].close.assert_called_once()
+
+    pool.close()
+    assert len(pool) == 0
+    connections[0].close.assert_called_once()
+    connections[1].close.assert_called_once()
+
+
+def test_discards_unhealthy_and_timed_out_connections(pool: ConnectionPool):
+    connection = pool.acquire()
+    pool.release(connection)
+    pool._is_healthy.return_value = False
+    assert pool.acquire() is not connection
+    connection.close.assert_called_once()
+
+    pool._is_healthy.return_value = True
+    connection = pool.acquire()
+    pool.release(connection)
+    pool.idle_timeout = -1
+    assert pool.acquire() is not connection
+    connection.close.assert_called_once()
+
+
+def test_closes_connections_failing_to_reset(pool: ConnectionPool):
+    connection = pool.acquire()
+    pool._reset_connection.side_effect = Exception("Lost connection")
+    pool.release(connection)
+    assert len(pool) == 0
+    connection.close.assert_called_once()
+
+
+def test_does_not_reuse_connections_of_parent_process(pool: ConnectionPool):
+    connection = pool.acquire()
+    pool.release(connection)
+    with patch("py_experimenter.connection_pool.os.getpid", return_value=-1):
+        assert pool.acquire() is not connection
+    connection.close.assert_not_called()
+
+
+def is_healthy(connection, idle_time):
+    return True
+
+
+def reset_connection(connection):
+    pass
+
+
+def test_pickle_without_connections():
+    pool = ConnectionPool(dict, is_healthy, reset_connection, max_size=2, idle_timeout=60)
+    pool.release(pool.acquire())
+    unpickled_pool = pickle.loads(pickle.dumps(pool))
+    assert len(unpickled_pool) == 0
+    assert unpickled_pool.max_size == 2
+    assert unpickled_pool.acquire() == {}
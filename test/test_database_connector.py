@@ -1,7 +1,9 @@
 import datetime
 import logging
 import os
+from decimal import Decimal
 
+import numpy as np
 import pytest
 from mock import patch
 from omegaconf import OmegaConf
@@ -38,16 +40,37 @@ def test_constructor(test_connetion_mock):
 @pytest.mark.parametrize(
     "combination, existing_rows, result",
     [
-        ({"value": 1, "exponent": 2}, [{"value": 1, "exponent": 2}], True),
+        ({"value": 1, "exponent": 2}, [(1, 2)], True),
         ({"value": 1, "exponent": 2}, [], False),
-        ({"value": 3, "exponent": 4}, [{"value": 1, "exponent": 2}, {"value": 3, "exponent": 4}], True),
-        ({"value": 1, "exponent": 4}, [{"value": 1, "exponent": 2}, {"value": 3, "exponent": 4}], False),
-        ({"value": 1}, [{"value": 1}], True),
-        ({"value": 1}, [{"value": 2}], False),
+        ({"value": 3, "exponent": 4}, [(1, 2), (3, 4)], True),
+        ({"value": 1, "exponent": 4}, [(1, 2), (3, 4)], False),
+        ({"value": np.int64(1), "exponent": 2.0}, [(1, 2)], True),
+        ({"value": True, "exponent": Decimal("2")}, [(1, 2)], True),
+        ({"value": 1.5, "exponent": 2}, [(1, 2)], False),
     ],
 )
-def test_check_combination_in_existing_rows(combination, existing_rows, result):
-    assert result == DatabaseConnector._check_combination_in_existing_rows(None, combination, existing_rows)
+def test_check_combination_in_existing_rows(combination, existing_rows, result, connector: DatabaseConnector):
+    existing_rows = {connector._normalize_keyfield_tuple(existing_row) for existing_row in existing_rows}
+    assert result == connector._check_combination_in_existing_rows(combination, existing_rows)
+
+
+@pytest.mark.parametrize(
+    "value, dtype, expected",
+    [
+        (1, "INT", 1),
+        (np.float64(2.0), "DOUBLE", 2),
+        (False, "BOOLEAN", 0),
+        (Decimal("0.5"), "NUMERIC", 0.5),
+        (1, "VARCHAR(255)", "1"),
+        (b"text", "LONGTEXT", "text"),
+        (datetime.datetime(2024, 1, 2, 3, 4, 5), "DATETIME", "2024-01-02 03:04:05"),
+        (None, "INT", None),
+    ],
+)
+def test_normalize_keyfield_value(value, dtype, expected):
+    normalized_value = DatabaseConnector._normalize_keyfield_value(value, dtype)
+    assert normalized_value == expected
+    assert type(normalized_value) == type(expected)
 
 
 @pytest.fixture
@@ -82,8 +105,10 @@ def test_create_table_if_not_existing(
         "end_date DATETIME DEFAULT NULL,error LONGTEXT DEFAULT NULL);"
     )
 
-    assert execute_mock.call_count == 1
-    assert execute_mock.call_args[0][1] == expected_crate_table_statement
+    assert execute_mock.call_count == 3
+    assert execute_mock.call_args_list[0][0][1] == expected_crate_table_statement
+    assert execute_mock.call_args_list[1][0][1] == "CREATE INDEX test_table_status_id_idx ON test_table (status, ID);"
+    assert execute_mock.call_args_list[2][0][1] == "CREATE INDEX test_table_status_end_date_idx ON test_table (status, end_date);"
 
 
 @pytest.mark.parametrize(
@@ -118,7 +143,7 @@ def test_fill_table(
 ):
     create_database_if_not_existing_mock.return_value = None
     test_connection_mock.return_value = None
-    get_existing_rows_mock.return_value = []
+    get_existing_rows_mock.return_value = set()
     write_to_database_mock.return_value = None
     logger = logging.getLogger("test_logger")
 
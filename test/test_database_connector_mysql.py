@@ -1,7 +1,10 @@
 from typing import Dict
 
 import pytest
+from mock import MagicMock
+from py_experimenter.config import Keyfield
 from py_experimenter.database_connector_mysql import DatabaseConnectorMYSQL
+from py_experimenter.exceptions import DatabaseConnectionError
 
 
 @pytest.mark.parametrize(
@@ -22,3 +25,75 @@ def test_prepare_update_query(values: Dict, expected: str, condition: str):
 
     self = A()
     assert DatabaseConnectorMYSQL._prepare_update_query(self, "some_table", values, condition) == expected
+
+
+@pytest.mark.parametrize(
+    "version, expected",
+    [
+        pytest.param("8.0.34", True, id="mysql_8"),
+        pytest.param("8.0.0-dmr", False, id="mysql_8_0_0"),
+        pytest.param("5.7.44-log", False, id="mysql_5_7"),
+        pytest.param("10.6.12-MariaDB-0ubuntu0.22.04.1", True, id="mariadb_10_6"),
+        pytest.param("5.5.5-10.11.2-MariaDB", True, id="mariadb_with_prefix"),
+        pytest.param("10.5.19-MariaDB", False, id="mariadb_10_5"),
+        pytest.param("unknown", False, id="unknown"),
+    ],
+)
+def test_version_supports_skip_locked(version: str, expected: bool):
+    assert DatabaseConnectorMYSQL._version_supports_skip_locked(version) == expected
+
+
+@pytest.mark.parametrize(
+    "supports_skip_locked, expected",
+    [
+        pytest.param(True, "SELECT `id` FROM some_table WHERE status = 'created' ORDER BY id LIMIT 5 FOR UPDATE SKIP LOCKED;", id="skip_locked"),
+        pytest.param(False, "SELECT `id` FROM some_table WHERE status = 'created' ORDER BY id LIMIT 5 FOR UPDATE;", id="fallback"),
+    ],
+)
+def test_get_pull_experiment_query(supports_skip_locked: bool, expected: str):
+    connector = DatabaseConnectorMYSQL.__new__(DatabaseConnectorMYSQL)
+    connector.database_configuration = type("DatabaseCfg", (), {"table_name": "some_table"})()
+    connector._supports_skip_locked = supports_skip_locked
+    assert connector._get_pull_experiment_query("id", 5) == expected
+
+
+@pytest.mark.parametrize(
+    "dtypes, expected",
+    [
+        pytest.param(["INT", "VARCHAR(255)"], False, id="short_keyfields"),
+        pytest.param(["VARCHAR(255)", "TEXT"], True, id="text_keyfield"),
+        pytest.param(["VARCHAR(500)", "VARCHAR(500)"], True, id="too_long_key"),
+    ],
+)
+def test_uses_keyfield_hash(dtypes, expected: bool):
+    connector = DatabaseConnectorMYSQL.__new__(DatabaseConnectorMYSQL)
+    keyfields = {f"keyfield_{i}": Keyfield(f"keyfield_{i}", dtype, None) for i, dtype in enumerate(dtypes)}
+    connector.database_configuration = type("DatabaseCfg", (), {"keyfields": keyfields})()
+    assert connector._uses_keyfield_hash() == expected
+
+
+@pytest.mark.parametrize("server_status, rolled_back", [pytest.param(1, True, id="in_transaction"), pytest.param(2, False, id="autocommit")])
+def test_reset_connection(server_status: int, rolled_back: bool):
+    connection = MagicMock(server_status=server_status)
+    DatabaseConnectorMYSQL._reset_connection(connection)
+    assert connection.rollback.called == rolled_back
+
+
+def test_pull_open_experiments_raises_connection_error():
+    connector = DatabaseConnectorMYSQL.__new__(DatabaseConnectorMYSQL)
+    connector.connect = MagicMock(side_effect=DatabaseConnectionError("unreachable"))
+    with pytest.raises(DatabaseConnectionError, match="unreachable"):
+        connector._pull_open_experiments(1, random_order=False)
+
+
+@pytest.mark.parametrize(
+    "status, keyfields, expected",
+    [
+        pytest.param(["done"], {"keyfield_0": [1, 2]}, ("status IN (%s) AND keyfield_0 IN (%s, %s)", ["done", 1, 2]), id="values"),
+        pytest.param([], {"keyfield_0": ()}, ("1 = 0 AND 1 = 0", []), id="empty_values"),
+    ],
+)
+def test_get_filter_condition(status, keyfields, expected):
+    connector = DatabaseConnectorMYSQL.__new__(DatabaseConnectorMYSQL)
+    connector.database_configuration = type("DatabaseCfg", (), {"keyfields": {"keyfield_0": Keyfield("keyfield_0", "INT", None)}})()
+    assert connector._get_filter_condition(status, keyfields) == expected
@@ -2,6 +2,7 @@ import logging
 import os
 from math import cos, sin
 
+import pytest
 from freezegun import freeze_time
 from mock import MagicMock, call, patch
 from omegaconf import OmegaConf
@@ -33,7 +34,7 @@ def test_tables_created(
     table_exists_mock.return_value = False
     experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"))
     experimenter.fill_table_from_config()
-    assert execute_mock.call_count == 4
+    assert execute_mock.call_count == 9
     assert execute_mock.mock_calls[0][1][1] == (
         "CREATE TABLE test_sqlite_logtables (ID INTEGER PRIMARY KEY AUTOINCREMENT, value int DEFAULT NULL,"
         "exponent int DEFAULT NULL,creation_date DATETIME DEFAULT NULL,status VARCHAR(255) DEFAULT NULL,"
@@ -49,6 +50,19 @@ def test_tables_created(
         "CREATE TABLE test_sqlite_logtables__log2 (ID INTEGER PRIMARY KEY AUTOINCREMENT, experiment_id INTEGER,"
         " timestamp DATETIME, test_2 int DEFAULT NULL, FOREIGN KEY (experiment_id) REFERENCES test_sqlite_logtables(ID) ON DELETE CASCADE);"
     )
+    assert execute_mock.mock_calls[4][1][1] == "CREATE INDEX test_sqlite_logtables_status_id_idx ON test_sqlite_logtables (status, ID);"
+    assert execute_mock.mock_calls[5][1][1] == (
+        "CREATE INDEX test_sqlite_logtables_status_end_date_idx ON test_sqlite_logtables (status, end_date);"
+    )
+    assert execute_mock.mock_calls[6][1][1] == (
+        "CREATE INDEX test_sqlite_logtables__log_experiment_id_idx ON test_sqlite_logtables__log (experiment_id);"
+    )
+    assert execute_mock.mock_calls[7][1][1] == (
+        "CREATE INDEX test_sqlite_logtables__log2_experiment_id_idx ON test_sqlite_logtables__log2 (experiment_id);"
+    )
+    assert execute_mock.mock_calls[8][1][1] == (
+        "CREATE INDEX test_sqlite_logtables_codecarbon_experiment_id_idx ON test_sqlite_logtables_codecarbon (experiment_id);"
+    )
 
 
 @freeze_time("2012-01-14 03:21:34")
@@ -155,3 +169,138 @@ def test_integration_without_resultfields():
     non_timesteps_2 = [x[:2] + x[3:] for x in logtable2]
     assert non_timesteps_2 == [(1, 1, 1), (2, 1, 3)]
     assert timesteps == timesteps_2
+
+
+def test_ensure_indexes():
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.create_table()
+
+    connection = experimenter.db_connector.connect()
+    cursor = experimenter.db_connector.cursor(connection)
+    cursor.execute("DROP INDEX test_sqlite_logtables_status_id_idx")
+    cursor.execute("DROP INDEX test_sqlite_logtables__log_experiment_id_idx")
+    experimenter.db_connector.close_connection(connection)
+
+    experimenter.ensure_indexes()
+    experimenter.ensure_indexes()
+
+    connection = experimenter.db_connector.connect()
+    cursor = experimenter.db_connector.cursor(connection)
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'test_sqlite_logtables%'")
+    index_names = {entry[0] for entry in cursor.fetchall()}
+    experimenter.db_connector.close_connection(connection)
+    assert index_names == {
+        "test_sqlite_logtables_status_id_idx",
+        "test_sqlite_logtables_status_end_date_idx",
+        "test_sqlite_logtables__log_experiment_id_idx",
+        "test_sqlite_logtables__log2_experiment_id_idx",
+    }
+
+
+def test_connection_reuse_and_cascading_deletes():
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=1)
+
+    db_connector = experimenter.db_connector
+    connection = db_connector.connect()
+    db_connector.close_connection(connection)
+    assert db_connector.connect() is connection
+    cursor = db_connector.cursor(connection)
+    assert [db_connector.fetchall(cursor.execute(f"PRAGMA {pragma};"))[0][0] for pragma in ["journal_mode", "synchronous", "foreign_keys"]] == ["wal", 1, 1]
+
+    cursor.execute("DELETE FROM test_sqlite_logtables WHERE ID = 1;")
+    db_connector.commit(connection)
+    cursor.execute("SELECT COUNT(*) FROM test_sqlite_logtables__log;")
+    assert db_connector.fetchall(cursor) == [(0,)]
+    db_connector.close_connection(connection)
+
+
+def own_function_logging_many(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+    result_processor.process_logs_many({"log": {"test": [0, 2, 4]}, "log2": [{"test_2": 1}, {"test_2": 3}]})
+    result_processor.process_logs({"log": {"test": 6}})
+
+
+@pytest.mark.parametrize("result_flush_interval", [None, 60])
+def test_integration_process_logs_many(result_flush_interval):
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.config.database_configuration.result_flush_interval = result_flush_interval
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function_logging_many, max_experiments=1)
+
+    logtable = experimenter.get_logtable("log")
+    assert logtable["test"].tolist() == [0, 2, 4, 6]
+    assert set(logtable["experiment_id"]) == {1}
+    logtable2 = experimenter.get_logtable("log2")
+    assert logtable2["test_2"].tolist() == [1, 3]
+
+
+def test_logs_of_lost_leases_are_not_written():
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    db_connector = experimenter.db_connector
+    db_connector.ensure_lease_columns()
+    assert db_connector.get_experiment_configurations(1, False, "crashed", 60)[0][0] == 1
+
+    config = experimenter.config.database_configuration
+    result_processor = ResultProcessor(config, db_connector, 1, experimenter.logger, lease_owner="crashed")
+    result_processor.process_logs({"log": {"test": 0}})
+    assert experimenter.get_logtable("log")["test"].tolist() == [0]
+
+    # Let another worker reclaim the experiment after the lease of the first worker expired
+    connection = db_connector.connect()
+    cursor = db_connector.cursor(connection)
+    cursor.execute("UPDATE test_sqlite_logtables SET lease_owner = 'alive' WHERE ID = 1")
+    db_connector.commit(connection)
+    db_connector.close_connection(connection)
+
+    result_processor.process_logs({"log": {"test": 1}})
+    result_processor.process_logs_many({"log": {"test": [2, 3]}, "log2": [{"test_2": 4}]})
+    assert experimenter.get_logtable("log")["test"].tolist() == [0]
+    assert experimenter.get_logtable("log2").empty
+
+
+def own_function_raising_error(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+    result_processor.process_logs({"log": {"test": 0}})
+    raise ValueError("error")
+
+
+def test_reset_experiments_in_place():
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=2)
+    experimenter.execute(own_function_raising_error, max_experiments=1)
+
+    experimenter.reset_experiments("done", in_place=True)
+    table = experimenter.get_table()
+    assert table["ID"].tolist() == list(range(1, 31))
+    assert table["status"].tolist() == ["created", "created", "error"] + ["created"] * 27
+    assert table[["start_date", "name", "machine", "sin", "cos", "end_date"]].iloc[:2].isna().all().all()
+    assert table["machine"].iloc[2] is not None
+    assert set(experimenter.get_logtable("log")["experiment_id"]) == {3}
+
+    experimenter.reset_experiments("error", in_place=True, delete_logs=False)
+    table = experimenter.get_table()
+    assert (table["status"] == "created").all()
+    assert table["error"].isna().all()
+    assert set(experimenter.get_logtable("log")["experiment_id"]) == {3}
+
+
+def test_get_logtable_filtered_and_chunked():
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=2)
+
+    logtable = experimenter.get_logtable("log", columns=["experiment_id", "test"], keyfields={"value": 1, "exponent": 2})
+    assert list(logtable.columns) == ["experiment_id", "test"]
+    assert logtable.values.tolist() == [[2, 0], [2, 2]]
+    assert experimenter.get_logtable("log", status="created").empty
+
+    chunks = list(experimenter.get_logtable("log2", columns=["test_2"], status="done", chunksize=3))
+    assert [chunk["test_2"].tolist() for chunk in chunks] == [[1, 3, 1], [3]]
@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+import pytest
+
+from py_experimenter.experimenter import PyExperimenter
+from py_experimenter.result_processor import ResultProcessor
+
+pytest.importorskip("pyarrow")
+
+
+def own_function(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+    result_processor.process_results({"sin": keyfields["value"], "cos": keyfields["exponent"]})
+    result_processor.process_logs({"log": {"test": 0}, "log2": {"test_2": 1}})
+
+
+def assert_mirror_equals_database(experimenter: PyExperimenter, mirror):
+    columns = ["ID", "status", "sin", "last_modified"]
+    pd.testing.assert_frame_equal(mirror.get_table()[columns], experimenter.get_table()[columns], check_dtype=False)
+    pd.testing.assert_frame_equal(mirror.get_logtable("log"), experimenter.get_logtable("log"), check_dtype=False, check_index_type=False)
+
+
+def test_incremental_sync(tmp_path):
+    experimenter = PyExperimenter(os.path.join("test", "test_logtables", "sqlite_logtables.yml"), use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=2)
+
+    mirror = experimenter.get_result_mirror(str(tmp_path))
+    mirror._overlap = 0
+    with pytest.raises(ValueError):
+        mirror.get_table()
+    assert mirror.sync() == {"test_sqlite_logtables": 30, "test_sqlite_logtables__log": 2, "test_sqlite_logtables__log2": 2}
+    assert_mirror_equals_database(experimenter, mirror)
+
+    experimenter.execute(own_function, max_experiments=1)
+    fetched_rows = mirror.sync()
+    assert 1 <= fetched_rows["test_sqlite_logtables"] < 30
+    assert fetched_rows["test_sqlite_logtables__log"] == 1
+    assert_mirror_equals_database(experimenter, mirror)
+
+    # Deleted and re-inserted experiments are reconciled by their IDs
+    experimenter.reset_experiments("done")
+    mirror.sync()
+    assert_mirror_equals_database(experimenter, mirror)
+    assert mirror.get_logtable("log").empty
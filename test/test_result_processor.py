@@ -1,6 +1,8 @@
 import logging
 import os
 
+import numpy as np
+import pandas as pd
 import pytest
 from freezegun import freeze_time
 from mock import patch
@@ -8,7 +10,7 @@ from mock import patch
 from py_experimenter import database_connector_lite, database_connector_mysql, utils
 from py_experimenter.database_connector_lite import DatabaseConnectorLITE
 from py_experimenter.database_connector_mysql import DatabaseConnectorMYSQL
-from py_experimenter.exceptions import InvalidResultFieldError
+from py_experimenter.exceptions import InvalidLogFieldError, InvalidResultFieldError
 from py_experimenter.experimenter import PyExperimenter
 from py_experimenter.result_processor import ResultProcessor
 
@@ -113,3 +115,68 @@ def result_processor(test_connection_mock, create_database_mock):
 def test_valid_logtable_logs(result_processor: ResultProcessor):
     assert result_processor._valid_logtable_logs({"log": {"test": 0}})
     assert not result_processor._valid_logtable_logs({"log": {"test": 0, "test2": 1}})
+
+
+def test_buffered_results(result_processor: ResultProcessor):
+    result_processor.database_config.result_flush_interval = 60
+    result_processor.database_config.result_flush_size = 4
+    with patch.object(result_processor.db_connector, "execute_queries") as execute_queries_mock:
+        result_processor.process_results({"sin": 0.1})
+        result_processor.process_results({"sin": 0.2, "cos": 0.3})
+        result_processor.process_logs({"log": {"test": 0}})
+        execute_queries_mock.assert_not_called()
+        # Successive updates of the same resultfield are merged, logs are inserted in the same transaction
+        result_processor.process_results({"sin": 0.4})
+        execute_queries_mock.assert_called_once()
+        (results_statement, results_values), (log_statement, log_values) = execute_queries_mock.call_args.args[0]
+        assert results_statement == "UPDATE test_mysql_logtables SET sin = %s, cos = %s WHERE ID = 0"
+        assert results_values == [0.4, 0.3]
+        assert log_statement.startswith("INSERT INTO test_mysql_logtables__log (test, experiment_id, timestamp)")
+        assert log_values[:2] == [0, "0"]
+
+        # Buffered results and logs are written together with the final status
+        result_processor.process_results({"cos": 0.5})
+        result_processor.process_logs({"log": {"test": 1}})
+        result_processor._complete("done")
+        assert execute_queries_mock.call_count == 2
+        (statement, values), (log_statement, _) = execute_queries_mock.call_args.args[0]
+        assert statement.startswith("UPDATE test_mysql_logtables SET cos = %s, status = %s, end_date = %s")
+        assert list(values)[:2] == [0.5, "done"]
+        assert log_statement.startswith("INSERT INTO test_mysql_logtables__log")
+        assert result_processor._flush_timer is None
+
+
+def test_buffered_results_are_flushed_after_interval(result_processor: ResultProcessor):
+    result_processor.database_config.result_flush_interval = 0.05
+    with patch.object(result_processor.db_connector, "execute_queries") as execute_queries_mock:
+        result_processor.process_results({"sin": 0.1})
+        execute_queries_mock.assert_not_called()
+        result_processor._flush_timer.join()
+        execute_queries_mock.assert_called_once_with([("UPDATE test_mysql_logtables SET sin = %s WHERE ID = 0", [0.1])])
+
+
+@pytest.mark.parametrize(
+    "logs",
+    [
+        [{"test": 0}, {"test": 1}, {"test": 2}],
+        {"test": np.array([0, 1, 2])},
+        pd.DataFrame({"test": [0, 1, 2]}),
+    ],
+)
+def test_process_logs_many(result_processor: ResultProcessor, logs):
+    result_processor.database_config.insert_chunk_size = 2
+    with patch.object(result_processor.db_connector, "execute_queries") as execute_queries_mock:
+        result_processor.process_logs_many({"log": logs})
+    # Rows are inserted in chunks within a single transaction
+    (first_statement, first_values), (second_statement, second_values) = execute_queries_mock.call_args.args[0]
+    assert first_statement == "INSERT INTO test_mysql_logtables__log (test, experiment_id, timestamp) VALUES (%s,%s,%s), (%s,%s,%s)"
+    assert second_statement == "INSERT INTO test_mysql_logtables__log (test, experiment_id, timestamp) VALUES (%s,%s,%s)"
+    assert [type(value) for value in first_values[::3] + second_values[::3]] == [int, int, int]
+    assert first_values[::3] + second_values[::3] == [0, 1, 2]
+
+
+def test_process_logs_many_raises_error(result_processor: ResultProcessor):
+    with pytest.raises(InvalidLogFieldError):
+        result_processor.process_logs_many({"log": [{"test": 0}, {"invalid": 1}]})
+    with pytest.raises(InvalidLogFieldError):
+        result_processor.process_logs_many({"log": {"test": [0, 1], "test2": [0]}})
@@ -1,15 +1,27 @@
 import logging
 import os
 import socket
+import sqlite3
+import time
+from datetime import timedelta
 from math import cos, sin
+from multiprocessing import Pool
 from tempfile import TemporaryFile
+from unittest.mock import MagicMock, patch
 
 import pandas as pd
 import pytest
 from pymysql.err import ProgrammingError
 
+from py_experimenter import monitor
+from py_experimenter.async_writer import AsyncWriter
+from py_experimenter.database_connector_lite import _SampleStandardDeviation
+from py_experimenter.exceptions import DatabaseConnectionError, NoExperimentsLeftException, TableHasWrongStructureError
+from py_experimenter.experiment_status import ExperimentStatus
 from py_experimenter.experimenter import PyExperimenter
+from py_experimenter.lease_heartbeat import LeaseHeartbeat
 from py_experimenter.result_processor import ResultProcessor
+from py_experimenter.status_summary import StatusSummary
 
 
 def own_function(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
@@ -199,3 +211,438 @@ def test_add_and_execute(boolean_experimenter: PyExperimenter):
     )
     assert boolean_experimenter.get_table().shape[0] == 1
     assert boolean_experimenter.get_table().iloc[0]["value"] == 1
+
+
+def test_batch_claiming():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+
+    claimed = experimenter.db_connector.get_experiment_configurations(4, random_order=False)
+    assert [experiment_id for experiment_id, _ in claimed] == [1, 2, 3, 4]
+    assert claimed[0][1] == {"value": 1, "exponent": 1}
+    table = experimenter.get_table()
+    assert (table[table["ID"].isin([1, 2, 3, 4])]["status"] == "running").all()
+    assert (table[~table["ID"].isin([1, 2, 3, 4])]["status"] == "created").all()
+
+    experimenter.execute(own_function, n_jobs=2, batch_size=7)
+    check_done_entries(experimenter, 26, "test_table_config")
+
+
+def test_unique_keyfields():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_unique_keyfields_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    assert experimenter.get_table().shape[0] == 10
+
+    with patch.object(experimenter.db_connector, "_get_existing_rows") as get_existing_rows:
+        experimenter.fill_table_from_config()
+        experimenter.fill_table_with_rows([{"value": 1, "exponent": 1}, {"value": 6, "exponent": 1}, {"value": 6, "exponent": 1}])
+        assert experimenter.db_connector.add_experiment({"value": 2, "exponent": 2}) is None
+        get_existing_rows.assert_not_called()
+
+    table = experimenter.get_table()
+    assert table.shape[0] == 11
+    assert not table.duplicated(subset=["value", "exponent"]).any()
+
+
+def test_unique_keyfields_require_index():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_unique_keyfields_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.config.database_configuration.unique_keyfields = False
+    experimenter.fill_table_from_config()
+
+    # The option is enabled after the table was created without the unique index
+    experimenter.config.database_configuration.unique_keyfields = True
+    with pytest.raises(TableHasWrongStructureError):
+        experimenter.fill_table_from_config()
+
+    experimenter.ensure_indexes()
+    experimenter.fill_table_from_config()
+    assert experimenter.get_table().shape[0] == 10
+
+
+def test_chunked_fill_table():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.config.database_configuration.insert_chunk_size = 7
+
+    with patch.object(experimenter.db_connector, "commit", wraps=experimenter.db_connector.commit) as commit, patch.object(
+        experimenter.db_connector.logger, "info"
+    ) as log_info:
+        experimenter.fill_table_from_config()
+        # One transaction for each of the five chunks of the 30 experiments
+        assert commit.call_count == 5
+    # The progress is reported after each full chunk, followed by the summary
+    assert [call.args[0] for call in log_info.call_args_list] == [
+        *[f"Inserted {rows} rows into test_table_config so far, {rows} combinations processed." for rows in (7, 14, 21, 28)],
+        "30 rows successfully added to database. 0 rows were skipped.",
+    ]
+
+    table = experimenter.get_table()
+    assert table.shape[0] == 30
+    assert list(table["ID"]) == list(range(1, 31))
+    assert not table.duplicated(subset=["value", "exponent"]).any()
+
+
+def test_random_priority():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_random_priority_config.yml")
+
+    def claim_in_random_order():
+        experimenter = PyExperimenter(config_path, use_codecarbon=False)
+        experimenter.delete_table()
+        experimenter.fill_table_from_config()
+        table = experimenter.get_table()
+        claimed = experimenter.db_connector.get_experiment_configurations(30, random_order=True)
+        return experimenter, table, claimed
+
+    experimenter, table, claimed = claim_in_random_order()
+    assert [experiment_id for experiment_id, _ in claimed] == list(table.sort_values(["random_priority", "ID"])["ID"])
+    assert [experiment_id for experiment_id, _ in claimed] != list(range(1, 31))
+    # The random order is reproducible, as it only depends on the seed and the keyfield values
+    assert claim_in_random_order()[2] == claimed
+
+    connection = experimenter.db_connector.connect()
+    cursor = experimenter.db_connector.cursor(connection)
+    cursor.execute(f"EXPLAIN QUERY PLAN {experimenter.db_connector._get_pull_experiment_query('random_priority, id', 1)}")
+    query_plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+    experimenter.db_connector.close_connection(connection)
+    assert "test_table_random_priority_status_random_priority_idx" in query_plan
+    assert "TEMP B-TREE" not in query_plan
+
+
+def test_random_priority_requires_column():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_random_priority_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.config.database_configuration.random_priority_seed = None
+    experimenter.fill_table_from_config()
+
+    # The seed is enabled after the table was created without the random_priority column
+    experimenter.config.database_configuration.random_priority_seed = 42
+    with pytest.raises(TableHasWrongStructureError):
+        experimenter.fill_table_from_config()
+    experimenter.delete_table()
+
+
+def test_add_experiment_and_execute_passes_only_keyfields():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_random_priority_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.create_table()
+    received_keyfields = list()
+
+    def experiment_function(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+        received_keyfields.append(dict(keyfields))
+
+    keyfield_values = {"value": 1, "exponent": 2}
+    experimenter.add_experiment_and_execute(keyfield_values, experiment_function)
+    assert received_keyfields == [{"value": 1, "exponent": 2}]
+    assert keyfield_values == {"value": 1, "exponent": 2}
+    assert experimenter.get_table()["random_priority"].notna().all()
+
+
+def claim_all_experiments(config_path: str) -> list:
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    claimed_ids = list()
+    while True:
+        try:
+            claimed_ids.extend(experiment_id for experiment_id, _ in experimenter.db_connector.get_experiment_configurations(2, random_order=False))
+        except NoExperimentsLeftException:
+            return claimed_ids
+
+
+def test_concurrent_claims_are_unique():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+
+    with Pool(8) as pool:
+        claimed_ids = [experiment_id for ids in pool.map(claim_all_experiments, [config_path] * 8) for experiment_id in ids]
+    assert sorted(claimed_ids) == list(range(1, 31))
+
+
+def test_claim_retries_on_locked_database():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+
+    db_connector = experimenter.db_connector
+    claim = db_connector._claim_open_experiments
+    attempts = list()
+
+    def claim_failing_once(*args):
+        attempts.append(args)
+        if len(attempts) == 1:
+            raise DatabaseConnectionError("database is locked")
+        return claim(*args)
+
+    with patch.object(db_connector, "_claim_open_experiments", side_effect=claim_failing_once), patch("py_experimenter.database_connector_lite.time.sleep") as sleep_mock:
+        assert db_connector.get_experiment_configurations(1, random_order=False)[0][0] == 1
+    assert len(attempts) == 2
+    sleep_mock.assert_called_once()
+
+
+def test_expired_leases_are_reclaimed():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.db_connector.ensure_lease_columns()
+    # Adding the columns again is a no-op
+    experimenter.db_connector.ensure_lease_columns()
+
+    db_connector = experimenter.db_connector
+    assert [experiment_id for experiment_id, _ in db_connector.get_experiment_configurations(2, False, "crashed", 60)] == [1, 2]
+    assert [experiment_id for experiment_id, _ in db_connector.get_experiment_configurations(1, False, "alive", 60)] == [3]
+    assert db_connector.renew_leases("crashed", 60) == 2
+
+    # Let the leases of the crashed worker expire
+    connection = db_connector.connect()
+    cursor = db_connector.cursor(connection)
+    cursor.execute("UPDATE test_table_config SET lease_expiry = datetime('now', 'localtime', '-1 seconds') WHERE lease_owner = 'crashed'")
+    db_connector.commit(connection)
+    db_connector.close_connection(connection)
+
+    # Expired leases are reset at most once per lease duration by each process
+    with patch.object(db_connector, "connect") as connect:
+        assert db_connector._reclaim_expired_leases(60) == 0
+        connect.assert_not_called()
+    db_connector._last_lease_reclaim = float("-inf")
+    assert [experiment_id for experiment_id, _ in db_connector.get_experiment_configurations(3, False, "alive", 60)] == [1, 2, 4]
+    table = experimenter.get_table()
+    assert set(table[table["status"] == "running"]["lease_owner"]) == {"alive"}
+    assert db_connector.renew_leases("crashed", 60) == 0
+
+
+def test_results_of_lost_leases_are_not_written():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.db_connector.ensure_lease_columns()
+
+    db_connector = experimenter.db_connector
+    assert db_connector.get_experiment_configurations(1, False, "crashed", 60)[0][0] == 1
+    # Let another worker reclaim the experiment after the lease of the first worker expired
+    connection = db_connector.connect()
+    cursor = db_connector.cursor(connection)
+    cursor.execute("UPDATE test_table_config SET lease_owner = 'alive' WHERE ID = 1")
+    db_connector.commit(connection)
+    db_connector.close_connection(connection)
+
+    config = experimenter.config.database_configuration
+    lost = ResultProcessor(config, db_connector, 1, experimenter.logger, lease_owner="crashed")
+    lost.process_results({"sin": 1})
+    lost._complete(ExperimentStatus.DONE.value, {"cos": 1})
+    table = experimenter.get_table()
+    assert table["status"].iloc[0] == "running"
+    assert table[["sin", "cos"]].iloc[0].isna().all()
+
+    leased = ResultProcessor(config, db_connector, 1, experimenter.logger, lease_owner="alive")
+    leased.process_results({"sin": 2})
+    leased._complete(ExperimentStatus.DONE.value, {"cos": 2})
+    table = experimenter.get_table()
+    assert table["status"].iloc[0] == "done"
+    assert list(table[["sin", "cos"]].iloc[0]) == [2, 2]
+
+
+def test_execute_with_lease():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+
+    with pytest.raises(ValueError):
+        experimenter.execute(own_function, lease_duration=0)
+
+    experimenter.execute(own_function, n_jobs=1, max_experiments=1, lease_duration=60)
+    table = experimenter.get_table()
+    assert list(table["status"]).count("done") == 1
+    assert table["lease_owner"].iloc[0] == f"{socket.gethostname()}:{os.getpid()}"
+
+    experimenter.execute(own_function, n_jobs=2, lease_duration=60)
+    check_done_entries(experimenter, 30, "test_table_config")
+
+
+def test_lease_heartbeat_renews_leases():
+    db_connector = MagicMock()
+    db_connector.renew_leases.side_effect = [DatabaseConnectionError("database is locked"), 1, 1, 1, 1, 1, 1, 1, 1, 1]
+    with LeaseHeartbeat(db_connector, "worker", 0.03, logging.getLogger("test")):
+        time.sleep(0.1)
+    # A failed renewal is logged but does not stop the heartbeat
+    assert db_connector.renew_leases.call_count >= 3
+    db_connector.renew_leases.assert_called_with("worker", 0.03)
+
+
+def test_claim_sets_name_and_machine():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, name="claiming_experimenter", use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+
+    with patch.object(experimenter.db_connector, "update_database", wraps=experimenter.db_connector.update_database) as update_database:
+        experimenter.execute(own_function, n_jobs=1, max_experiments=1)
+    # Only the results are written between the claim and the completion of the experiment
+    assert [set(call.kwargs["values"].keys()) for call in update_database.call_args_list] == [{"sin", "cos"}]
+
+    experimenter.add_experiment_and_execute({"value": 42, "exponent": 1}, own_function)
+    table = experimenter.get_table()
+    table = table[table["status"] == "done"]
+    assert len(table) == 2
+    assert set(table["name"]) == {"claiming_experimenter"}
+    assert set(table["machine"]) == {socket.gethostname()}
+
+
+def returning_function(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+    results = {"sin": sin(keyfields["value"]) ** keyfields["exponent"], "cos": cos(keyfields["value"]) ** keyfields["exponent"]}
+    if keyfields["value"] == 1:
+        return ExperimentStatus.PAUSED, results
+    if keyfields["value"] == 2:
+        return {"invalid_field": 0}
+    return results
+
+
+def test_experiment_function_returns_results():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+
+    with patch.object(experimenter.db_connector, "connect", wraps=experimenter.db_connector.connect) as connect:
+        experimenter.execute(returning_function, n_jobs=1, max_experiments=1)
+    # One connection for claiming the experiment and one for completing it
+    assert connect.call_count == 2
+
+    experimenter.execute(returning_function, n_jobs=1)
+    table = experimenter.get_table()
+    assert set(table["status"]) == {"done", "paused", "error"}
+    assert table[table["status"] == "paused"]["value"].unique().tolist() == [1]
+    assert table[table["status"] == "paused"]["sin"].notnull().all()
+    errors = table[table["status"] == "error"]
+    assert errors["value"].unique().tolist() == [2]
+    assert errors["error"].str.contains("InvalidResultFieldError").all()
+    assert errors["sin"].isnull().all()
+    done = table[table["status"] == "done"]
+    assert done["sin"].notnull().all() and done["end_date"].notnull().all() and done["error"].isnull().all()
+
+
+def logging_function(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+    result_processor.process_results({"sin": sin(keyfields["value"])})
+    return {"cos": cos(keyfields["value"])}
+
+
+def test_async_writes():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.config.database_configuration.async_writes = True
+    experimenter.async_writer = AsyncWriter(experimenter.db_connector.execute_queries, 2)
+    experimenter.fill_table_from_config()
+
+    with patch.object(experimenter.db_connector, "update_database") as update_database:
+        experimenter.execute(logging_function, n_jobs=1, max_experiments=3)
+    update_database.assert_not_called()
+    table = experimenter.get_table()
+    done = table[table["status"] == "done"]
+    assert len(done) == 3 and done["sin"].notnull().all() and done["cos"].notnull().all()
+
+    # Failed asynchronous writes are reported as error of the experiment
+    with patch.object(experimenter.async_writer, "_execute_queries", side_effect=DatabaseConnectionError("connection lost")):
+        experimenter.execute(logging_function, n_jobs=1, max_experiments=1)
+    table = experimenter.get_table()
+    errors = table[table["status"] == "error"]
+    assert len(errors) == 1
+    assert "AsyncWriteError" in errors["error"].iloc[0] and "connection lost" in errors["error"].iloc[0]
+
+
+def test_get_table_filtered_and_chunked():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=3)
+
+    table = experimenter.get_table(columns=["ID", "sin"], status="done")
+    assert list(table.columns) == ["ID", "sin"]
+    assert table["ID"].tolist() == [1, 2, 3]
+
+    table = experimenter.get_table(columns=["ID"], status=["created", "done"], keyfields={"value": [1, 2], "exponent": 1})
+    assert sorted(table["ID"].tolist()) == [1, 4]
+    assert experimenter.get_table(status="all").shape[0] == 30
+
+    chunks = list(experimenter.get_table(columns=["ID", "status"], chunksize=7))
+    assert [chunk.shape[0] for chunk in chunks] == [7, 7, 7, 7, 2]
+    assert sorted(pd.concat(chunks)["ID"].tolist()) == list(range(1, 31))
+
+    with pytest.raises(ValueError):
+        experimenter.get_table(keyfields={"sin": 1})
+    with pytest.raises(ValueError):
+        experimenter.get_table(columns=["ID; DROP TABLE test_table_config"])
+    with pytest.raises(ValueError):
+        experimenter.get_table(chunksize=0)
+
+
+def test_get_aggregated_table():
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=12)
+
+    aggregated = experimenter.get_aggregated_table(["exponent"], {"sin": ["count", "mean", "std"], "cos": "max"}, status="done")
+    expected = experimenter.get_table(status="done").groupby("exponent", as_index=False).agg(
+        sin_count=("sin", "count"), sin_mean=("sin", "mean"), sin_std=("sin", "std"), cos_max=("cos", "max")
+    )
+    pd.testing.assert_frame_equal(aggregated, expected, check_dtype=False)
+
+    aggregated = experimenter.get_aggregated_table([], {"sin": "count"}, keyfields={"value": [1, 2]})
+    assert aggregated.values.tolist() == [[6]]
+    # Empty lists of values select no experiments
+    aggregated = experimenter.get_aggregated_table(["exponent"], {"sin": "count"}, keyfields={"value": []})
+    assert aggregated.empty
+    assert experimenter.get_table(status=[], keyfields={"exponent": ()}).empty
+
+    with pytest.raises(ValueError):
+        experimenter.get_aggregated_table(["sin"], {"cos": "mean"})
+    with pytest.raises(ValueError):
+        experimenter.get_aggregated_table(["value"], {"exponent": "mean"})
+    with pytest.raises(ValueError):
+        experimenter.get_aggregated_table(["value"], {"sin": "median"})
+
+
+def test_sample_standard_deviation_converts_text():
+    connection = sqlite3.connect(":memory:")
+    connection.create_aggregate("STDDEV_SAMP", 1, _SampleStandardDeviation)
+    connection.execute("CREATE TABLE results (value TEXT)")
+    connection.executemany("INSERT INTO results VALUES (?)", [("1.5",), ("2.5",), (3.5,), (None,), ("not a number",)])
+    assert connection.execute("SELECT STDDEV_SAMP(value) FROM results").fetchone()[0] == pytest.approx(1.0)
+    connection.close()
+
+
+def test_status_summary_and_monitor(capsys):
+    config_path = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+    experimenter = PyExperimenter(config_path, use_codecarbon=False)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    experimenter.execute(own_function, max_experiments=3)
+
+    summary = experimenter.status_summary(window=600)
+    assert summary.status_counts == {"created": 27, "done": 3}
+    assert (summary.total, summary.remaining, summary.finished_in_window) == (30, 27, 3)
+    assert summary.throughput == pytest.approx(18)
+    assert summary.eta == timedelta(seconds=5400)
+    with pytest.raises(ValueError):
+        experimenter.status_summary(window=0)
+
+    assert StatusSummary.from_counts({"done": 3}, 600, 0).eta == timedelta(0)
+    assert StatusSummary.from_counts({"created": 3}, 600, 0).eta is None
+
+    monitor.main([config_path, "--once", "--window", "600"])
+    assert capsys.readouterr().out == "test_table_config: created=27 running=0 done=3 error=0 paused=0 total=30 | 18.0/h over the last 600s | ETA 1:30:00\n"
@@ -5,6 +5,7 @@ from configparser import ConfigParser
 from typing import Dict
 
 import pytest
+from mock import patch
 
 from py_experimenter.exceptions import (
     ConfigError,
@@ -12,7 +13,8 @@ from py_experimenter.exceptions import (
     NoConfigFileError,
     ParameterCombinationError,
 )
-from py_experimenter.utils import combine_fill_table_parameters
+from py_experimenter import utils
+from py_experimenter.utils import combine_fill_table_parameters, iterate_fill_table_parameters, load_credentials, sample_fill_table_parameters
 
 
 
@@ -67,5 +69,96 @@ def test_combine_fill_table_parameters_raises_error(keyfield_names, parameters,
         combine_fill_table_parameters(keyfield_names, parameters, fixed_parameter_combinations)
 
 
+def test_iterate_fill_table_parameters_is_lazy():
+    keyfield_names = [f"keyfield_name_{i}" for i in range(10)]
+    parameters = {keyfield_name: list(range(20)) for keyfield_name in keyfield_names[:-1]}
+    fixed_parameter_combinations = [{"keyfield_name_9": "a"}, {"keyfield_name_9": "b"}]
+
+    combinations = iterate_fill_table_parameters(keyfield_names, parameters, fixed_parameter_combinations)
+    assert next(combinations) == {**{keyfield_name: 0 for keyfield_name in keyfield_names[:-1]}, "keyfield_name_9": "a"}
+    assert next(combinations) == {**{keyfield_name: 0 for keyfield_name in keyfield_names[:-1]}, "keyfield_name_9": "b"}
+    assert next(combinations)["keyfield_name_1"] == 1
+
+
+@pytest.mark.parametrize(
+    "parameters, fixed_parameter_combinations, error_msg",
+    [
+        ({"keyfield_name_1": [1, 2]}, [{"keyfield_name_1": 3, "keyfield_name_2": 4}], "There is at least one key that is used more than once!"),
+        ({"keyfield_name_1": [1, 2]}, [{"keyfield_name_3": 3}], "does not match the amount of keyfields"),
+        ({"keyfield_name_1": [1, 2], "keyfield_name_2": []}, [], "No parameter combination found!"),
+    ],
+)
+def test_iterate_fill_table_parameters_validates_eagerly(parameters, fixed_parameter_combinations, error_msg):
+    with pytest.raises(ParameterCombinationError, match=error_msg):
+        iterate_fill_table_parameters(["keyfield_name_1", "keyfield_name_2"], parameters, fixed_parameter_combinations)
+
+
+def test_iterate_fill_table_parameters_with_constraints():
+    keyfield_names = ["model", "kernel", "seed"]
+    parameters = {"model": ["svm", "tree"], "kernel": ["linear", "rbf"], "seed": [1, 2]}
+    evaluated_combinations = list()
+
+    def tree_only_with_first_seed(combination):
+        evaluated_combinations.append(dict(combination))
+        return combination["model"] == "svm" or combination["seed"] == 1
+
+    combinations = list(iterate_fill_table_parameters(keyfield_names, parameters, constraints=[tree_only_with_first_seed]))
+    expected = [
+        combination
+        for combination in combine_fill_table_parameters(keyfield_names, parameters)
+        if combination["model"] == "svm" or combination["seed"] == 1
+    ]
+    assert combinations == expected
+    assert len(combinations) == 6
+    # Invalid combinations are pruned as soon as model and seed are assigned, before the kernel is iterated
+    assert not any("kernel" in combination and combination["model"] == "tree" and combination["seed"] == 2 for combination in evaluated_combinations)
+
+
+@pytest.mark.parametrize("sampling", ["random", "stratified"])
+def test_sample_fill_table_parameters(sampling):
+    def iterate_combinations():
+        return iterate_fill_table_parameters(["a", "b"], {"a": list(range(10)), "b": list(range(10))})
+
+    samples = sample_fill_table_parameters(iterate_combinations, 10, seed=42, sampling=sampling)
+    assert len(samples) == 10
+    assert samples == sample_fill_table_parameters(iterate_combinations, 10, seed=42, sampling=sampling)
+    all_combinations = list(iterate_combinations())
+    assert [all_combinations.index(sample) for sample in samples] == sorted(all_combinations.index(sample) for sample in samples)
+    if sampling == "stratified":
+        assert sorted(sample["a"] for sample in samples) == list(range(10))
+
+    assert sample_fill_table_parameters(iterate_combinations, 200, seed=42, sampling=sampling) == all_combinations
+
+
+def test_sample_fill_table_parameters_raises_error():
+    with pytest.raises(ValueError):
+        sample_fill_table_parameters(lambda: iter([{"a": 1}]), 0)
+    with pytest.raises(ValueError):
+        sample_fill_table_parameters(lambda: iter([{"a": 1}]), 1, sampling="sobol")
+
+
 def test_read_yaml_config():
     file_name = os.path.join("test", "test_config_files", "yml_config.yml")
+
+
+def test_load_credentials_is_cached():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "credentials.yml")
+        with open(path, "w") as file:
+            file.write("CREDENTIALS:\n  Database:\n    user: user\n")
+
+        with patch.object(utils.OmegaConf, "load", wraps=utils.OmegaConf.load) as load:
+            credentials = load_credentials(path)
+            assert load_credentials(path) is credentials
+            assert load.call_count == 1
+            assert credentials["CREDENTIALS"]["Database"]["user"] == "user"
+
+            with open(path, "w") as file:
+                file.write("CREDENTIALS:\n  Database:\n    user: other_user\n")
+            assert load_credentials(path)["CREDENTIALS"]["Database"]["user"] == "other_user"
+            assert load.call_count == 2
+
+
+def test_load_credentials_raises_error():
+    with pytest.raises(FileNotFoundError):
+        load_credentials(os.path.join("test", "not_existing_credentials.yml"))
@@ -0,0 +1,98 @@
+import os
+import sqlite3
+
+import pytest
+from mock import patch
+
+from py_experimenter.exceptions import DatabaseConnectionError
+from py_experimenter.experimenter import PyExperimenter
+from py_experimenter.result_processor import ResultProcessor
+from py_experimenter.write_spool import WriteSpool
+
+CONFIG_PATH = os.path.join("test", "test_run_experiments", "test_run_sqlite_experiment_config.yml")
+
+
+def unreachable(*args, **kwargs):
+    try:
+        raise sqlite3.OperationalError("unable to open database file")
+    except sqlite3.OperationalError as err:
+        raise DatabaseConnectionError(f"error \n{err}\n raised when executing sql statement.") from err
+
+
+@pytest.fixture
+def experimenter(tmp_path):
+    experimenter = PyExperimenter(CONFIG_PATH, use_codecarbon=False)
+    experimenter.config.database_configuration.write_spool_directory = str(tmp_path)
+    experimenter.write_spool = WriteSpool(str(tmp_path), experimenter.db_connector, experimenter.logger)
+    experimenter.delete_table()
+    experimenter.fill_table_from_config()
+    return experimenter
+
+
+def get_sin(experimenter: PyExperimenter, experiment_id: int):
+    table = experimenter.get_table()
+    return table[table["ID"] == experiment_id]["sin"].iloc[0]
+
+
+def test_spools_and_replays_writes_in_order(experimenter: PyExperimenter):
+    write_spool = experimenter.write_spool
+    update_query = "UPDATE test_table_config SET sin = ? WHERE ID = 1"
+
+    with patch.object(experimenter.db_connector, "execute_queries", side_effect=unreachable):
+        write_spool.execute_queries([(update_query, [0.1])])
+    assert write_spool.pending()
+
+    # Later writes are spooled behind the earlier ones, even if the database is reachable again
+    write_spool.execute_queries([(update_query, [0.2])])
+    assert write_spool.pending()
+    assert get_sin(experimenter, 1) is None
+
+    assert write_spool.replay(force=True)
+    assert not write_spool.pending()
+    assert get_sin(experimenter, 1) == 0.2
+
+
+def test_replay_is_idempotent(experimenter: PyExperimenter):
+    db_connector = experimenter.db_connector
+    increment_query = "UPDATE test_table_config SET sin = COALESCE(sin, 0) + 1 WHERE ID = 1"
+    assert db_connector.execute_queries_once("write-1", [(increment_query, [])])
+    assert not db_connector.execute_queries_once("write-1", [(increment_query, [])])
+    assert get_sin(experimenter, 1) == 1
+
+
+def test_replay_stops_while_database_is_unreachable(experimenter: PyExperimenter):
+    write_spool = experimenter.write_spool
+    with patch.object(experimenter.db_connector, "execute_queries", side_effect=unreachable):
+        write_spool.execute_queries([("UPDATE test_table_config SET sin = ? WHERE ID = 1", [0.1])])
+    with patch.object(experimenter.db_connector, "execute_queries_once", side_effect=unreachable):
+        assert not write_spool.replay(force=True)
+    assert write_spool.pending()
+
+    # Writes that can never succeed are moved aside instead of blocking the spool
+    write_spool.execute_queries([("UPDATE test_table_config SET unknown_column = ? WHERE ID = 1", [0.2])])
+    assert write_spool.replay(force=True)
+    assert os.path.exists(f"{write_spool.path}.failed")
+    assert get_sin(experimenter, 1) == 0.1
+
+
+def test_non_transient_errors_are_raised(experimenter: PyExperimenter):
+    with pytest.raises(DatabaseConnectionError):
+        experimenter.write_spool.execute_queries([("UPDATE test_table_config SET unknown_column = 1", [])])
+    assert not experimenter.write_spool.pending()
+
+
+def flaky_function(keyfields: dict, result_processor: ResultProcessor, custom_fields: dict):
+    with patch.object(result_processor.db_connector, "execute_queries", side_effect=unreachable), patch.object(
+        result_processor.db_connector, "update_database", side_effect=unreachable
+    ):
+        result_processor.process_results({"sin": 0.5})
+    return {"cos": 0.5}
+
+
+def test_experiment_survives_unreachable_database(experimenter: PyExperimenter):
+    experimenter.execute(flaky_function, n_jobs=1, max_experiments=1)
+    table = experimenter.get_table()
+    experiment = table[table["ID"] == 1].iloc[0]
+    assert experiment["status"] == "done"
+    assert experiment["sin"] == 0.5 and experiment["cos"] == 0.5
+    assert experimenter.replay_write_spool()